@@ -0,0 +1,54 @@
+"""Utilidades compartidas por los benchmarks del backend.
+
+Cada benchmark trabaja sobre una copia temporal de db.sqlite3 para no tocar la
+base de datos real. Ejecutar desde la raíz del repositorio:
+
+    python benchmarks/bench_auth.py
+"""
+
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def temp_database():
+    """Copiar db.sqlite3 a un directorio temporal y apuntar DATABASE_PATH a ella"""
+    tmp_dir = tempfile.mkdtemp(prefix="tienda-bench-")
+    db_path = os.path.join(tmp_dir, "db.sqlite3")
+    shutil.copyfile(os.path.join(ROOT, "db.sqlite3"), db_path)
+    os.environ["DATABASE_PATH"] = db_path
+    return db_path
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def report(label, samples_ms):
+    """Imprimir una línea con p50/p95/max en milisegundos"""
+    if not samples_ms:
+        print(f"{label:<40} sin muestras")
+        return
+    print(
+        f"{label:<40} n={len(samples_ms):<5} "
+        f"p50={statistics.median(samples_ms):8.2f}ms "
+        f"p95={percentile(samples_ms, 95):8.2f}ms "
+        f"max={max(samples_ms):8.2f}ms"
+    )
@@ -0,0 +1,117 @@
+"""Latencia de login y starvation del catálogo durante ráfagas de login.
+
+Compara bcrypt en línea (PASSWORD_HASH_WORKERS=0) contra el pool de procesos.
+Mientras N hilos hacen login en paralelo, otro hilo consulta /api/products y
+mide cuánto se degrada su latencia.
+
+    python benchmarks/bench_auth.py [--logins 40] [--threads 8] [--rounds 12]
+"""
+
+import argparse
+import os
+import threading
+import time
+
+from _common import report, temp_database, timed
+
+BENCH_USER = "bench_user"
+BENCH_PASSWORD = "bench1234"
+
+
+def create_bench_user(db_path, rounds):
+    import sqlite3
+
+    import bcrypt
+
+    password_hash = bcrypt.hashpw(
+        BENCH_PASSWORD.encode("utf-8"), bcrypt.gensalt(rounds)
+    ).decode("utf-8")
+    conn = sqlite3.connect(db_path)
+    conn.execute("DELETE FROM users WHERE username = ?", (BENCH_USER,))
+    conn.execute(
+        """
+        INSERT INTO users (username, email, password_hash, first_name, last_name)
+        VALUES (?, ?, ?, 'Bench', 'User')
+    """,
+        (BENCH_USER, "bench@example.com", password_hash),
+    )
+    conn.commit()
+    conn.close()
+
+
+def run_scenario(app, label, logins, threads):
+    login_samples = []
+    catalog_samples = []
+    lock = threading.Lock()
+    done = threading.Event()
+    pending = list(range(logins))
+
+    def login_worker():
+        client = app.test_client()
+        while True:
+            with lock:
+                if not pending:
+                    return
+                pending.pop()
+            response, elapsed = timed(
+                client.post,
+                "/api/auth/login",
+                json={"username": BENCH_USER, "password": BENCH_PASSWORD},
+            )
+            assert response.status_code == 200, response.get_data(as_text=True)
+            with lock:
+                login_samples.append(elapsed)
+
+    def catalog_worker():
+        client = app.test_client()
+        while not done.is_set():
+            _, elapsed = timed(client.get, "/api/products")
+            catalog_samples.append(elapsed)
+            time.sleep(0.005)
+
+    catalog_thread = threading.Thread(target=catalog_worker)
+    catalog_thread.start()
+    workers = [threading.Thread(target=login_worker) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    done.set()
+    catalog_thread.join()
+
+    report(f"{label} login", login_samples)
+    report(f"{label} /api/products durante ráfaga", catalog_samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=12)
+    args = parser.parse_args()
+
+    db_path = temp_database()
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    # La ráfaga repite el mismo usuario; sin limitador para medir bcrypt
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    create_bench_user(db_path, args.rounds)
+
+    from app_pythonanywhere import app
+    from tienda import passwords
+
+    baseline = []
+    client = app.test_client()
+    for _ in range(50):
+        baseline.append(timed(client.get, "/api/products")[1])
+    report("/api/products en reposo", baseline)
+
+    for workers in (0, os.cpu_count() or 2):
+        passwords.shutdown()
+        passwords.HASH_WORKERS = workers
+        label = "en línea" if workers == 0 else f"pool x{workers}"
+        run_scenario(app, label, args.logins, args.threads)
+    passwords.shutdown()
+
+
+if __name__ == "__main__":
+    main()
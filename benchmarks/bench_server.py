@@ -0,0 +1,167 @@
+"""Throughput de gunicorn con distintas combinaciones de procesos e hilos.
+
+Levanta gunicorn con gunicorn.conf.py sobre una copia de la base de datos y lo
+carga con clientes HTTP concurrentes: la mayoría navega el catálogo y una
+parte modifica su carrito (escrituras a SQLite).
+
+Requiere gunicorn instalado.
+
+    python benchmarks/bench_server.py [--clients 16] [--seconds 10] [--port 5099]
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+from _common import ROOT, report, temp_database
+
+CONFIGS = [(1, 1), (1, 8), (2, 4), (4, 2), (4, 4)]
+WRITE_RATIO = 0.2
+
+
+def request(base, path, method="GET", body=None, token=None):
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(base + path, data=data, method=method, headers=headers)
+    with urllib.request.urlopen(req, timeout=30) as response:
+        return response.status, response.read()
+
+
+def wait_ready(base, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("gunicorn terminó al arrancar")
+        try:
+            request(base, "/api/health")
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("gunicorn no respondió a tiempo")
+
+
+def register_users(base, count):
+    tokens = []
+    for i in range(count):
+        _, body = request(
+            base,
+            "/api/auth/register",
+            "POST",
+            {
+                "username": f"bench_{i}_{time.time_ns()}",
+                "email": f"bench_{i}_{time.time_ns()}@example.com",
+                "password": "bench1234",
+                "first_name": "Bench",
+                "last_name": "User",
+            },
+        )
+        tokens.append(json.loads(body)["access_token"])
+    return tokens
+
+
+def run_load(base, tokens, seconds):
+    reads, writes, errors = [], [], []
+    stop = threading.Event()
+
+    def client(index, token):
+        n = 0
+        while not stop.is_set():
+            n += 1
+            is_write = (n * WRITE_RATIO) % 1 < WRITE_RATIO
+            start = time.perf_counter()
+            try:
+                if is_write:
+                    request(
+                        base,
+                        "/api/cart/update",
+                        "PUT",
+                        {"product_id": 1 + n % 5, "quantity": 1 + n % 3},
+                        token,
+                    )
+                else:
+                    request(base, "/api/products")
+            except Exception as e:
+                errors.append(str(e))
+                continue
+            elapsed = (time.perf_counter() - start) * 1000
+            (writes if is_write else reads).append(elapsed)
+
+    threads = [
+        threading.Thread(target=client, args=(i, token))
+        for i, token in enumerate(tokens)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return reads, writes, errors
+
+
+def run_config(workers, threads, args):
+    base = f"http://127.0.0.1:{args.port}"
+    env = dict(
+        os.environ,
+        GUNICORN_BIND=f"127.0.0.1:{args.port}",
+        GUNICORN_WORKERS=str(workers),
+        GUNICORN_THREADS=str(threads),
+        CATALOG_WATCH_INTERVAL="0",
+        RATE_LIMIT_ENABLED="false",
+        BCRYPT_ROUNDS="4",
+        PASSWORD_HASH_WORKERS="0",
+    )
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "-c",
+            "gunicorn.conf.py",
+            "app_pythonanywhere:app",
+        ],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_ready(base, process)
+        tokens = register_users(base, args.clients)
+        reads, writes, errors = run_load(base, tokens, args.seconds)
+    finally:
+        process.terminate()
+        process.wait()
+
+    label = f"{workers} procesos x {threads} hilos"
+    total = len(reads) + len(writes)
+    print(f"{label}: {total / args.seconds:.0f} req/s, {len(errors)} errores")
+    report(f"  {label} lecturas", reads)
+    report(f"  {label} escrituras", writes)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=int, default=10)
+    parser.add_argument("--port", type=int, default=5099)
+    args = parser.parse_args()
+
+    if importlib.util.find_spec("gunicorn") is None:
+        sys.exit("gunicorn no está instalado: pip install gunicorn")
+
+    temp_database()
+    for workers, threads in CONFIGS:
+        run_config(workers, threads, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Tiempo de arranque y memoria de un worker según los blueprints habilitados.
+
+Cada muestra es un proceso nuevo que importa tienda.app y llama create_app(),
+igual que un worker recién iniciado. Mide el tiempo hasta tener la app lista y
+el RSS máximo del proceso.
+
+    python benchmarks/bench_startup.py [--runs 10]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from _common import ROOT, report, temp_database
+
+PROFILES = {
+    "completa": "auth,catalog,cart,orders,payments,frontend",
+    "sin pagos": "auth,catalog,cart,orders,frontend",
+    "solo catálogo + frontend": "catalog,frontend",
+    "solo catálogo": "catalog",
+}
+
+# Se ejecuta en el proceso hijo
+CHILD = """
+import json, resource, sys, time
+start = time.perf_counter()
+from tienda.app import create_app
+app = create_app()
+elapsed = (time.perf_counter() - start) * 1000
+heavy = [name for name in ("stripe", "bcrypt", "PIL") if name in sys.modules]
+print(json.dumps({
+    "ms": elapsed,
+    "rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "heavy": heavy,
+}))
+"""
+
+
+def sample(blueprints):
+    env = dict(os.environ, TIENDA_BLUEPRINTS=blueprints)
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    # La última línea es el JSON; las anteriores son logs de arranque
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    temp_database()
+
+    for label, blueprints in PROFILES.items():
+        samples = [sample(blueprints) for _ in range(args.runs)]
+        report(f"{label} arranque", [s["ms"] for s in samples])
+        rss_mb = max(s["rss_kb"] for s in samples) / 1024
+        print(f"{'':<40} rss max={rss_mb:.1f}MB cargados={samples[-1]['heavy']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Catálogo y pagos con Stripe lento: sin protección contra tienda.stripe_guard.
+
+Levanta el Stripe falso local (fake_stripe.py) que tarda --latency segundos
+en cada respuesta y apunta STRIPE_API_BASE a él. Un pool de --workers hilos
+(como los hilos de un worker de gunicorn) atiende a la vez --payments
+verificaciones de pago y --catalog peticiones a /api/products. Se reporta
+cuánto esperan las peticiones del catálogo y cuántos pagos respondieron 503.
+
+    python benchmarks/bench_stripe.py [--latency 2] [--workers 8] [--timeout 1]
+"""
+
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from _common import report, temp_database
+from fake_stripe import FakeStripe
+
+
+def run_scenario(app, label, args):
+    pool = ThreadPoolExecutor(max_workers=args.workers)
+    client = app.test_client
+    catalog_ms = []
+    payment_codes = []
+
+    def payment(i):
+        response = client().post(
+            "/api/verify-payment", json={"session_id": f"cs_bench_{i}"}
+        )
+        payment_codes.append(response.status_code)
+
+    def browse(submitted):
+        client().get("/api/products")
+        # Incluye la espera por un hilo libre
+        catalog_ms.append((time.perf_counter() - submitted) * 1000)
+
+    futures = [pool.submit(payment, i) for i in range(args.payments)]
+    for _ in range(args.catalog):
+        futures.append(pool.submit(browse, time.perf_counter()))
+        time.sleep(0.005)
+    for future in futures:
+        future.result()
+    pool.shutdown()
+
+    rejected = sum(code == 503 for code in payment_codes)
+    print(f"{label}: {rejected}/{len(payment_codes)} pagos con 503")
+    report(f"  {label} /api/products", catalog_ms)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=2.0)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--payments", type=int, default=16)
+    parser.add_argument("--catalog", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=1.0)
+    args = parser.parse_args()
+
+    server = FakeStripe(args.latency)
+    os.environ["STRIPE_API_BASE"] = server.url
+    os.environ.setdefault("STRIPE_SECRET_KEY", "sk_test_bench")
+    os.environ["STRIPE_TIMEOUT"] = str(args.timeout)
+    temp_database()
+
+    import stripe
+
+    from tienda import stripe_guard
+    from tienda.app import create_app
+
+    app = create_app(["catalog", "payments"])
+    app.test_client().get("/api/products")
+
+    # Valores de la librería: 80 s de timeout y sin límites
+    guarded = (stripe_guard.breaker, stripe_guard._bulkhead)
+    stripe_guard.breaker = stripe_guard.CircuitBreaker(10**9, 0)
+    stripe_guard._bulkhead = threading.BoundedSemaphore(10**6)
+    stripe.default_http_client = stripe.new_default_http_client(timeout=80)
+    run_scenario(app, "sin protección", args)
+
+    stripe_guard.breaker, stripe_guard._bulkhead = guarded
+    stripe_guard.configure()
+    run_scenario(app, "stripe_guard", args)
+    print(f"  {stripe_guard.stats()}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Escrituras concurrentes al carrito: cola de escritura contra commits por hilo.
+
+N hilos actualizan su carrito con PUT /api/cart/update a través del test
+client de Flask. Con WRITER_QUEUE_ENABLED=false cada handler hace su propio
+commit y compite por el lock de SQLite; con la cola, un solo hilo agrupa las
+mutaciones en transacciones y se reporta cuántos trabajos entraron por commit.
+
+    python benchmarks/bench_writes.py [--threads 16] [--requests 200]
+"""
+
+import argparse
+import os
+import threading
+import time
+
+from _common import report, temp_database, timed
+
+
+def register_users(client, count):
+    tokens = []
+    for i in range(count):
+        response = client.post(
+            "/api/auth/register",
+            json={
+                "username": f"bench_{i}_{time.time_ns()}",
+                "email": f"bench_{i}_{time.time_ns()}@example.com",
+                "password": "bench1234",
+                "first_name": "Bench",
+                "last_name": "User",
+            },
+        )
+        tokens.append(response.get_json()["access_token"])
+    return tokens
+
+
+def run_scenario(app, label, tokens, per_thread):
+    samples = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker(token):
+        client = app.test_client()
+        headers = {"Authorization": f"Bearer {token}"}
+        for n in range(per_thread):
+            response, elapsed = timed(
+                client.put,
+                "/api/cart/update",
+                json={"product_id": 1 + n % 5, "quantity": 1 + n % 3},
+                headers=headers,
+            )
+            with lock:
+                if response.status_code != 200:
+                    errors.append(response.status_code)
+                else:
+                    samples.append(elapsed)
+
+    threads = [threading.Thread(target=worker, args=(token,)) for token in tokens]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    print(f"{label}: {len(samples) / elapsed:.0f} escrituras/s, {len(errors)} errores")
+    report(f"  {label}", samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+    os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+    temp_database()
+
+    from tienda import writer
+    from tienda.app import create_app
+
+    app = create_app(["auth", "cart"])
+    tokens = register_users(app.test_client(), args.threads)
+    per_thread = max(1, args.requests // args.threads)
+
+    writer.WRITER_QUEUE_ENABLED = False
+    run_scenario(app, "commit por handler", tokens, per_thread)
+
+    writer.WRITER_QUEUE_ENABLED = True
+    run_scenario(app, "cola de escritura", tokens, per_thread)
+    stats = writer.stats()
+    if stats["commits"]:
+        print(
+            f"  {stats['jobs']} trabajos en {stats['commits']} commits "
+            f"({stats['jobs'] / stats['commits']:.1f} por commit)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Stripe falso local (HTTP) para benchmarks y pruebas.
+
+Implementa la forma mínima de la API que usa la tienda: Products, Prices y
+Checkout Sessions. Se apunta la librería a él con STRIPE_API_BASE:
+
+    fake = FakeStripe(latency=2)
+    os.environ["STRIPE_API_BASE"] = fake.url
+
+latency y fail_status se pueden cambiar mientras corre para simular lentitud
+o caídas de Stripe. Cada petición queda en requests como (método, ruta,
+parámetros del formulario).
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+class FakeStripe:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        # Código HTTP con el que fallan todas las respuestas (p. ej. 500)
+        self.fail_status = None
+        self.products = {}
+        self.prices = {}
+        self.sessions = {}
+        self.requests = []
+        self._lock = threading.Lock()
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def shutdown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def pay(self, session_id, amount_total):
+        """Marcar la sesión como pagada"""
+        with self._lock:
+            session = self.sessions.setdefault(session_id, _session(session_id))
+            session.update(payment_status="paid", amount_total=amount_total)
+
+    def _route(self, method, path, params):
+        parts = path.strip("/").split("/")[1:]  # sin "v1"
+        with self._lock:
+            self.requests.append((method, path, params))
+            if method == "POST" and parts == ["products"]:
+                if params["id"] in self.products:
+                    return 400, _error(
+                        "invalid_request_error",
+                        "Product already exists.",
+                        code="resource_already_exists",
+                    )
+                product = {
+                    "id": params["id"],
+                    "object": "product",
+                    "name": params["name"],
+                    "active": True,
+                }
+                self.products[product["id"]] = product
+                return 200, product
+            if method == "POST" and parts[0] == "products":
+                product = self.products.get(parts[1])
+                if product is None:
+                    return 404, _error("invalid_request_error", "No such product")
+                if "name" in params:
+                    product["name"] = params["name"]
+                if "active" in params:
+                    product["active"] = params["active"] == "true"
+                return 200, product
+            if method == "POST" and parts == ["prices"]:
+                price = {
+                    "id": f"price_{len(self.prices) + 1}",
+                    "object": "price",
+                    "product": params["product"],
+                    "unit_amount": int(params["unit_amount"]),
+                    "currency": params["currency"],
+                }
+                self.prices[price["id"]] = price
+                return 200, price
+            if method == "POST" and parts == ["checkout", "sessions"]:
+                session = _session(f"cs_test_{len(self.sessions) + 1}")
+                session["url"] = f"{self.url}/pay/{session['id']}"
+                self.sessions[session["id"]] = session
+                return 200, session
+            if method == "GET" and parts[:2] == ["checkout", "sessions"]:
+                if parts[3:] == ["line_items"]:
+                    return 200, {"object": "list", "data": [], "has_more": False}
+                return 200, self.sessions.get(parts[2], _session(parts[2]))
+        return 404, _error("invalid_request_error", f"Unrecognized request URL {path}")
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, method):
+                length = int(self.headers.get("Content-Length") or 0)
+                form = parse_qs(
+                    self.rfile.read(length).decode(), keep_blank_values=True
+                )
+                params = {key: values[0] for key, values in form.items()}
+                time.sleep(fake.latency)
+                if fake.fail_status:
+                    status, body = fake.fail_status, _error("api_error", "Fake outage")
+                else:
+                    status, body = fake._route(method, self.path.split("?")[0], params)
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.end_headers()
+                    self.wfile.write(json.dumps(body).encode())
+                except (BrokenPipeError, ConnectionResetError):
+                    # El cliente ya se fue por timeout
+                    pass
+
+            def do_GET(self):
+                self._reply("GET")
+
+            def do_POST(self):
+                self._reply("POST")
+
+        return Handler
+
+
+def _session(session_id):
+    return {
+        "id": session_id,
+        "object": "checkout.session",
+        "payment_status": "unpaid",
+        "amount_total": None,
+        "customer_details": None,
+        "metadata": {},
+    }
+
+
+def _error(kind, message, code=None):
+    return {"error": {"type": kind, "message": message, "code": code}}
@@ -41,9 +41,15 @@ pip3.10 install --user python-dotenv
 echo "🔨 Creando build de producción..."
 npm run build
 
-# Paso 7: Reemplazar app.py con la versión de PythonAnywhere
-echo "🔄 Actualizando aplicación..."
-cp app_pythonanywhere.py db-microservice/app.py
+# Generar variantes comprimidas (gzip/brotli) de los assets del build
+python3.10 -m tienda.static_assets build
+
+# Pre-generar miniaturas WebP/JPEG de las imágenes del catálogo
+python3.10 -m tienda.thumbnails
+
+# Paso 7: db-microservice/app.py ya importa la app unificada (tienda.app)
+echo "🔄 Verificando aplicación..."
+python3.10 -c "from tienda.app import create_app; create_app()"
 
 # Paso 8: Inicializar base de datos completa (con tablas de Stripe)
 echo "🗄️ Inicializando base de datos completa..."
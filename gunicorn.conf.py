@@ -0,0 +1,13 @@
+"""Configuración de gunicorn para producción (ver tienda/server.py).
+
+    gunicorn -c gunicorn.conf.py app_pythonanywhere:app
+"""
+
+from tienda import server
+
+globals().update(server.settings())
+
+when_ready = server.when_ready
+pre_fork = server.pre_fork
+post_fork = server.post_fork
+on_exit = server.on_exit
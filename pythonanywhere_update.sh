@@ -22,6 +22,13 @@ fi
 echo "📋 Archivos actualizados:"
 git diff --name-only HEAD~1
 
+# Generar variantes comprimidas (gzip/brotli) de los assets del build
+echo "🗜️ Precomprimiendo assets estáticos..."
+python3.10 -m tienda.static_assets build
+
+# Pre-generar miniaturas WebP/JPEG de las imágenes del catálogo
+python3.10 -m tienda.thumbnails
+
 # Inicializar base de datos con nuevas tablas de órdenes
 echo "🗄️ Inicializando base de datos con tablas de órdenes..."
 python3.10 init_complete_db.py
@@ -62,7 +69,7 @@ echo "🔧 Verificando app_pythonanywhere.py..."
 if [ -f "app_pythonanywhere.py" ]; then
     echo "✅ Archivo principal encontrado"
     # Verificar que el endpoint de verify-payment existe
-    if grep -q "verify-payment" app_pythonanywhere.py; then
+    if grep -q "verify-payment" tienda/blueprints/payments.py; then
         echo "✅ Endpoint de verificación de pagos encontrado"
     else
         echo "⚠️ El endpoint de verificación de pagos no se encontró"
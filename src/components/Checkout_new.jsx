@@ -46,6 +46,7 @@ function Checkout() {
     previousStep,
     calculateTotal,
     isGuest,
+    idempotencyKey,
   } = useCheckoutFlow(cartItems);
 
   // Scroll to top cuando cambia el paso
@@ -107,7 +108,8 @@ function Checkout() {
         formData.paymentMethod,
         formData,
         cartItems,
-        calculateTotal
+        calculateTotal,
+        idempotencyKey
       );
 
       if (!paymentResult.success) {
@@ -3,6 +3,7 @@ import { Link } from 'react-router-dom';
 import { CartContext } from '../context/CartContext';
 import { getProducts } from '../services/api';
 import { formatPrice } from '../utils/currency';
+import { productImageUrl, productImageSrcSet } from '../utils/images';
 import { showToast } from './ToastProvider';
 import { LoadingSkeleton } from './LoadingSkeleton';
 import './ProductList.css';
@@ -166,7 +167,10 @@ const SupplierCarousel = ({ supplier, products, onProductClick, onAddToCart }) =
             <div key={product.id} className="carousel-product-card">
               <div className="carousel-product-image-container">
                 <img 
-                  src={`/images/products/${product.image}`} 
+                  src={productImageUrl(product.image, 320)}
+                  srcSet={productImageSrcSet(product.image)}
+                  sizes="220px"
+                  loading="lazy"
                   alt={product.name}
                   className="carousel-product-image"
                   onClick={() => onProductClick(product)}
@@ -326,7 +330,7 @@ const ProductBottomSheet = ({ product, isOpen, onClose, onAddToCart }) => {
         <div className="bottom-sheet-header">
           <div className="product-summary">
             <img 
-              src={`/images/products/${product.image}`}
+              src={productImageUrl(product.image, 160)}
               alt={product.name}
               className="summary-image clickable-image"
               onClick={() => setIsImageZoomed(true)}
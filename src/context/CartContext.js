@@ -1,4 +1,4 @@
-import React, { createContext, useReducer, useEffect, useCallback } from 'react';
+import React, { createContext, useReducer, useEffect, useCallback, useRef } from 'react';
 
 // Actions
 const CART_ACTIONS = {
@@ -102,6 +102,9 @@ function cartReducer(state, action) {
   }
 }
 
+// Ventana para agrupar operaciones del carrito en /api/cart/batch
+const CART_BATCH_DELAY_MS = 300;
+
 // Estado inicial
 const initialState = {
   cartItems: []
@@ -145,6 +148,91 @@ export function CartProvider({ children }) {
     localStorage.setItem('cart', JSON.stringify(state.cartItems));
   }, [state.cartItems]);
 
+  // Cola de operaciones pendientes: ráfagas de clics (p. ej. el selector de
+  // cantidad) se envían juntas en una sola petición a /api/cart/batch
+  const pendingOps = useRef([]);
+  const flushTimer = useRef(null);
+
+  // Si un lote falla (p. ej. un producto se agotó) el servidor no aplica
+  // ninguna de sus operaciones: se recarga el carrito del servidor para que la
+  // UI no quede distinta. loadCartFromDB se define más abajo.
+  const loadCartRef = useRef(null);
+  const needsReload = useRef(false);
+
+  const reloadCart = useCallback(() => {
+    if (pendingOps.current.length > 0) {
+      // Se recarga cuando termine el siguiente lote
+      needsReload.current = true;
+      return;
+    }
+    needsReload.current = false;
+    if (loadCartRef.current) {
+      loadCartRef.current();
+    }
+  }, []);
+
+  const flushCartOps = useCallback(() => {
+    clearTimeout(flushTimer.current);
+    flushTimer.current = null;
+
+    const operations = pendingOps.current;
+    pendingOps.current = [];
+
+    const token = localStorage.getItem('access_token');
+    const isGuest = localStorage.getItem('isGuest') === 'true';
+    if (operations.length === 0 || !token || isGuest) {
+      return;
+    }
+
+    fetch('/api/cart/batch', {
+      method: 'POST',
+      keepalive: true,
+      headers: {
+        'Content-Type': 'application/json',
+        'Authorization': `Bearer ${token}`
+      },
+      body: JSON.stringify({ operations })
+    }).then(response => {
+      if (!response.ok) {
+        console.error('❌ Error syncing cart batch with DB:', response.status);
+        reloadCart();
+      } else if (needsReload.current) {
+        reloadCart();
+      }
+    }).catch(error => {
+      console.error('❌ Error syncing cart batch with DB:', error);
+      reloadCart();
+    });
+  }, [reloadCart]);
+
+  const queueCartOp = useCallback((operation) => {
+    const token = localStorage.getItem('access_token');
+    const isGuest = localStorage.getItem('isGuest') === 'true';
+    if (!token || isGuest) {
+      return;
+    }
+
+    if (operation.op === 'clear') {
+      // Lo anterior queda sin efecto
+      pendingOps.current = [operation];
+    } else {
+      pendingOps.current.push(operation);
+    }
+
+    if (!flushTimer.current) {
+      flushTimer.current = setTimeout(flushCartOps, CART_BATCH_DELAY_MS);
+    }
+  }, [flushCartOps]);
+
+  // Enviar lo pendiente antes de salir de la página
+  useEffect(() => {
+    window.addEventListener('beforeunload', flushCartOps);
+    return () => {
+      window.removeEventListener('beforeunload', flushCartOps);
+      flushCartOps();
+    };
+  }, [flushCartOps]);
+
   // Funciones del carrito
   const addToCart = useCallback((product, quantity = 1) => {
     if (product.stock <= 0) {
@@ -158,27 +246,9 @@ export function CartProvider({ children }) {
       payload: { ...product, quantity }
     });
 
-    // Sincronizar con BD si está autenticado y no es invitado (de forma asíncrona sin esperar)
-    const token = localStorage.getItem('access_token');
-    const isGuest = localStorage.getItem('isGuest') === 'true';
-    
-    if (token && !isGuest) {
-      // Ejecutar la sincronización sin esperar (fire and forget)
-      fetch('/api/cart/add', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-          'Authorization': `Bearer ${token}`
-        },
-        body: JSON.stringify({ 
-          product_id: product.id, 
-          quantity: quantity 
-        })
-      }).catch(error => {
-        console.error('Error syncing add to cart with DB:', error);
-      });
-    }
-  }, []);
+    // Sincronizar con BD si está autenticado y no es invitado (en lote, sin esperar)
+    queueCartOp({ op: 'add', product_id: product.id, quantity });
+  }, [queueCartOp]);
 
   const removeFromCart = useCallback((productId) => {
     console.log('🗑️ Removing from cart:', productId);
@@ -189,32 +259,9 @@ export function CartProvider({ children }) {
       payload: productId
     });
 
-    console.log('🗑️ State updated, syncing with backend...');
-
-    // Sincronizar con BD si está autenticado y no es invitado (de forma asíncrona sin esperar)
-    const token = localStorage.getItem('access_token');
-    const isGuest = localStorage.getItem('isGuest') === 'true';
-    
-    if (token && !isGuest) {
-      console.log('🗑️ Syncing removal with database...');
-      // Ejecutar la sincronización sin esperar (fire and forget)
-      fetch(`/api/cart/remove?product_id=${productId}`, {
-        method: 'DELETE',
-        headers: {
-          'Authorization': `Bearer ${token}`
-        }
-      }).then(response => {
-        console.log('🗑️ Backend sync response:', response.status);
-        return response.json();
-      }).then(data => {
-        console.log('🗑️ Backend sync result:', data);
-      }).catch(error => {
-        console.error('❌ Error syncing remove from cart with DB:', error);
-      });
-    } else {
-      console.log('🗑️ Guest user, no backend sync needed');
-    }
-  }, []);
+    // Sincronizar con BD si está autenticado y no es invitado (en lote, sin esperar)
+    queueCartOp({ op: 'remove', product_id: productId });
+  }, [queueCartOp]);
 
   const updateQuantity = useCallback((productId, newQuantity) => {
     // Actualizar estado inmediatamente
@@ -223,53 +270,19 @@ export function CartProvider({ children }) {
       payload: { id: productId, quantity: newQuantity }
     });
 
-    // Sincronizar con BD si está autenticado y no es invitado (de forma asíncrona sin esperar)
-    const token = localStorage.getItem('access_token');
-    const isGuest = localStorage.getItem('isGuest') === 'true';
-    
-    if (token && !isGuest) {
-      // Ejecutar la sincronización sin esperar (fire and forget)
-      fetch('/api/cart/update', {
-        method: 'PUT',
-        headers: {
-          'Content-Type': 'application/json',
-          'Authorization': `Bearer ${token}`
-        },
-        body: JSON.stringify({ 
-          product_id: productId, 
-          quantity: newQuantity 
-        })
-      }).catch(error => {
-        console.error('Error syncing update quantity with DB:', error);
-      });
-    }
-  }, []);
+    // Sincronizar con BD si está autenticado y no es invitado (en lote, sin esperar)
+    queueCartOp({ op: 'update', product_id: productId, quantity: newQuantity });
+  }, [queueCartOp]);
 
   const clearCart = useCallback((silent = true) => {
     // Siempre limpiar silenciosamente, sin confirmación
     dispatch({ type: CART_ACTIONS.CLEAR_CART });
     
-    // Sincronizar limpieza con BD si está autenticado y no es invitado
-    const token = localStorage.getItem('access_token');
-    const isGuest = localStorage.getItem('isGuest') === 'true';
-    
-    if (token && !isGuest) {
-      console.log('🗑️ Clearing cart in database...');
-      fetch('http://localhost:5000/api/cart/clear', {
-        method: 'DELETE',
-        headers: {
-            'Authorization': `Bearer ${token}`
-          }
-        }).then(response => {
-          console.log('🗑️ Database cart clear response:', response.status);
-          return response.json();
-        }).then(data => {
-          console.log('🗑️ Database cart cleared successfully:', data);
-        }).catch(error => {
-          console.error('❌ Error clearing cart in database:', error);
-        });
-    }
-  }, []);
+    // Sincronizar limpieza con BD si está autenticado y no es invitado.
+    // Descarta operaciones pendientes y se envía de inmediato
+    queueCartOp({ op: 'clear' });
+    flushCartOps();
+  }, [queueCartOp, flushCartOps]);
 
   const getCartTotal = () => {
     return state.cartItems.reduce((total, item) => {
@@ -374,6 +387,8 @@ export function CartProvider({ children }) {
     return false;
   }, []);
 
+  loadCartRef.current = loadCartFromDB;
+
   const syncCartWithDB = useCallback(async () => {
     const token = localStorage.getItem('access_token');
     if (!token || state.cartItems.length === 0) return false;
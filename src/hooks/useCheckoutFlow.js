@@ -1,6 +1,12 @@
 import { useState, useEffect } from 'react';
 import { useAuth } from '../context/AuthContext';
 
+// Key for the Idempotency-Key header of one checkout attempt
+const newIdempotencyKey = () =>
+  window.crypto?.randomUUID
+    ? window.crypto.randomUUID()
+    : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+
 export function useCheckoutFlow(cartItems) {
   const { user } = useAuth();
   const [currentStep, setCurrentStep] = useState(1);
@@ -61,6 +67,14 @@ export function useCheckoutFlow(cartItems) {
     }
   }, [formData, user?.id]);
 
+  // Retries of the same order reuse the key; a changed cart or form is a
+  // different order and gets a new one
+  const [idempotencyKey, setIdempotencyKey] = useState(newIdempotencyKey);
+
+  useEffect(() => {
+    setIdempotencyKey(newIdempotencyKey());
+  }, [formData, cartItems]);
+
   // Calculate total
   const calculateTotal = () => {
     return cartItems.reduce((total, item) => {
@@ -124,6 +138,7 @@ export function useCheckoutFlow(cartItems) {
     previousStep,
     calculateTotal,
     getUserFullName,
+    idempotencyKey,
     isGuest: localStorage.getItem('isGuest') === 'true'
   };
 }
@@ -51,10 +51,28 @@ api.interceptors.response.use(
   }
 );
 
+// Catálogo incrustado por el backend en index.html (se usa una sola vez)
+const takeCatalogSnapshot = () => {
+  const script = document.getElementById('catalog-snapshot');
+  if (!script) return null;
+  script.remove();
+  try {
+    return JSON.parse(script.textContent);
+  } catch (err) {
+    return null;
+  }
+};
+
 // Funciones para productos
 export const getProducts = (filters = {}) => {
   const params = new URLSearchParams();
-  
+
+  if (!Object.values(filters).some(Boolean)) {
+    // Primer render sin esperar a /api/products
+    const snapshot = takeCatalogSnapshot();
+    if (snapshot) return Promise.resolve({ data: snapshot });
+  }
+
   if (filters.supplier) params.append('supplier', filters.supplier);
   if (filters.brand) params.append('brand', filters.brand);
   if (filters.min_price) params.append('min_price', filters.min_price);
@@ -70,9 +88,11 @@ export const getSuppliers = () => api.get(`${API_URL}/suppliers`);
 
 export const getBrands = () => api.get(`${API_URL}/brands`);
 
-export const createOrder = async (orderData) => {
+export const createOrder = async (orderData, idempotencyKey) => {
   try {
-    const response = await api.post(`${API_URL}/orders`, orderData);
+    // Con la misma Idempotency-Key un reintento recibe la orden ya creada
+    const headers = idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {};
+    const response = await api.post(`${API_URL}/orders`, orderData, { headers });
     return response.data;
   } catch (error) {
     console.error('Error en createOrder API:', error);
@@ -54,7 +54,7 @@ export const PAYMENT_STATUS = {
  * Process cash payment
  * Creates order directly in database with cash payment method
  */
-export const processCashPayment = async (formData, cartItems, calculateTotal) => {
+export const processCashPayment = async (formData, cartItems, calculateTotal, idempotencyKey) => {
   try {
     const sanitizedData = sanitizeFormData(formData);
     
@@ -94,7 +94,7 @@ export const processCashPayment = async (formData, cartItems, calculateTotal) =>
     console.log('💵 Processing cash payment:', orderData);
 
     // Create order
-    const response = await createOrder(orderData);
+    const response = await createOrder(orderData, idempotencyKey);
     
     if (!response || !response.order_number) {
       throw new Error('No se recibió número de orden del servidor');
@@ -124,7 +124,7 @@ export const processCashPayment = async (formData, cartItems, calculateTotal) =>
  * Process card payment via Stripe
  * Creates Stripe checkout session with metadata for later order creation
  */
-export const processCardPayment = async (formData, cartItems, calculateTotal) => {
+export const processCardPayment = async (formData, cartItems, calculateTotal, idempotencyKey) => {
   try {
     const sanitizedData = sanitizeFormData(formData);
     
@@ -187,6 +187,7 @@ export const processCardPayment = async (formData, cartItems, calculateTotal) =>
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
+        ...(idempotencyKey && { 'Idempotency-Key': idempotencyKey }),
       },
       body: JSON.stringify(sessionData)
     });
@@ -226,13 +227,13 @@ export const processCardPayment = async (formData, cartItems, calculateTotal) =>
  * Main payment processing function
  * Routes to appropriate payment method handler
  */
-export const processPayment = async (paymentMethod, formData, cartItems, calculateTotal) => {
+export const processPayment = async (paymentMethod, formData, cartItems, calculateTotal, idempotencyKey) => {
   console.log('🔄 Processing payment:', paymentMethod);
 
   if (paymentMethod === PAYMENT_METHODS.CASH) {
-    return await processCashPayment(formData, cartItems, calculateTotal);
+    return await processCashPayment(formData, cartItems, calculateTotal, idempotencyKey);
   } else if (paymentMethod === PAYMENT_METHODS.CARD) {
-    return await processCardPayment(formData, cartItems, calculateTotal);
+    return await processCardPayment(formData, cartItems, calculateTotal, idempotencyKey);
   } else {
     throw new Error(`Método de pago no válido: ${paymentMethod}`);
   }
@@ -0,0 +1,27 @@
+/**
+ * Anchos de miniatura que genera el backend (THUMBNAIL_SIZES)
+ */
+export const THUMBNAIL_SIZES = [160, 320, 640];
+
+/**
+ * URL de la imagen de un producto, opcionalmente redimensionada
+ * @param {string} image - Nombre del archivo (ej. 'catsup_370g.jpg')
+ * @param {number} [width] - Ancho de miniatura; sin ancho se usa el original
+ * @returns {string} URL de la imagen
+ */
+export const productImageUrl = (image, width) => {
+  return width
+    ? `/images/${width}/products/${image}`
+    : `/images/products/${image}`;
+};
+
+/**
+ * srcSet con todas las miniaturas disponibles para pantallas de alta densidad
+ * @param {string} image - Nombre del archivo
+ * @returns {string} Valor para el atributo srcSet
+ */
+export const productImageSrcSet = (image) => {
+  return THUMBNAIL_SIZES
+    .map(width => `${productImageUrl(image, width)} ${width}w`)
+    .join(', ');
+};
@@ -0,0 +1,177 @@
+"""Fixtures de las pruebas del backend.
+
+Cada prueba que usa `backend` corre dos veces: con una copia de db.sqlite3 y
+con PostgreSQL. Para PostgreSQL se usa TEST_DATABASE_URL o, si no está
+definida, un servidor local temporal con pgserver (pip install pgserver); sin
+ninguno de los dos esas pruebas se saltan.
+
+    python -m pytest tests
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+
+import pytest
+import stripe
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+# Antes de importar tienda: varios módulos leen su configuración al importarse
+os.environ.update(
+    RATE_LIMIT_ENABLED="false",
+    BCRYPT_ROUNDS="4",
+    PASSWORD_HASH_WORKERS="0",
+    JWT_SECRET_KEY="test-secret",
+    STRIPE_SECRET_KEY="sk_test_tienda",
+    STRIPE_PRICES_TTL="0",
+)
+os.environ.pop("DATABASE_URL", None)
+
+from tienda import (  # noqa: E402
+    cart_cache,
+    catalog,
+    db,
+    migrations,
+    pg,
+    related,
+    sessions,
+    stripe_catalog,
+    stripe_guard,
+    writer,
+)
+from tienda.app import create_app  # noqa: E402
+
+from fake_stripe import FakeStripe  # noqa: E402
+
+API_BLUEPRINTS = ["auth", "catalog", "cart", "orders", "payments", "admin"]
+
+
+@pytest.fixture(scope="session")
+def sqlite_template(tmp_path_factory):
+    """db.sqlite3 con las migraciones ya aplicadas"""
+    path = str(tmp_path_factory.mktemp("template") / "db.sqlite3")
+    shutil.copyfile(os.path.join(ROOT, "db.sqlite3"), path)
+    conn = sqlite3.connect(path)
+    migrations.migrate(conn)
+    conn.close()
+    return path
+
+
+@pytest.fixture(scope="session")
+def postgres_url():
+    url = os.environ.get("TEST_DATABASE_URL")
+    if url:
+        yield url
+        return
+    try:
+        import pgserver
+    except ImportError:
+        pytest.skip("Sin PostgreSQL: definir TEST_DATABASE_URL o instalar pgserver")
+    # Directamente en /tmp: con root, pgserver corre como otro usuario
+    pgdata = tempfile.mkdtemp(prefix="tienda-pg-")
+    server = pgserver.get_server(pgdata, cleanup_mode="stop")
+    yield server.get_uri()
+    if pg._pool is not None:
+        pg._pool.close()
+    server.cleanup()
+    shutil.rmtree(pgdata, ignore_errors=True)
+
+
+def _reset_state(monkeypatch):
+    """Cachés y estado por proceso que no deben pasar de una prueba a otra"""
+    monkeypatch.setattr(catalog, "_snapshot", None)
+    for name in ("_sessions", "_users"):
+        monkeypatch.setattr(
+            sessions,
+            name,
+            sessions.TTLCache(sessions.SESSION_CACHE_SIZE, sessions.SESSION_CACHE_TTL),
+        )
+    monkeypatch.setattr(cart_cache, "_entries", OrderedDict())
+    monkeypatch.setattr(cart_cache, "_size", 0)
+    monkeypatch.setattr(stripe_catalog, "_loaded_at", None)
+    monkeypatch.setattr(related, "_loaded_at", None)
+    monkeypatch.setattr(
+        stripe_guard,
+        "breaker",
+        stripe_guard.CircuitBreaker(
+            stripe_guard.STRIPE_BREAKER_FAILURES, stripe_guard.STRIPE_BREAKER_RESET
+        ),
+    )
+    monkeypatch.setattr(
+        stripe_guard,
+        "_bulkhead",
+        threading.BoundedSemaphore(stripe_guard.STRIPE_MAX_CONCURRENT),
+    )
+    monkeypatch.setattr(stripe_guard, "_stats", dict.fromkeys(stripe_guard._stats, 0))
+    # El hilo escritor conserva su conexión: uno nuevo por base de datos
+    monkeypatch.setattr(writer, "_queue", writer.WriteQueue())
+
+
+@pytest.fixture(params=["sqlite", "postgres"])
+def backend(request, monkeypatch, tmp_path, sqlite_template):
+    """Base de datos de la prueba; devuelve "sqlite" o "postgres" """
+    db_path = str(tmp_path / "db.sqlite3")
+    shutil.copyfile(sqlite_template, db_path)
+    monkeypatch.setenv("DATABASE_PATH", db_path)
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    if request.param == "postgres":
+        monkeypatch.setenv("DATABASE_URL", request.getfixturevalue("postgres_url"))
+        db.init_database()
+        pg.copy_from_sqlite(db_path)
+        conn = db.get_connection()
+        conn.execute("TRUNCATE idempotency_keys, archived_order_months")
+        conn.commit()
+        conn.close()
+    _reset_state(monkeypatch)
+    return request.param
+
+
+@pytest.fixture
+def app(backend):
+    return create_app(API_BLUEPRINTS)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def register(client):
+    """register(username) -> headers con el token del usuario nuevo"""
+
+    def register(username, password="secreto123"):
+        response = client.post(
+            "/api/auth/register",
+            json={
+                "username": username,
+                "email": f"{username}@example.com",
+                "password": password,
+                "first_name": "Prueba",
+                "last_name": "Tienda",
+            },
+        )
+        assert response.status_code == 201, response.get_json()
+        return {"Authorization": f"Bearer {response.get_json()['access_token']}"}
+
+    return register
+
+
+@pytest.fixture
+def fake_stripe(monkeypatch):
+    """Stripe falso de benchmarks/fake_stripe.py con la librería apuntando a él"""
+    fake = FakeStripe()
+    monkeypatch.setenv("STRIPE_API_BASE", fake.url)
+    # configure() cambia globales de stripe: se restauran al terminar
+    for name in ("api_key", "api_base", "max_network_retries", "default_http_client"):
+        monkeypatch.setattr(stripe, name, getattr(stripe, name))
+    stripe_guard.configure()
+    yield fake
+    fake.shutdown()
@@ -0,0 +1,106 @@
+"""Órdenes pagadas que ya se movieron al archivo (tienda.archive)"""
+
+import json
+import os
+
+import pytest
+
+from tienda import archive, db, parquet_export
+
+
+@pytest.fixture
+def sqlite_client(backend, client):
+    if backend != "sqlite":
+        pytest.skip("Con PostgreSQL no se archiva")
+    return client
+
+
+def _archive_everything():
+    conn = db.get_connection()
+    try:
+        db.begin_write(conn)
+        conn.execute(
+            "UPDATE orders SET created_at = '2025-01-15 10:00:00' WHERE id > 0"
+        )
+        conn.commit()
+        return archive.archive_orders(conn, days=30)
+    finally:
+        conn.close()
+
+
+def _count(sql, params=()):
+    conn = db.get_read_connection()
+    try:
+        return conn.execute(sql, params).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_archived_session_does_not_create_a_second_order(sqlite_client, fake_stripe):
+    client = sqlite_client
+    response = client.post(
+        "/api/stripe/create-checkout-session",
+        json={"items": [{"product_id": 1, "quantity": 3}], "customer_info": {}},
+    )
+    session_id = response.get_json()["session_id"]
+    fake_stripe.pay(session_id, 9900)
+    created = client.post("/api/verify-payment", json={"session_id": session_id})
+    order_number = created.get_json()["order_number"]
+
+    live = "SELECT COUNT(*) FROM orders WHERE stripe_payment_intent_id = ?"
+    assert _archive_everything()
+    assert _count(live, (session_id,)) == 0
+    orders = _count("SELECT COUNT(*) FROM orders")
+    sold = _count("SELECT SUM(quantity) FROM daily_product_sales")
+
+    response = client.post("/api/verify-payment", json={"session_id": session_id})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["order_number"] == order_number
+    assert [item["quantity"] for item in body["items"]] == [3]
+    assert _count("SELECT COUNT(*) FROM orders") == orders
+    assert _count("SELECT SUM(quantity) FROM daily_product_sales") == sold
+
+
+def test_archives_from_before_archived_payments_are_indexed(sqlite_client):
+    conn = db.get_connection()
+    db.begin_write(conn)
+    conn.execute(
+        "UPDATE orders SET stripe_payment_intent_id = 'cs_viejo_' || id WHERE id > 0"
+    )
+    conn.commit()
+    conn.close()
+    _archive_everything()
+
+    conn = db.get_connection()
+    db.begin_write(conn)
+    conn.execute("DELETE FROM archived_payments")
+    conn.commit()
+    try:
+        assert archive.find_by_payment(conn, "cs_viejo_1") == (None, [])
+        assert archive.index_payments(conn) > 0
+        order, items = archive.find_by_payment(conn, "cs_viejo_1")
+    finally:
+        conn.close()
+    assert order["id"] == 1
+    assert items
+
+
+def test_orders_not_yet_in_parquet_stay_live(sqlite_client):
+    conn = db.get_read_connection()
+    ids = [row[0] for row in conn.execute("SELECT id FROM orders ORDER BY id")]
+    conn.close()
+    mark = ids[len(ids) // 2]
+    os.makedirs(parquet_export.export_dir())
+    state = os.path.join(parquet_export.export_dir(), parquet_export.STATE_FILE)
+    with open(state, "w") as f:
+        json.dump({"last_order_id": mark}, f)
+
+    _archive_everything()
+
+    newer = sum(order_id > mark for order_id in ids)
+    assert _count("SELECT COUNT(*) FROM orders WHERE id > ?", (mark,)) == newer
+    assert _count("SELECT COUNT(*) FROM orders WHERE id <= ?", (mark,)) < (
+        len(ids) - newer
+    )
@@ -0,0 +1,218 @@
+"""Repositorios y flujos principales contra SQLite y PostgreSQL"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from tienda import db, pg
+
+ORDER = {
+    "payment_method": "cash",
+    "customer_name": "Cliente",
+    "customer_phone": "5550000000",
+    "items": [{"product_id": 1, "quantity": 2}, {"product_id": 2, "quantity": 1}],
+}
+
+
+@pytest.mark.parametrize(
+    "sql, expected",
+    [
+        ("SELECT * FROM users WHERE id = ?", "SELECT * FROM users WHERE id = %s"),
+        (
+            "INSERT INTO t (a, b) VALUES (:a, :b_2)",
+            "INSERT INTO t (a, b) VALUES (%(a)s, %(b_2)s)",
+        ),
+        ("SELECT '?' || ? || '50%'", "SELECT '?' || %s || '50%%'"),
+        ("SELECT x::text, y % 2 FROM t", "SELECT x::text, y %% 2 FROM t"),
+    ],
+)
+def test_translate_placeholders(sql, expected):
+    assert pg.translate(sql) == expected
+
+
+def test_rows_by_position_and_name(backend):
+    conn = db.get_read_connection()
+    try:
+        row = conn.execute(
+            "SELECT id, name, price_cents FROM productos WHERE id = ?", (1,)
+        ).fetchone()
+        named = conn.execute(
+            "SELECT id FROM productos WHERE id = :id", {"id": 2}
+        ).fetchone()
+    finally:
+        conn.close()
+    assert row[0] == row["id"] == 1
+    assert row["price_cents"] == row[2]
+    assert list(row.keys()) == ["id", "name", "price_cents"]
+    assert dict(row)["name"] == row[1]
+    assert named["id"] == 2
+    with pytest.raises(IndexError):
+        row["missing"]
+
+
+def test_register_login_logout(client, register):
+    headers = register("ana")
+    assert client.get("/api/auth/profile", headers=headers).get_json()["username"] == (
+        "ana"
+    )
+
+    response = client.post(
+        "/api/auth/login", json={"username": "ana", "password": "incorrecta1"}
+    )
+    assert response.status_code == 401
+    response = client.post(
+        "/api/auth/login", json={"username": "ana", "password": "secreto123"}
+    )
+    assert response.status_code == 200
+    token = {"Authorization": f"Bearer {response.get_json()['access_token']}"}
+
+    assert client.post("/api/auth/logout", headers=token).status_code == 200
+    assert client.get("/api/auth/profile", headers=token).status_code == 401
+    assert client.get("/api/auth/profile", headers=headers).status_code == 200
+
+
+def test_cart(client, register):
+    headers = register("beto")
+
+    def cart():
+        response = client.get("/api/cart", headers=headers)
+        return {item["id"]: item["quantity"] for item in response.get_json()}
+
+    response = client.post(
+        "/api/cart/add", json={"product_id": 1, "quantity": 2}, headers=headers
+    )
+    assert response.status_code == 200
+    client.post("/api/cart/add", json={"product_id": 2}, headers=headers)
+    assert cart() == {1: 2, 2: 1}
+
+    client.put(
+        "/api/cart/update", json={"product_id": 1, "quantity": 5}, headers=headers
+    )
+    client.delete("/api/cart/remove?product_id=2", headers=headers)
+    assert cart() == {1: 5}
+
+    response = client.post(
+        "/api/cart/add", json={"product_id": 1, "quantity": 10**6}, headers=headers
+    )
+    assert response.status_code == 400
+    assert cart() == {1: 5}
+
+    response = client.post(
+        "/api/cart/batch",
+        json={
+            "operations": [
+                {"op": "clear"},
+                {"op": "add", "product_id": 3, "quantity": 2},
+                {"op": "update", "product_id": 3, "quantity": 1},
+            ]
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert cart() == {3: 1}
+
+
+def test_create_order(client, register):
+    headers = register("carla")
+    client.post("/api/cart/add", json={"product_id": 1}, headers=headers)
+    products = {p["id"]: p for p in client.get("/api/products").get_json()}
+
+    response = client.post("/api/orders", json=ORDER, headers=headers)
+    assert response.status_code == 200
+    created = response.get_json()
+    assert created["total_cents"] == (
+        2 * products[1]["price_cents"] + products[2]["price_cents"]
+    )
+    # La orden vacía el carrito del usuario
+    assert client.get("/api/cart", headers=headers).get_json() == []
+
+    response = client.get(f"/api/orders/{created['order_number']}", headers=headers)
+    items = response.get_json()["items"]
+    assert {item["product_id"]: item["quantity"] for item in items} == {
+        1: 2,
+        2: 1,
+    }
+    mine = client.get("/api/orders/my-orders", headers=headers).get_json()
+    assert [o["order_number"] for o in mine] == [created["order_number"]]
+
+
+def test_invalid_client_total_is_rejected_before_writing(client, register):
+    headers = register("dora")
+    client.post("/api/cart/add", json={"product_id": 1}, headers=headers)
+    before = _count_orders()
+
+    for total in ("abc", "1e999"):
+        response = client.post(
+            "/api/orders", json=dict(ORDER, total_amount=total), headers=headers
+        )
+        assert response.status_code == 400
+    assert _count_orders() == before
+    assert len(client.get("/api/cart", headers=headers).get_json()) == 1
+
+    # Un total numérico distinto al del catálogo solo se reporta
+    response = client.post(
+        "/api/orders", json=dict(ORDER, total_amount="0.01"), headers=headers
+    )
+    assert response.status_code == 200
+    assert _count_orders() == before + 1
+
+
+def _count_orders():
+    conn = db.get_read_connection()
+    try:
+        return conn.execute("SELECT COUNT(*) FROM orders").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_concurrent_orders_with_same_idempotency_key(app):
+    """lock_key en la toma de la llave: una sola orden aunque lleguen juntas"""
+    before = _count_orders()
+
+    def post(_):
+        return app.test_client().post(
+            "/api/orders", json=ORDER, headers={"Idempotency-Key": "orden-1"}
+        )
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        responses = list(pool.map(post, range(6)))
+
+    assert {r.status_code for r in responses} <= {200, 409}
+    numbers = {r.get_json()["order_number"] for r in responses if r.status_code == 200}
+    assert len(numbers) == 1
+    assert _count_orders() == before + 1
+
+
+def test_lock_key_serializes_transactions(backend):
+    if backend == "sqlite":
+        pytest.skip("Con SQLite begin_write ya deja un solo escritor")
+
+    first = db.get_connection()
+    db.lock_key(first, "orden:cs_1")
+    acquired = threading.Event()
+
+    def second():
+        conn = db.get_connection()
+        try:
+            db.lock_key(conn, "orden:cs_1")
+            acquired.set()
+            conn.commit()
+        finally:
+            conn.close()
+
+    thread = threading.Thread(target=second)
+    thread.start()
+    try:
+        # Otra llave no espera
+        other = db.get_connection()
+        db.lock_key(other, "orden:cs_2")
+        other.close()
+        time.sleep(0.2)
+        assert not acquired.is_set()
+    finally:
+        first.commit()
+        first.close()
+    thread.join(5)
+    assert acquired.is_set()
@@ -0,0 +1,42 @@
+"""Caché del carrito (tienda.cart_cache)"""
+
+from tienda import cart_cache
+from tienda.cart_cache import CartEntry
+
+
+def _user_id(client, headers):
+    return client.get("/api/auth/profile", headers=headers).get_json()["id"]
+
+
+def test_older_load_does_not_replace_newer_entry(client, register, monkeypatch):
+    monkeypatch.setattr(cart_cache, "CART_CACHE_SHARED", False)
+    headers = register("eva")
+    user_id = _user_id(client, headers)
+    client.post("/api/cart/add", json={"product_id": 1, "quantity": 2}, headers=headers)
+    client.post("/api/cart/add", json={"product_id": 2}, headers=headers)
+
+    # Una recarga que leyó antes de la segunda mutación termina al último
+    stale = CartEntry(1, [(1, 2)])
+    cart_cache._render_entry(stale)
+    kept = cart_cache._store(user_id, stale)
+
+    assert kept is not stale
+    assert kept.version == 2
+    cart = client.get("/api/cart", headers=headers).get_json()
+    assert {item["id"]: item["quantity"] for item in cart} == {1: 2, 2: 1}
+
+
+def test_same_version_is_rerendered_for_a_new_catalog(backend, monkeypatch):
+    entry = CartEntry(3, [(1, 1)])
+    cart_cache._render_entry(entry)
+    assert cart_cache._store(7, entry) is entry
+
+    # Misma versión ya renderizada con el catálogo actual: se conserva
+    same = CartEntry(3, [(1, 1)])
+    cart_cache._render_entry(same)
+    assert cart_cache._store(7, same) is entry
+
+    # Con otro catálogo la entrada nueva sí la reemplaza
+    monkeypatch.setattr(entry, "catalog_version", "anterior")
+    assert cart_cache._store(7, same) is same
+    assert cart_cache.stats()["entries"] == 1
@@ -0,0 +1,69 @@
+"""Sesiones de Checkout guardadas en checkout_sessions"""
+
+import time
+
+from tienda import db
+from tienda.blueprints import payments
+
+CHECKOUT = {"items": [{"product_id": 1, "quantity": 2}], "customer_info": {}}
+
+
+def _checkouts():
+    conn = db.get_read_connection()
+    try:
+        return {
+            row["session_id"]: row["expires_at"]
+            for row in conn.execute(
+                "SELECT session_id, expires_at FROM checkout_sessions"
+            )
+        }
+    finally:
+        conn.close()
+
+
+def test_paid_session_is_deleted_with_the_order(client, fake_stripe):
+    session_id = client.post(
+        "/api/stripe/create-checkout-session", json=CHECKOUT
+    ).get_json()["session_id"]
+    expires_at = _checkouts()[session_id]
+    assert expires_at > time.time() + payments.CHECKOUT_SESSION_TTL - 60
+
+    fake_stripe.pay(session_id, 5000)
+    created = client.post("/api/verify-payment", json={"session_id": session_id})
+    assert created.status_code == 200
+    assert session_id not in _checkouts()
+
+    again = client.post("/api/verify-payment", json={"session_id": session_id})
+    assert again.status_code == 200
+    assert again.get_json()["order_number"] == created.get_json()["order_number"]
+    assert [item["quantity"] for item in again.get_json()["items"]] == [2]
+
+
+def test_expired_sessions_are_purged(client, fake_stripe, monkeypatch):
+    now = int(time.time())
+    conn = db.get_connection()
+    db.begin_write(conn)
+    for session_id, expires_at in (
+        ("cs_vencida", now - 10),
+        ("cs_vigente", now + 3600),
+        ("cs_anterior", None),
+    ):
+        conn.execute(
+            """
+            INSERT INTO checkout_sessions (session_id, items, total_cents, expires_at)
+            VALUES (?, '[]', 0, ?)
+        """,
+            (session_id, expires_at),
+        )
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(payments, "_last_purge", 0)
+
+    session_id = client.post(
+        "/api/stripe/create-checkout-session", json=CHECKOUT
+    ).get_json()["session_id"]
+
+    checkouts = _checkouts()
+    assert set(checkouts) == {"cs_vigente", "cs_anterior", session_id}
+    # Las filas sin vencimiento reciben uno completo desde la purga
+    assert checkouts["cs_anterior"] == checkouts[session_id]
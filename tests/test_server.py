@@ -0,0 +1,56 @@
+"""ORDER_WORKER_ID de los workers de gunicorn (tienda.server)"""
+
+import logging
+import os
+
+import pytest
+
+from tienda import order_numbers, server
+
+
+class FakeArbiter:
+    def __init__(self):
+        self.WORKERS = {}
+        self.log = logging.getLogger("gunicorn.test")
+
+
+class FakeWorker:
+    def __init__(self, pid):
+        self.pid = pid
+
+
+def _spawn(arbiter, pid):
+    worker = FakeWorker(pid)
+    server.pre_fork(arbiter, worker)
+    arbiter.WORKERS[pid] = worker
+    return worker.order_worker_id
+
+
+def test_workers_get_unique_ids_and_reuse_freed_ones(monkeypatch):
+    monkeypatch.delenv("ORDER_WORKER_ID", raising=False)
+    arbiter = FakeArbiter()
+
+    assert [_spawn(arbiter, pid) for pid in range(100, 104)] == [0, 1, 2, 3]
+    # Reinicio ordenado: los nuevos no toman ids de los que siguen vivos
+    assert [_spawn(arbiter, pid) for pid in range(200, 204)] == [4, 5, 6, 7]
+
+    del arbiter.WORKERS[101]
+    assert _spawn(arbiter, 300) == 1
+
+
+def test_base_id_and_exhaustion(monkeypatch):
+    monkeypatch.setenv("ORDER_WORKER_ID", str(order_numbers.MAX_WORKER_ID - 1))
+    arbiter = FakeArbiter()
+    assert _spawn(arbiter, 1) == order_numbers.MAX_WORKER_ID - 1
+    assert _spawn(arbiter, 2) == order_numbers.MAX_WORKER_ID
+    with pytest.raises(RuntimeError):
+        _spawn(arbiter, 3)
+
+
+def test_post_fork_sets_the_worker_id(monkeypatch):
+    monkeypatch.setenv("ORDER_WORKER_ID", "")
+    worker = FakeWorker(os.getpid())
+    worker.order_worker_id = 42
+    server.post_fork(FakeArbiter(), worker)
+    assert os.environ["ORDER_WORKER_ID"] == "42"
+    assert order_numbers._configured_worker_id() == 42
@@ -0,0 +1,109 @@
+"""stripe_catalog.sync y el checkout contra el Stripe falso"""
+
+from tienda import db, stripe_catalog
+from tienda.repositories import stripe_prices as stripe_prices_repo
+
+
+def _sync():
+    conn = db.get_connection()
+    try:
+        return stripe_catalog.sync(conn)
+    finally:
+        conn.close()
+
+
+def _mirrored():
+    conn = db.get_read_connection()
+    try:
+        return stripe_prices_repo.get_all(conn)
+    finally:
+        conn.close()
+
+
+def _count_posts(fake, path):
+    return sum(method == "POST" and p == path for method, p, _ in fake.requests)
+
+
+def test_sync_creates_a_price_per_new_product(backend, fake_stripe):
+    conn = db.get_read_connection()
+    try:
+        products = {
+            row["id"]: row["price_cents"]
+            for row in conn.execute("SELECT id, price_cents FROM productos")
+        }
+    finally:
+        conn.close()
+
+    counts = _sync()
+
+    assert counts["created"] == len(products)
+    mirrored = _mirrored()
+    assert mirrored.keys() == products.keys()
+    for product_id, row in mirrored.items():
+        price = fake_stripe.prices[row["stripe_price_id"]]
+        assert price["product"] == f"tienda-{product_id}"
+        assert price["unit_amount"] == products[product_id]
+    assert len(fake_stripe.prices) == len(products)
+
+    # Sin cambios no se vuelve a llamar a Stripe
+    calls = len(fake_stripe.requests)
+    assert sum(_sync().values()) == 0
+    assert len(fake_stripe.requests) == calls
+
+
+def test_sync_replaces_the_price_after_a_price_change(backend, fake_stripe):
+    _sync()
+    before = _mirrored()[1]
+    prices = len(fake_stripe.prices)
+    products = _count_posts(fake_stripe, "/v1/products")
+
+    conn = db.get_connection()
+    db.begin_write(conn)
+    conn.execute("UPDATE productos SET price_cents = price_cents + 150 WHERE id = 1")
+    conn.commit()
+    conn.close()
+
+    counts = _sync()
+
+    assert counts == {"created": 0, "repriced": 1, "renamed": 0, "archived": 0}
+    after = _mirrored()[1]
+    assert after["stripe_product_id"] == before["stripe_product_id"]
+    assert after["stripe_price_id"] != before["stripe_price_id"]
+    assert after["price_cents"] == before["price_cents"] + 150
+    assert fake_stripe.prices[after["stripe_price_id"]]["unit_amount"] == (
+        before["price_cents"] + 150
+    )
+    # Un solo Price nuevo y ningún Product duplicado
+    assert len(fake_stripe.prices) == prices + 1
+    assert _count_posts(fake_stripe, "/v1/products") == products
+    assert len(fake_stripe.products) == len(_mirrored())
+
+    assert stripe_catalog.price_id(1, before["price_cents"]) is None
+    assert stripe_catalog.price_id(1, after["price_cents"]) == after["stripe_price_id"]
+
+
+def test_checkout_sends_price_ids(client, fake_stripe):
+    _sync()
+    mirrored = _mirrored()
+
+    response = client.post(
+        "/api/stripe/create-checkout-session",
+        json={
+            "items": [
+                {"product_id": 1, "quantity": 2},
+                {"product_id": 2, "quantity": 1},
+            ],
+            "customer_info": {"name": "Cliente", "phone": "5550000000"},
+        },
+    )
+
+    assert response.status_code == 200, response.get_json()
+    (params,) = [
+        params
+        for method, path, params in fake_stripe.requests
+        if method == "POST" and path == "/v1/checkout/sessions"
+    ]
+    assert params["line_items[0][price]"] == mirrored[1]["stripe_price_id"]
+    assert params["line_items[0][quantity]"] == "2"
+    assert params["line_items[1][price]"] == mirrored[2]["stripe_price_id"]
+    assert not [key for key in params if "price_data" in key]
@@ -0,0 +1,166 @@
+"""Circuit breaker, bulkhead y timeout de tienda.stripe_guard"""
+
+import threading
+import time
+
+import pytest
+import stripe
+
+from tienda import admins, db, stripe_guard
+from tienda.stripe_guard import CLOSED, HALF_OPEN, OPEN, StripeUnavailable
+
+
+def _fail():
+    raise stripe.APIConnectionError("sin conexión")
+
+
+def _ok():
+    return "ok"
+
+
+@pytest.fixture
+def guard(monkeypatch):
+    """Breaker de 3 fallas que se reabre a los 0.2 s y bulkhead de 1"""
+    monkeypatch.setattr(stripe_guard, "breaker", stripe_guard.CircuitBreaker(3, 0.2))
+    monkeypatch.setattr(stripe_guard, "_bulkhead", threading.BoundedSemaphore(1))
+    monkeypatch.setattr(stripe_guard, "STRIPE_BULKHEAD_WAIT", 0.05)
+    monkeypatch.setattr(stripe_guard, "_stats", dict.fromkeys(stripe_guard._stats, 0))
+    return stripe_guard.breaker
+
+
+def test_breaker_opens_after_failures_and_closes_after_probe(guard):
+    for _ in range(2):
+        with pytest.raises(StripeUnavailable):
+            stripe_guard.call(_fail)
+    assert guard.state == CLOSED
+
+    with pytest.raises(StripeUnavailable):
+        stripe_guard.call(_fail)
+    assert guard.state == OPEN
+
+    # Abierto: ni siquiera se llama a Stripe
+    called = []
+    with pytest.raises(StripeUnavailable):
+        stripe_guard.call(called.append, 1)
+    assert called == []
+    assert stripe_guard.stats()["short_circuited"] == 1
+
+    time.sleep(0.25)
+    assert stripe_guard.call(_ok) == "ok"
+    assert guard.state == CLOSED
+    assert guard.failures == 0
+    assert guard.times_opened == 1
+
+
+def test_half_open_failure_reopens(guard):
+    for _ in range(3):
+        with pytest.raises(StripeUnavailable):
+            stripe_guard.call(_fail)
+    time.sleep(0.25)
+
+    probing = threading.Event()
+    release = threading.Event()
+
+    def probe():
+        probing.set()
+        release.wait(5)
+        _fail()
+
+    errors = []
+
+    def call_probe():
+        try:
+            stripe_guard.call(probe)
+        except StripeUnavailable as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=call_probe)
+    thread.start()
+    probing.wait(5)
+    assert guard.state == HALF_OPEN
+    # Una sola llamada de prueba a la vez
+    with pytest.raises(StripeUnavailable):
+        stripe_guard.call(_ok)
+    release.set()
+    thread.join(5)
+
+    assert len(errors) == 1
+    assert guard.state == OPEN
+    assert guard.times_opened == 2
+
+
+def test_client_errors_do_not_open_the_breaker(guard):
+    def declined():
+        raise stripe.CardError("rechazada", None, "card_declined")
+
+    for _ in range(5):
+        with pytest.raises(stripe.CardError):
+            stripe_guard.call(declined)
+    assert guard.state == CLOSED
+
+
+def test_full_bulkhead_is_rejected(guard):
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "ok"
+
+    thread = threading.Thread(target=stripe_guard.call, args=(slow,))
+    thread.start()
+    started.wait(5)
+    try:
+        with pytest.raises(StripeUnavailable):
+            stripe_guard.call(_ok)
+    finally:
+        release.set()
+        thread.join(5)
+
+    stats = stripe_guard.stats()
+    assert stats["rejected"] == 1
+    assert stats["in_flight"] == 0
+    # El rechazo no es una falla de Stripe
+    assert guard.state == CLOSED and guard.failures == 0
+    assert stripe_guard.call(_ok) == "ok"
+
+
+def test_full_bulkhead_responds_503(client, guard):
+    stripe_guard._bulkhead.acquire()
+    try:
+        response = client.post("/api/verify-payment", json={"session_id": "cs_1"})
+    finally:
+        stripe_guard._bulkhead.release()
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_slow_stripe_times_out_with_503(client, fake_stripe, monkeypatch):
+    fake_stripe.latency = 3
+    monkeypatch.setattr(stripe_guard, "STRIPE_TIMEOUT", 0.3)
+    stripe_guard.configure()
+
+    started = time.monotonic()
+    response = client.post("/api/verify-payment", json={"session_id": "cs_1"})
+    elapsed = time.monotonic() - started
+
+    assert response.status_code == 503
+    assert elapsed < 1.5
+    assert stripe_guard.stats()["failures"] == 1
+
+
+def test_metrics_require_admin(client, register):
+    assert client.get("/api/stripe/metrics").status_code == 401
+    headers = register("cliente")
+    assert client.get("/api/stripe/metrics", headers=headers).status_code == 403
+
+    headers = register("jefe")
+    conn = db.get_connection()
+    try:
+        assert admins.set_admin(conn, "jefe", True)
+    finally:
+        conn.close()
+    response = client.get("/api/stripe/metrics", headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()["state"] == CLOSED
@@ -0,0 +1 @@
+"""Componentes compartidos del backend de la tienda de abarrotes"""
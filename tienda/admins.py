@@ -0,0 +1,50 @@
+"""Permiso de administrador de los usuarios (users.is_admin).
+
+Las rutas de /api/admin/* y /api/stripe/metrics piden is_admin (ver
+blueprints/admin.py). Se otorga y se quita desde la consola, nunca desde la
+API:
+
+    python -m tienda.admins grant <username>
+    python -m tienda.admins revoke <username>
+    python -m tienda.admins list
+
+Los workers que ya tienen al usuario en caché ven el cambio al expirar su
+entrada (como máximo SESSION_CACHE_TTL segundos, ver tienda.sessions).
+"""
+
+import argparse
+
+from tienda import db
+from tienda.repositories import users
+
+
+def set_admin(conn, username, is_admin):
+    """True si el usuario existe"""
+    db.begin_write(conn)
+    changed = users.set_admin(conn, username, is_admin)
+    conn.commit()
+    return changed > 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Administradores de la tienda")
+    parser.add_argument("action", choices=("grant", "revoke", "list"))
+    parser.add_argument("username", nargs="?")
+    args = parser.parse_args()
+    if args.action != "list" and not args.username:
+        parser.error("falta username")
+
+    db.init_database()
+    conn = db.get_connection()
+    try:
+        if args.action == "list":
+            for row in users.list_admins(conn):
+                print(f"👤 {row['username']} ({row['email']})")
+        elif not set_admin(conn, args.username, args.action == "grant"):
+            raise SystemExit(f"❌ No existe el usuario {args.username}")
+        elif args.action == "grant":
+            print(f"✅ {args.username} ahora es administrador")
+        else:
+            print(f"✅ {args.username} ya no es administrador")
+    finally:
+        conn.close()
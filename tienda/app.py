@@ -0,0 +1,130 @@
+"""Fábrica de la aplicación Flask de la tienda.
+
+    from tienda.app import create_app
+    app = create_app()
+
+La API está dividida en blueprints (auth, catalog, cart, orders, payments,
+admin y frontend). Cada uno se importa solo si está habilitado, de modo que un worker
+que solo sirve el catálogo no carga stripe ni bcrypt:
+
+    TIENDA_BLUEPRINTS=catalog,frontend
+
+Variables de entorno:
+    TIENDA_BLUEPRINTS         Blueprints habilitados, separados por comas
+                              (default todos)
+    CORS_ORIGINS              Orígenes permitidos para CORS
+    JWT_SECRET_KEY            Clave para firmar los tokens
+    JWT_ACCESS_TOKEN_EXPIRES  Horas de vigencia del token (default 24)
+"""
+
+import importlib
+import os
+from datetime import timedelta
+
+from flask import Flask, jsonify, request
+from flask_cors import CORS
+from flask_jwt_extended import JWTManager
+
+from tienda import catalog, db, sessions
+
+# Orden de registro: frontend al final por su ruta catch-all
+BLUEPRINTS = {
+    "auth": "tienda.blueprints.auth",
+    "catalog": "tienda.blueprints.catalog",
+    "cart": "tienda.blueprints.cart",
+    "orders": "tienda.blueprints.orders",
+    "payments": "tienda.blueprints.payments",
+    "admin": "tienda.blueprints.admin",
+    "frontend": "tienda.blueprints.frontend",
+}
+
+
+def _load_dotenv():
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    load_dotenv()
+
+
+def enabled_blueprints(names=None):
+    """Blueprints a registrar, en el orden de BLUEPRINTS"""
+    if names is None:
+        names = os.environ.get("TIENDA_BLUEPRINTS", ",".join(BLUEPRINTS)).split(",")
+    names = {name.strip() for name in names if name.strip()}
+    unknown = names - set(BLUEPRINTS)
+    if unknown:
+        raise ValueError(f"Blueprints desconocidos: {', '.join(sorted(unknown))}")
+    return [name for name in BLUEPRINTS if name in names]
+
+
+def create_app(blueprints=None, config=None):
+    """Crear la app con los blueprints indicados (default: TIENDA_BLUEPRINTS)"""
+    # Cargar variables de entorno desde .env
+    _load_dotenv()
+
+    app = Flask("tienda", static_folder=None)
+
+    # Configuración JWT
+    app.config["JWT_SECRET_KEY"] = os.environ.get(
+        "JWT_SECRET_KEY", "dev-secret-key-CHANGE-IN-PRODUCTION"
+    )
+    app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(
+        hours=int(os.environ.get("JWT_ACCESS_TOKEN_EXPIRES", 24))
+    )
+    app.config.update(config or {})
+
+    # CORS - Permitir solo dominios específicos
+    allowed_origins = os.environ.get(
+        "CORS_ORIGINS", "http://localhost:3000,http://127.0.0.1:3000"
+    ).split(",")
+    CORS(app, origins=allowed_origins, supports_credentials=True)
+
+    app.after_request(after_request)
+    app.register_error_handler(404, not_found)
+
+    db.init_database()
+
+    # Validación de tokens (jti revocados y usuario activo) con caché en memoria;
+    # las consultas de validación y del catálogo usan conexiones de solo lectura
+    jwt = JWTManager(app)
+    sessions.init_app(jwt, db.get_read_connection)
+    catalog.init_app(db.get_catalog_connection)
+
+    app.add_url_rule("/api/health", view_func=health_check)
+
+    for name in enabled_blueprints(blueprints):
+        module = importlib.import_module(BLUEPRINTS[name])
+        if hasattr(module, "init_app"):
+            module.init_app(app)
+        app.register_blueprint(module.bp)
+
+    return app
+
+
+# Headers de seguridad HTTP
+def after_request(response):
+    """Añadir headers de seguridad a todas las respuestas"""
+    # Solo aplicar Content-Type JSON y no-store a rutas API; los archivos
+    # estáticos traen sus propias cabeceras de caché
+    if request.path.startswith("/api/"):
+        # Las exportaciones en streaming traen su propio Content-Type
+        if not response.is_streamed:
+            response.headers["Content-Type"] = "application/json; charset=utf-8"
+        response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
+        response.headers["Pragma"] = "no-cache"
+        response.headers["Expires"] = "0"
+
+    response.headers["X-Content-Type-Options"] = "nosniff"
+    response.headers["X-Frame-Options"] = "DENY"
+    response.headers["X-XSS-Protection"] = "1; mode=block"
+    return response
+
+
+def not_found(e):
+    # Sin el blueprint frontend, todas las rutas responden JSON
+    return jsonify({"error": "Endpoint no encontrado"}), 404
+
+
+def health_check():
+    return jsonify({"status": "OK", "message": "API funcionando correctamente"})
@@ -0,0 +1,367 @@
+"""Archivo de órdenes viejas en archivos SQLite por mes.
+
+orders y order_items crecen sin límite en la misma base que atiende las
+escrituras del carrito, y los respaldos, el VACUUM y los índices se vuelven
+cada vez más lentos. El archivador mueve las órdenes completadas con más de
+ORDER_ARCHIVE_DAYS días (y sus items) a un archivo por mes de creación:
+
+    <ORDER_ARCHIVE_DIR>/orders_2025_10.sqlite3
+
+    python -m tienda.archive [--days N] [--vacuum]
+
+Si se usa la exportación a Parquet (tienda.parquet_export), solo se archivan
+las órdenes que ya exportó: esa exportación lee únicamente la base principal.
+
+Cada mes se copia y se borra de la base principal en una transacción con el
+archivo adjuntado (ATTACH). Si el proceso se corta entre los dos archivos, la
+orden puede quedar en ambos: la copia se hace con INSERT OR IGNORE y las
+lecturas prefieren la base principal, así que basta con volver a correrlo.
+--vacuum compacta la base principal al final.
+
+find_order(), find_by_payment() y list_user_orders() buscan en la base
+principal y después en los archivos, adjuntándolos en modo solo lectura a la
+misma conexión (los items se unen con productos de la base principal). La
+tabla archived_order_months dice qué meses tienen órdenes de cada usuario,
+archived_payments en qué mes quedó cada sesión de Stripe cobrada, y el mes de
+una orden se saca de su número, así que casi siempre se adjunta un solo
+archivo. Los archivos creados antes de archived_payments se indexan en la
+siguiente corrida. Con PostgreSQL no se archiva: se usan solo las tablas
+principales.
+
+Variables de entorno:
+    ORDER_ARCHIVE_DIR   Carpeta de los archivos (default: archive/ junto a la base)
+    ORDER_ARCHIVE_DAYS  Antigüedad en días para archivar (default 180)
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from tienda import db, order_numbers, parquet_export
+from tienda.repositories import orders as orders_repo
+
+ORDER_ARCHIVE_DAYS = int(os.environ.get("ORDER_ARCHIVE_DAYS", 180))
+
+# SQLite admite 10 bases adjuntas por conexión
+ATTACH_LIMIT = 8
+ARCHIVE_TABLES = ("orders", "order_items")
+ARCHIVE_INDEXES = (
+    "CREATE UNIQUE INDEX IF NOT EXISTS archive.idx_orders_order_number"
+    " ON orders (order_number)",
+    "CREATE INDEX IF NOT EXISTS archive.idx_orders_user_id ON orders (user_id)",
+    "CREATE INDEX IF NOT EXISTS archive.idx_orders_created_at ON orders (created_at)",
+    "CREATE INDEX IF NOT EXISTS archive.idx_orders_stripe_payment_intent_id"
+    " ON orders (stripe_payment_intent_id)",
+    "CREATE INDEX IF NOT EXISTS archive.idx_order_items_order_id"
+    " ON order_items (order_id)",
+)
+_FILE_NAME = re.compile(r"^orders_(\d{4}_\d{2})\.sqlite3$")
+# Números anteriores a tienda.order_numbers: ORD-<segundos>-<aleatorio>
+_LEGACY_NUMBER = re.compile(r"^(\d+)(?:-\d+)?$")
+
+
+def archive_dir():
+    # Se lee en cada llamada, igual que DATABASE_PATH
+    default = os.path.join(os.path.dirname(db.database_path()), "archive")
+    return os.environ.get("ORDER_ARCHIVE_DIR", default)
+
+
+def month_path(month):
+    return os.path.join(archive_dir(), f"orders_{month}.sqlite3")
+
+
+def list_months():
+    """Meses ("YYYY_MM") con archivo, recientes primero"""
+    try:
+        names = os.listdir(archive_dir())
+    except FileNotFoundError:
+        return []
+    return sorted(
+        (match.group(1) for match in map(_FILE_NAME.match, names) if match),
+        reverse=True,
+    )
+
+
+def month_of(order_number):
+    """Mes de creación según el número de orden, o None si no se puede saber"""
+    suffix = order_number[len(order_numbers.PREFIX) :]
+    legacy = _LEGACY_NUMBER.match(suffix)
+    try:
+        if legacy:
+            seconds = int(legacy.group(1))
+        elif len(suffix) == order_numbers.LENGTH:
+            seconds = order_numbers.created_ms(order_number) / 1000
+        else:
+            return None
+        return time.strftime("%Y_%m", time.gmtime(seconds))
+    except (ValueError, OverflowError, OSError):
+        return None
+
+
+def _archived(conn):
+    """Los archivos solo existen con SQLite"""
+    return isinstance(conn, sqlite3.Connection)
+
+
+@contextmanager
+def attached(conn, months):
+    """Adjuntar los archivos de esos meses (a lo más ATTACH_LIMIT) en solo lectura"""
+    schemas = []
+    try:
+        for month in months:
+            path = month_path(month)
+            if not os.path.exists(path):
+                continue
+            schema = f"archive_{len(schemas)}"
+            conn.execute(
+                f"ATTACH DATABASE ? AS {schema}", (db.sqlite_uri(path, mode="ro"),)
+            )
+            schemas.append(schema)
+        yield schemas
+    finally:
+        for schema in schemas:
+            conn.execute(f"DETACH DATABASE {schema}")
+
+
+def _chunks(months):
+    for start in range(0, len(months), ATTACH_LIMIT):
+        yield months[start : start + ATTACH_LIMIT]
+
+
+def find_order(conn, order_number):
+    """(orden, items) buscando en la base principal y luego en los archivos;
+    (None, []) si no existe"""
+    order = orders_repo.get_by_number(conn, order_number)
+    if order is not None or not _archived(conn):
+        items = orders_repo.list_items(conn, order["id"]) if order else []
+        return order, items
+
+    months = list_months()
+    guess = month_of(order_number)
+    if guess in months:
+        # El mes del número casi siempre acierta; si no, se revisan todos
+        months.remove(guess)
+        months.insert(0, guess)
+    for chunk in _chunks(months):
+        with attached(conn, chunk) as schemas:
+            for schema in schemas:
+                order = orders_repo.get_by_number(conn, order_number, schema)
+                if order is not None:
+                    return order, orders_repo.list_items(conn, order["id"], schema)
+    return None, []
+
+
+def find_by_payment(conn, stripe_payment_intent_id):
+    """(orden, items) del pago de Stripe en la base principal o en el archivo;
+    (None, []) si no existe"""
+    order = orders_repo.find_by_payment(conn, stripe_payment_intent_id)
+    if order is not None or not _archived(conn):
+        items = orders_repo.list_items(conn, order["id"]) if order else []
+        return order, items
+
+    month = orders_repo.get_archived_payment_month(conn, stripe_payment_intent_id)
+    if month is None:
+        return None, []
+    with attached(conn, [month]) as schemas:
+        for schema in schemas:
+            order = orders_repo.find_by_payment(conn, stripe_payment_intent_id, schema)
+            if order is not None:
+                return order, orders_repo.list_items(conn, order["id"], schema)
+    return None, []
+
+
+def list_user_orders(conn, user_id):
+    """[(orden, items)] del usuario en la base principal y los archivos,
+    recientes primero"""
+    orders = [
+        (order, orders_repo.list_items(conn, order["id"]))
+        for order in orders_repo.list_for_user(conn, user_id)
+    ]
+    if not _archived(conn):
+        return orders
+
+    seen = {order["id"] for order, _ in orders}
+    months = orders_repo.list_archived_months(conn, user_id)
+    for chunk in _chunks(months):
+        with attached(conn, chunk) as schemas:
+            for schema in schemas:
+                for order in orders_repo.list_for_user(conn, user_id, schema):
+                    if order["id"] in seen:
+                        continue
+                    seen.add(order["id"])
+                    items = orders_repo.list_items(conn, order["id"], schema)
+                    orders.append((order, items))
+    orders.sort(key=lambda entry: entry[0]["created_at"] or "", reverse=True)
+    return orders
+
+
+def _ensure_schema(conn):
+    """Crear en el archivo adjunto las tablas con las columnas actuales.
+
+    Sin restricciones ni llaves foráneas: las columnas nuevas de la base
+    principal se agregan y las que ya no existen quedan en NULL.
+    """
+    for table in ARCHIVE_TABLES:
+        live = conn.execute(f"PRAGMA main.table_info({table})").fetchall()
+        archived = {
+            row["name"] for row in conn.execute(f"PRAGMA archive.table_info({table})")
+        }
+        if not archived:
+            columns = ", ".join(
+                (
+                    f"{row['name']} INTEGER PRIMARY KEY"
+                    if row["pk"]
+                    else f"{row['name']} {row['type']}"
+                )
+                for row in live
+            )
+            conn.execute(f"CREATE TABLE archive.{table} ({columns})")
+        else:
+            for row in live:
+                if row["name"] not in archived:
+                    conn.execute(
+                        f"ALTER TABLE archive.{table}"
+                        f" ADD COLUMN {row['name']} {row['type']}"
+                    )
+    for statement in ARCHIVE_INDEXES:
+        conn.execute(statement)
+
+
+def _columns(conn, table):
+    return ", ".join(
+        row["name"] for row in conn.execute(f"PRAGMA main.table_info({table})")
+    )
+
+
+def _archive_month(conn, month, order_ids):
+    os.makedirs(archive_dir(), exist_ok=True)
+    # Ruta simple: la conexión de escritura no se abre con uri=True
+    conn.execute("ATTACH DATABASE ? AS archive", (month_path(month),))
+    try:
+        db.begin_write(conn)
+        try:
+            _ensure_schema(conn)
+            conn.execute("DELETE FROM temp.archive_ids")
+            conn.executemany(
+                "INSERT INTO temp.archive_ids (id) VALUES (?)",
+                [(order_id,) for order_id in order_ids],
+            )
+            selected = "SELECT id FROM temp.archive_ids"
+            for table, key in (("orders", "id"), ("order_items", "order_id")):
+                columns = _columns(conn, table)
+                conn.execute(
+                    f"""
+                    INSERT OR IGNORE INTO archive.{table} ({columns})
+                    SELECT {columns} FROM main.{table} WHERE {key} IN ({selected})
+                """
+                )
+            conn.execute(
+                f"""
+                INSERT OR IGNORE INTO main.archived_order_months (user_id, month)
+                SELECT DISTINCT user_id, ? FROM main.orders
+                WHERE user_id IS NOT NULL AND id IN ({selected})
+            """,
+                (month,),
+            )
+            conn.execute(
+                f"""
+                INSERT OR IGNORE INTO main.archived_payments
+                    (stripe_payment_intent_id, month)
+                SELECT stripe_payment_intent_id, ? FROM main.orders
+                WHERE stripe_payment_intent_id IS NOT NULL AND id IN ({selected})
+            """,
+                (month,),
+            )
+            conn.execute(f"DELETE FROM main.order_items WHERE order_id IN ({selected})")
+            conn.execute(f"DELETE FROM main.orders WHERE id IN ({selected})")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    finally:
+        conn.execute("DETACH DATABASE archive")
+
+
+def index_payments(conn):
+    """Registrar en archived_payments los pagos de los archivos creados antes
+    de esa tabla; devuelve cuántos agregó"""
+    indexed = {
+        row[0] for row in conn.execute("SELECT DISTINCT month FROM archived_payments")
+    }
+    added = 0
+    for month in list_months():
+        if month in indexed:
+            continue
+        conn.execute("ATTACH DATABASE ? AS archive", (month_path(month),))
+        try:
+            db.begin_write(conn)
+            try:
+                added += conn.execute(
+                    """
+                    INSERT OR IGNORE INTO main.archived_payments
+                        (stripe_payment_intent_id, month)
+                    SELECT stripe_payment_intent_id, ? FROM archive.orders
+                    WHERE stripe_payment_intent_id IS NOT NULL
+                """,
+                    (month,),
+                ).rowcount
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        finally:
+            conn.execute("DETACH DATABASE archive")
+    return added
+
+
+def archive_orders(conn, days=None):
+    """Archivar las órdenes completadas con más de `days` días; devuelve
+    {mes: órdenes archivadas}"""
+    if not _archived(conn):
+        raise RuntimeError("El archivo de órdenes solo aplica a SQLite")
+    days = ORDER_ARCHIVE_DAYS if days is None else days
+    index_payments(conn)
+    # Las órdenes que Parquet aún no exporta se quedan en la base principal
+    exported = parquet_export.exported_order_id()
+    rows = conn.execute(
+        """
+        SELECT id, strftime('%Y_%m', created_at) AS month FROM orders
+        WHERE payment_status = 'completed'
+          AND created_at < datetime('now', ?)
+          AND strftime('%Y_%m', created_at) IS NOT NULL
+          AND (? IS NULL OR id <= ?)
+        ORDER BY id
+    """,
+        (f"-{days} days", exported, exported),
+    ).fetchall()
+    by_month = {}
+    for row in rows:
+        by_month.setdefault(row["month"], []).append(row["id"])
+
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS archive_ids (id INTEGER PRIMARY KEY)")
+    for month, order_ids in sorted(by_month.items()):
+        _archive_month(conn, month, order_ids)
+        print(f"📦 {len(order_ids)} órdenes archivadas en {month_path(month)}")
+    return {month: len(order_ids) for month, order_ids in by_month.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archivar órdenes completadas")
+    parser.add_argument("--days", type=int, default=ORDER_ARCHIVE_DAYS)
+    parser.add_argument("--vacuum", action="store_true")
+    args = parser.parse_args()
+
+    if db.is_postgres():
+        raise SystemExit("❌ El archivo de órdenes solo aplica a SQLite")
+    db.init_database()
+    conn = db.get_connection()
+    try:
+        archived = archive_orders(conn, args.days)
+        if archived and args.vacuum:
+            conn.execute("VACUUM")
+    finally:
+        conn.close()
+    print(f"✅ {sum(archived.values())} órdenes archivadas")
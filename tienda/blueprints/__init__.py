@@ -0,0 +1,14 @@
+"""Blueprints de la API y del frontend.
+
+Cada módulo expone `bp` y, si necesita preparar algo al registrarse,
+`init_app(app)`. tienda.app los importa solo cuando están habilitados, así que
+sus dependencias (stripe, bcrypt, Pillow) no se cargan en workers que no los
+usan.
+"""
+
+from flask import current_app
+
+
+def json_body_response(body, status=200):
+    """Responder con JSON ya serializado (bytes)"""
+    return current_app.response_class(body, status=status, mimetype="application/json")
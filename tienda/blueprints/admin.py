@@ -0,0 +1,138 @@
+"""Reportes para administradores.
+
+Los usuarios con users.is_admin pueden usar estas rutas (se otorga con
+python -m tienda.admins grant <username>); el resto recibe 403. Las ventas se
+responden desde los agregados diarios (repositories/sales.py), sin recorrer
+las órdenes:
+
+    GET /api/admin/sales/days       Órdenes e ingresos por día
+    GET /api/admin/sales/products   Productos con más ingresos (?limit=, default 20)
+    GET /api/admin/sales/suppliers  Ingresos por proveedor
+    GET /api/admin/sales/brands     Ingresos por marca
+
+Todas aceptan ?from=YYYY-MM-DD&to=YYYY-MM-DD (default: los últimos 30 días).
+
+    GET /api/admin/orders/export    Órdenes con items (tienda.export)
+
+La exportación acepta ?format=csv|jsonl (default csv), ?from, ?to (default:
+sin límite) y ?status, y se manda en streaming.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from functools import wraps
+
+from flask import Blueprint, Response, jsonify, request
+from flask_jwt_extended import get_current_user, jwt_required
+
+from tienda import export
+from tienda.db import get_read_connection
+from tienda.money import to_pesos
+from tienda.repositories import sales as sales_repo
+
+DEFAULT_DAYS = 30
+MAX_PRODUCTS = 500
+
+bp = Blueprint("admin", __name__)
+
+
+def admin_required(view):
+    """jwt_required() y además users.is_admin"""
+
+    @wraps(view)
+    @jwt_required()
+    def wrapper(*args, **kwargs):
+        if not get_current_user()["is_admin"]:
+            return jsonify({"error": "Solo para administradores"}), 403
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
+def _date_range():
+    """(desde, hasta) de la query string; ValueError si no son fechas"""
+    # El día de los agregados es el de CURRENT_TIMESTAMP (UTC en SQLite)
+    today = datetime.now(timezone.utc).date()
+    end = request.args.get("to") or today.isoformat()
+    start = (
+        request.args.get("from")
+        or (date.fromisoformat(end) - timedelta(days=DEFAULT_DAYS - 1)).isoformat()
+    )
+    # Se validan para que la comparación de texto con day sea correcta
+    return date.fromisoformat(start).isoformat(), date.fromisoformat(end).isoformat()
+
+
+def _with_revenue(row):
+    data = dict(row)
+    data["revenue"] = to_pesos(data["revenue_cents"])
+    return data
+
+
+def _sales_report(query):
+    try:
+        start, end = _date_range()
+    except ValueError:
+        return jsonify({"error": "Fechas inválidas, usar YYYY-MM-DD"}), 400
+
+    conn = get_read_connection()
+    try:
+        rows = query(conn, start, end)
+    finally:
+        conn.close()
+    return jsonify(
+        {"from": start, "to": end, "rows": [_with_revenue(row) for row in rows]}
+    )
+
+
+@bp.route("/api/admin/sales/days")
+@admin_required
+def sales_by_day():
+    return _sales_report(sales_repo.by_day)
+
+
+@bp.route("/api/admin/sales/products")
+@admin_required
+def sales_by_product():
+    limit = max(1, min(request.args.get("limit", 20, type=int), MAX_PRODUCTS))
+    return _sales_report(
+        lambda conn, start, end: sales_repo.by_product(conn, start, end, limit)
+    )
+
+
+@bp.route("/api/admin/sales/suppliers")
+@admin_required
+def sales_by_supplier():
+    return _sales_report(
+        lambda conn, start, end: sales_repo.by_group(conn, "supplier", start, end)
+    )
+
+
+@bp.route("/api/admin/sales/brands")
+@admin_required
+def sales_by_brand():
+    return _sales_report(
+        lambda conn, start, end: sales_repo.by_group(conn, "brand", start, end)
+    )
+
+
+@bp.route("/api/admin/orders/export")
+@admin_required
+def export_orders():
+    fmt = request.args.get("format", "csv")
+    if fmt not in export.FORMATS:
+        return jsonify({"error": "Formato inválido, usar csv o jsonl"}), 400
+    try:
+        start, end = export.parse_range(
+            request.args.get("from"), request.args.get("to")
+        )
+    except ValueError:
+        return jsonify({"error": "Fechas inválidas, usar YYYY-MM-DD"}), 400
+
+    body = export.export_orders(
+        get_read_connection, fmt, start, end, request.args.get("status")
+    )
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return Response(
+        body,
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename=orders.{fmt}"},
+    )
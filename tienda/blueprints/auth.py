@@ -0,0 +1,218 @@
+"""Autenticación: login, registro, perfil, cambio de contraseña y logout"""
+
+import re
+
+from flask import Blueprint, current_app, jsonify, request
+from flask_jwt_extended import get_current_user, get_jwt, jwt_required
+
+from tienda import sessions
+from tienda.db import get_connection
+from tienda.passwords import PasswordHasherBusy, hash_password, verify_password
+from tienda.rate_limit import rate_limited
+from tienda.repositories import users
+
+bp = Blueprint("auth", __name__)
+
+
+def _password_error(password):
+    """Mensaje si la contraseña no cumple las reglas, o None"""
+    if len(password) < 8:
+        return "La contraseña debe tener al menos 8 caracteres"
+
+    # Validar que tenga al menos una letra y un número
+    if not re.search(r"[a-zA-Z]", password) or not re.search(r"[0-9]", password):
+        return "La contraseña debe contener letras y números"
+    return None
+
+
+@bp.route("/api/auth/login", methods=["POST"])
+@rate_limited("login", ip_rule="20/60", user_rule="5/300")
+def login():
+    data = request.get_json()
+
+    if not data.get("username") or not data.get("password"):
+        return jsonify({"error": "Usuario y contraseña son requeridos"}), 400
+
+    username = data["username"].strip()
+    password = data["password"]
+
+    conn = get_connection()
+    user = users.find_by_username(conn, username)
+    conn.close()
+
+    if not user:
+        return jsonify({"error": "Credenciales inválidas"}), 401
+
+    # bcrypt corre en el pool de procesos, sin conexión abierta mientras tanto
+    try:
+        valid, new_hash = verify_password(password, user["password_hash"])
+    except PasswordHasherBusy:
+        return jsonify({"error": "Servicio ocupado, intenta de nuevo"}), 503
+
+    if not valid:
+        return jsonify({"error": "Credenciales inválidas"}), 401
+
+    conn = get_connection()
+
+    # Rehash transparente cuando cambió BCRYPT_ROUNDS
+    if new_hash:
+        users.update_password_hash(conn, user["id"], new_hash)
+
+    access_token = sessions.open_session(conn, user["id"])
+    conn.commit()
+    conn.close()
+
+    return (
+        jsonify(
+            {
+                "message": "Login exitoso",
+                "access_token": access_token,
+                "user": {
+                    "id": user["id"],
+                    "username": user["username"],
+                    "email": user["email"],
+                    "first_name": user["first_name"],
+                    "last_name": user["last_name"],
+                },
+            }
+        ),
+        200,
+    )
+
+
+@bp.route("/api/auth/register", methods=["POST"])
+@rate_limited("register", ip_rule="5/600")
+def register():
+    data = request.get_json()
+
+    required_fields = ["username", "email", "password", "first_name", "last_name"]
+    for field in required_fields:
+        if not data.get(field):
+            return jsonify({"error": f"El campo {field} es requerido"}), 400
+
+    username = data["username"].strip()
+    email = data["email"].strip().lower()
+    password = data["password"]
+    first_name = data["first_name"].strip()
+    last_name = data["last_name"].strip()
+
+    if len(username) < 3:
+        return jsonify({"error": "El usuario debe tener al menos 3 caracteres"}), 400
+
+    error = _password_error(password)
+    if error:
+        return jsonify({"error": error}), 400
+
+    # Validación de email con regex
+    email_regex = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
+    if not re.match(email_regex, email):
+        return jsonify({"error": "Email inválido"}), 400
+
+    conn = get_connection()
+
+    if users.exists(conn, username, email):
+        conn.close()
+        return jsonify({"error": "El usuario o email ya existe"}), 400
+
+    try:
+        password_hash = hash_password(password)
+    except PasswordHasherBusy:
+        conn.close()
+        return jsonify({"error": "Servicio ocupado, intenta de nuevo"}), 503
+
+    try:
+        user_id = users.create(
+            conn, username, email, password_hash, first_name, last_name
+        )
+        access_token = sessions.open_session(conn, user_id)
+        conn.commit()
+        conn.close()
+
+        return (
+            jsonify(
+                {
+                    "message": "Usuario registrado exitosamente",
+                    "access_token": access_token,
+                    "user": {
+                        "id": user_id,
+                        "username": username,
+                        "email": email,
+                        "first_name": first_name,
+                        "last_name": last_name,
+                    },
+                }
+            ),
+            201,
+        )
+
+    except Exception as e:
+        conn.close()
+        print(f"❌ Error en registro de usuario: {str(e)}")
+        return (
+            jsonify(
+                {
+                    "error": "Error al registrar usuario",
+                    "details": str(e) if current_app.debug else None,
+                }
+            ),
+            500,
+        )
+
+
+@bp.route("/api/auth/profile", methods=["GET"])
+@jwt_required()
+def get_profile():
+    """Obtener perfil del usuario autenticado"""
+    # El usuario viene de la caché de identidad (sin consulta a la BD)
+    return jsonify(get_current_user())
+
+
+@bp.route("/api/auth/password", methods=["POST"])
+@jwt_required()
+@rate_limited("password", ip_rule="5/300")
+def change_password():
+    """Cambiar la contraseña y cerrar las demás sesiones del usuario"""
+    data = request.get_json() or {}
+    current_password = data.get("current_password")
+    new_password = data.get("new_password")
+    if not current_password or not new_password:
+        return jsonify({"error": "Contraseña actual y nueva son requeridas"}), 400
+
+    error = _password_error(new_password)
+    if error:
+        return jsonify({"error": error}), 400
+
+    user = get_current_user()
+    conn = get_connection()
+    row = users.find_by_username(conn, user["username"])
+    conn.close()
+
+    try:
+        valid, _ = verify_password(current_password, row["password_hash"])
+        if not valid:
+            return jsonify({"error": "Contraseña actual incorrecta"}), 401
+        password_hash = hash_password(new_password)
+    except PasswordHasherBusy:
+        return jsonify({"error": "Servicio ocupado, intenta de nuevo"}), 503
+
+    conn = get_connection()
+    users.update_password_hash(conn, user["id"], password_hash)
+    sessions.revoke_user_sessions(conn, user["id"], keep_jti=get_jwt()["jti"])
+    conn.commit()
+    conn.close()
+
+    return jsonify({"message": "Contraseña actualizada"})
+
+
+@bp.route("/api/auth/logout", methods=["POST"])
+@jwt_required()
+def logout():
+    """Cerrar sesión (invalidar token)"""
+    claims = get_jwt()
+
+    conn = get_connection()
+    sessions.revoke_session(conn, int(claims["sub"]), claims["jti"], claims["exp"])
+    conn.commit()
+    conn.close()
+
+    return jsonify({"message": "Sesión cerrada exitosamente"})
@@ -0,0 +1,340 @@
+"""Carrito de compras del usuario autenticado.
+
+Las mutaciones corren en el hilo escritor (tienda.writer) y lanzan CartError
+para rechazar la operación; sus cambios se deshacen antes de responder.
+"""
+
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import get_jwt_identity, jwt_required
+
+from tienda import cart_cache, writer
+from tienda.blueprints import json_body_response
+from tienda.db import get_connection, get_read_connection
+from tienda.repositories import carts
+from tienda.repositories import catalog as catalog_repo
+
+bp = Blueprint("cart", __name__)
+
+
+def init_app(app):
+    cart_cache.init_app(get_connection, get_read_connection)
+
+
+@bp.route("/api/cart", methods=["GET"])
+@jwt_required()
+def get_cart():
+    user_id = int(get_jwt_identity())
+
+    # Caché por usuario actualizada por cada mutación (write-through)
+    return json_body_response(cart_cache.get_cart_body(user_id))
+
+
+class CartError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def _add_item(conn, user_id, product_id, quantity):
+    # Verificar que el producto existe
+    product = catalog_repo.get_stock(conn, product_id)
+    if not product:
+        raise CartError("Producto no encontrado", 404)
+
+    # Verificar stock disponible
+    current_quantity = carts.get_quantity(conn, user_id, product_id)
+    new_total_quantity = (current_quantity or 0) + quantity
+
+    if new_total_quantity > product["stock"]:
+        raise CartError("Stock insuficiente")
+
+    # Insertar o actualizar item en carrito
+    if current_quantity is not None:
+        # Si ya existe, solo actualizar cantidad
+        carts.add_quantity(conn, user_id, product_id, quantity)
+    else:
+        # Si es nuevo, va al final según order_position
+        next_order = carts.next_position(conn, user_id)
+        carts.insert_item(conn, user_id, product_id, quantity, next_order)
+
+    cart_cache.touch(conn, user_id)
+
+
+@bp.route("/api/cart/add", methods=["POST"])
+@jwt_required()
+def add_to_cart():
+    """Agregar item al carrito"""
+    user_id = int(get_jwt_identity())
+    data = request.get_json()
+
+    product_id = data.get("product_id")
+    quantity = data.get("quantity", 1)
+
+    if not product_id:
+        return jsonify({"error": "product_id es requerido"}), 400
+
+    try:
+        writer.write(_add_item, user_id, product_id, quantity)
+    except CartError as e:
+        return jsonify({"error": e.message}), e.status
+    cart_cache.refresh(user_id)
+
+    return jsonify({"message": "Producto agregado al carrito"}), 200
+
+
+def _update_item(conn, user_id, product_id, quantity):
+    if quantity <= 0:
+        # Eliminar item del carrito
+        carts.remove_item(conn, user_id, product_id)
+    else:
+        # Verificar stock
+        product = catalog_repo.get_stock(conn, product_id)
+        if not product:
+            raise CartError("Producto no encontrado", 404)
+
+        if quantity > product["stock"]:
+            raise CartError("Stock insuficiente")
+
+        # Actualizar cantidad
+        carts.set_quantity(conn, user_id, product_id, quantity)
+
+    cart_cache.touch(conn, user_id)
+
+
+@bp.route("/api/cart/update", methods=["PUT"])
+@jwt_required()
+def update_cart_quantity():
+    """Actualizar cantidad de item en carrito"""
+    user_id = int(get_jwt_identity())
+    data = request.get_json()
+
+    product_id = data.get("product_id")
+    quantity = data.get("quantity")
+
+    if not product_id or quantity is None:
+        return jsonify({"error": "product_id y quantity son requeridos"}), 400
+
+    try:
+        writer.write(_update_item, user_id, product_id, quantity)
+    except CartError as e:
+        return jsonify({"error": e.message}), e.status
+    cart_cache.refresh(user_id)
+
+    return jsonify({"message": "Carrito actualizado"}), 200
+
+
+def _remove_item(conn, user_id, product_id):
+    removed = carts.remove_item(conn, user_id, product_id)
+    if removed:
+        cart_cache.touch(conn, user_id)
+    return removed
+
+
+@bp.route("/api/cart/remove", methods=["DELETE"])
+@jwt_required()
+def remove_from_cart():
+    """Eliminar item del carrito"""
+    user_id = int(get_jwt_identity())
+    product_id = request.args.get("product_id", type=int)
+
+    if not product_id:
+        return jsonify({"error": "product_id es requerido"}), 400
+
+    if writer.write(_remove_item, user_id, product_id):
+        cart_cache.refresh(user_id)
+
+    return jsonify({"message": "Producto eliminado del carrito"}), 200
+
+
+def _sync_items(conn, user_id, local_cart):
+    db_cart_dict = carts.get_quantities(conn, user_id)
+
+    for item in local_cart:
+        product_id = item.get("id")
+        quantity = item.get("quantity", 0)
+
+        if product_id and quantity > 0:
+            product = catalog_repo.get_stock(conn, product_id)
+            if product and quantity <= product["stock"]:
+                if product_id in db_cart_dict:
+                    new_quantity = min(
+                        db_cart_dict[product_id] + quantity, product["stock"]
+                    )
+                    carts.set_quantity(conn, user_id, product_id, new_quantity)
+                else:
+                    carts.insert_item(conn, user_id, product_id, quantity)
+
+    cart_cache.touch(conn, user_id)
+
+
+@bp.route("/api/cart/sync", methods=["POST"])
+@jwt_required()
+def sync_cart():
+    user_id = int(get_jwt_identity())
+    data = request.get_json()
+
+    local_cart = data.get("cart_items", [])
+
+    writer.write(_sync_items, user_id, local_cart)
+    cart_cache.refresh(user_id)
+
+    return jsonify({"message": "Carrito sincronizado exitosamente"}), 200
+
+
+CART_BATCH_MAX_OPS = 100
+CART_BATCH_OPS = ("add", "update", "remove", "clear")
+
+
+class CartBatchError(CartError):
+    def __init__(self, index, message, status=400):
+        super().__init__(message, status)
+        self.index = index
+
+
+def apply_cart_operations(cart, stock, operations):
+    """Aplicar operaciones en orden sobre {product_id: quantity} en memoria.
+
+    Mismas reglas que /api/cart/add, /update y /remove; lanza CartBatchError
+    con el índice de la primera operación inválida.
+    """
+    for index, operation in enumerate(operations):
+        op = operation.get("op")
+        product_id = operation.get("product_id")
+        quantity = operation.get("quantity")
+
+        if op == "clear":
+            cart.clear()
+            continue
+        if not product_id:
+            raise CartBatchError(index, "product_id es requerido")
+
+        if op == "remove":
+            cart.pop(product_id, None)
+            continue
+
+        if op == "add":
+            quantity = 1 if quantity is None else quantity
+            if quantity <= 0:
+                raise CartBatchError(index, "quantity debe ser mayor a 0")
+            if product_id not in stock:
+                raise CartBatchError(index, "Producto no encontrado", 404)
+            new_quantity = cart.get(product_id, 0) + quantity
+        else:  # update
+            if quantity is None:
+                raise CartBatchError(index, "quantity es requerido")
+            if quantity <= 0:
+                cart.pop(product_id, None)
+                continue
+            if product_id not in stock:
+                raise CartBatchError(index, "Producto no encontrado", 404)
+            new_quantity = quantity
+
+        if new_quantity > stock[product_id]:
+            raise CartBatchError(index, "Stock insuficiente")
+        cart[product_id] = new_quantity
+
+
+def _apply_batch(conn, user_id, operations):
+    """Aplicar el lote como diferencia contra el carrito actual"""
+    product_ids = {op["product_id"] for op in operations if op.get("product_id")}
+
+    # Una sola consulta de stock para todo el lote
+    stock = catalog_repo.get_stocks(conn, product_ids)
+    before = carts.get_quantities(conn, user_id)
+
+    cart = dict(before)
+    apply_cart_operations(cart, stock, operations)
+
+    removed = [pid for pid in before if pid not in cart]
+    changed = [
+        (pid, quantity)
+        for pid, quantity in cart.items()
+        if pid in before and before[pid] != quantity
+    ]
+    added = [pid for pid in cart if pid not in before]
+
+    if not (removed or changed or added):
+        return False
+
+    carts.remove_items(conn, user_id, removed)
+    carts.set_quantities(conn, user_id, changed)
+    if added:
+        next_order = carts.next_position(conn, user_id)
+        carts.insert_items(
+            conn,
+            user_id,
+            [(pid, cart[pid], next_order + offset) for offset, pid in enumerate(added)],
+        )
+    cart_cache.touch(conn, user_id)
+    return True
+
+
+@bp.route("/api/cart/batch", methods=["POST"])
+@jwt_required()
+def cart_batch():
+    """Aplicar varias operaciones de carrito en una sola transacción.
+
+    Body: {"operations": [{"op": "add"|"update"|"remove"|"clear",
+                           "product_id": 1, "quantity": 2}, ...]}
+    Responde con el carrito resultante; si una operación falla no se aplica
+    ninguna y el cliente debe recargar el carrito con GET /api/cart.
+    """
+    user_id = int(get_jwt_identity())
+    data = request.get_json(silent=True) or {}
+    operations = data.get("operations")
+
+    if not isinstance(operations, list) or not operations:
+        return jsonify({"error": "operations es requerido"}), 400
+    if len(operations) > CART_BATCH_MAX_OPS:
+        return (
+            jsonify({"error": f"Máximo {CART_BATCH_MAX_OPS} operaciones por lote"}),
+            400,
+        )
+
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict) or operation.get("op") not in CART_BATCH_OPS:
+            return jsonify({"error": "Operación inválida", "index": index}), 400
+        for field in ("product_id", "quantity"):
+            value = operation.get(field)
+            if value is not None and (
+                not isinstance(value, int) or isinstance(value, bool)
+            ):
+                return jsonify({"error": f"{field} inválido", "index": index}), 400
+
+    try:
+        changed = writer.write(_apply_batch, user_id, operations)
+    except CartBatchError as e:
+        return jsonify({"error": e.message, "index": e.index}), e.status
+    if changed:
+        cart_cache.refresh(user_id)
+
+    return json_body_response(cart_cache.get_cart_body(user_id))
+
+
+def _clear_items(conn, user_id):
+    # Eliminar todos los items del carrito del usuario
+    deleted_count = carts.clear(conn, user_id)
+    cart_cache.touch(conn, user_id)
+    return deleted_count
+
+
+@bp.route("/api/cart/clear", methods=["DELETE"])
+@jwt_required()
+def clear_cart():
+    """Limpiar todo el carrito del usuario"""
+    user_id = int(get_jwt_identity())
+
+    print(f"🗑️ Backend: Clearing all cart items for user {user_id}")
+
+    deleted_count = writer.write(_clear_items, user_id)
+    cart_cache.refresh(user_id)
+
+    print(f"🗑️ Backend: Cleared {deleted_count} items from cart for user {user_id}")
+
+    return (
+        jsonify(
+            {"message": f"Carrito limpiado - {deleted_count} productos eliminados"}
+        ),
+        200,
+    )
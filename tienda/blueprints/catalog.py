@@ -0,0 +1,97 @@
+"""Catálogo de productos servido desde la caché en memoria (tienda.catalog)"""
+
+from itertools import chain
+
+from flask import Blueprint, jsonify, request
+
+from tienda import catalog, related
+from tienda.blueprints import json_body_response
+from tienda.db import get_read_connection
+
+RELATED_LIMIT = 8
+
+bp = Blueprint("catalog", __name__)
+
+
+def init_app(app):
+    # related_products no está en el snapshot inmutable del catálogo
+    related.init_app(get_read_connection)
+
+
+@bp.route("/api/products")
+def get_products():
+    snapshot = catalog.snapshot()
+
+    # Obtener parámetros de filtrado opcionales
+    supplier = request.args.get("supplier")
+    brand = request.args.get("brand")
+    min_price = request.args.get("min_price")
+    max_price = request.args.get("max_price")
+
+    # Sin filtros: JSON del catálogo ya serializado
+    if not (supplier or brand or min_price or max_price):
+        return json_body_response(snapshot.products_json)
+
+    products = snapshot.products
+    if supplier:
+        products = [p for p in products if p["supplier"] == supplier]
+    if brand:
+        products = [p for p in products if p["brand"] == brand]
+    if min_price:
+        products = [p for p in products if p["price_cents"] >= int(min_price)]
+    if max_price:
+        products = [p for p in products if p["price_cents"] <= int(max_price)]
+
+    return jsonify(products)
+
+
+@bp.route("/api/products/<int:product_id>")
+def get_product(product_id):
+    product = catalog.get_product(product_id)
+
+    if product is None:
+        return jsonify({"error": "Producto no encontrado"}), 404
+
+    return jsonify(product)
+
+
+@bp.route("/api/products/<int:product_id>/related")
+def get_related_products(product_id):
+    """Productos que se compran junto con este; si no hay historial suficiente
+    se completa con los del mismo proveedor y luego con los de la misma marca"""
+    snapshot = catalog.snapshot()
+    product = snapshot.by_id.get(product_id)
+    if product is None:
+        return jsonify({"error": "Producto no encontrado"}), 404
+    limit = max(1, min(request.args.get("limit", RELATED_LIMIT, type=int), 50))
+
+    candidates = chain(
+        (
+            snapshot.by_id.get(related_id)
+            for related_id in related.related_ids(product_id)
+        ),
+        snapshot.by_supplier.get(product["supplier"], ()),
+        snapshot.by_brand.get(product["brand"], ()),
+    )
+    results = []
+    seen = {product_id}
+    for candidate in candidates:
+        # Los ids calculados pueden ser de productos que ya no existen
+        if candidate is None or candidate["id"] in seen:
+            continue
+        seen.add(candidate["id"])
+        results.append(candidate)
+        if len(results) == limit:
+            break
+
+    return jsonify(results)
+
+
+@bp.route("/api/suppliers")
+def get_suppliers():
+    return jsonify(catalog.snapshot().suppliers)
+
+
+@bp.route("/api/brands")
+def get_brands():
+    return jsonify(catalog.snapshot().brands)
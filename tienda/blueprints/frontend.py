@@ -0,0 +1,104 @@
+"""Build de React: archivos estáticos, miniaturas e index.html.
+
+Los archivos del build se sirven con tienda.static_assets (sin la ruta static
+de Flask). Este blueprint va al final: su catch-all entrega index.html para que
+React Router maneje la navegación.
+
+Variables de entorno:
+    BUILD_DIR              Carpeta del build (default build/ en la raíz)
+    STATIC_USE_X_SENDFILE  "true" si Apache/nginx atiende X-Sendfile
+"""
+
+import os
+
+from flask import Blueprint, abort, current_app, jsonify, request
+
+from tienda import index_snapshot, static_assets, thumbnails
+from tienda.db import APP_ROOT
+
+BUILD_DIR = os.environ.get("BUILD_DIR", os.path.join(APP_ROOT, "build"))
+
+bp = Blueprint("frontend", __name__)
+
+assets = None
+thumbnail_cache = None
+index_page = None
+
+
+def init_app(app):
+    global assets, thumbnail_cache, index_page
+    if assets is None:
+        assets = static_assets.AssetManifest(BUILD_DIR)
+        thumbnail_cache = thumbnails.ThumbnailCache()
+        index_page = index_snapshot.IndexSnapshot(assets)
+
+    # Delegar archivos grandes al servidor frontal (Apache/nginx) con X-Sendfile
+    app.config["USE_X_SENDFILE"] = (
+        os.environ.get("STATIC_USE_X_SENDFILE", "false").lower() == "true"
+    )
+    app.register_error_handler(404, not_found)
+
+
+def serve_asset(rel):
+    """Servir un archivo del build desde el manifiesto en memoria"""
+    asset = assets.get(rel)
+    if asset is None:
+        abort(404)
+    return static_assets.send_asset(asset, request)
+
+
+def serve_index():
+    if assets.get("index.html") is None:
+        return jsonify({"error": "Build de React no encontrado"}), 404
+    if index_snapshot.INDEX_CATALOG_SNAPSHOT:
+        # index.html con el catálogo incrustado: el primer render no llama a la API
+        return index_snapshot.send_index(index_page.get(), request)
+    return serve_asset("index.html")
+
+
+@bp.route("/static/<path:filename>")
+def serve_static(filename):
+    return serve_asset(f"static/{filename}")
+
+
+@bp.route("/images/<path:filename>")
+def serve_images(filename):
+    return serve_asset(f"images/{filename}")
+
+
+@bp.route("/images/<int:width>/<path:filename>")
+def serve_thumbnail(width, filename):
+    """Imagen redimensionada (WebP/JPEG) para tarjetas del catálogo"""
+    asset = assets.get(f"images/{filename}")
+    if asset is None or width not in thumbnails.THUMBNAIL_SIZES:
+        abort(404)
+
+    # SVG o Pillow no disponible: servir el original
+    if not thumbnail_cache.supports(asset):
+        return static_assets.send_asset(asset, request)
+
+    return thumbnails.send_thumbnail(
+        thumbnail_cache, asset, width, request, current_app.response_class
+    )
+
+
+def not_found(e):
+    """Manejar 404 - servir React app para rutas no encontradas"""
+    # Si es una petición a /api/, devolver error JSON
+    if request.path.startswith("/api/"):
+        return jsonify({"error": "Endpoint no encontrado"}), 404
+
+    # Para cualquier otra ruta, servir index.html de React
+    return serve_index()
+
+
+@bp.route("/", defaults={"path": ""})
+@bp.route("/<path:path>")
+def serve_frontend(path):
+    """Servir aplicación React - catch-all route para React Router"""
+    # Si la ruta pide un archivo del build, servirlo (búsqueda en memoria)
+    if path and assets.get(path) is not None:
+        return serve_asset(path)
+
+    # Para todas las demás rutas, servir index.html para que React Router maneje la navegación
+    return serve_index()
@@ -0,0 +1,266 @@
+"""Órdenes: creación, historial del usuario y consulta por número de orden"""
+
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import get_jwt_identity, jwt_required
+
+from tienda import archive, cart_cache, writer
+from tienda.db import get_connection, get_read_connection
+from tienda.idempotency import idempotent
+from tienda.money import to_cents, to_pesos, with_pesos
+from tienda.order_numbers import next_order_number
+from tienda.repositories import carts
+from tienda.repositories import catalog as catalog_repo
+from tienda.repositories import orders as orders_repo
+from tienda.repositories import sales as sales_repo
+
+bp = Blueprint("orders", __name__)
+
+
+def init_app(app):
+    # create_order vacía el carrito aunque el blueprint cart esté deshabilitado
+    cart_cache.init_app(get_connection, get_read_connection)
+
+
+# Funciones de utilidad para órdenes
+class OrderError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def price_items(conn, cart_items):
+    """Precios del catálogo para [(product_id, quantity)] en una sola consulta.
+
+    Devuelve ([(product_id, quantity, unit_price_cents, total_price_cents)],
+    total_cents); lanza OrderError si algún producto no existe.
+    """
+    prices = catalog_repo.get_prices(conn, {product_id for product_id, _ in cart_items})
+    items = []
+    for product_id, quantity in cart_items:
+        if product_id not in prices:
+            raise OrderError(f"Producto no encontrado: {product_id}")
+        unit_price_cents = prices[product_id]
+        items.append(
+            (product_id, quantity, unit_price_cents, unit_price_cents * quantity)
+        )
+    return items, sum(item[3] for item in items)
+
+
+def _insert_order(conn, order, cart_items):
+    """Insertar la orden con sus items y vaciar el carrito.
+
+    El total se calcula con los precios del catálogo, no con los del cliente.
+    Devuelve (order_id, total_cents).
+    """
+    items, total_cents = price_items(conn, cart_items)
+    order_id = orders_repo.create(conn, dict(order, total_cents=total_cents))
+    orders_repo.add_items(conn, order_id, items)
+    sales_repo.record_order(conn, items)
+
+    # Limpiar carrito del usuario solo si está autenticado
+    user_id = order["user_id"]
+    if user_id and user_id != "null":
+        carts.clear(conn, int(user_id))
+        cart_cache.touch(conn, int(user_id))
+
+    return order_id, total_cents
+
+
+@bp.route("/api/orders", methods=["POST"])
+@jwt_required(optional=True)
+@idempotent("orders")
+def create_order():
+    """Crear nueva orden - PROTEGIDO CON VALIDACIONES"""
+    try:
+        data = request.get_json()
+        user_id = get_jwt_identity()  # Será None si no hay token
+
+        # Validar datos requeridos
+        required_fields = [
+            "items",
+            "payment_method",
+            "customer_name",
+            "customer_phone",
+        ]
+        for field in required_fields:
+            if not data.get(field):
+                return jsonify({"error": f"Campo requerido: {field}"}), 400
+
+        cart_items = data["items"]
+        payment_method = data["payment_method"]
+        customer_name = data["customer_name"]
+        customer_phone = data["customer_phone"]
+        customer_email = data.get("customer_email", "")
+        delivery_address = data.get("delivery_address", "")
+        order_notes = data.get("order_notes", "")
+        stripe_payment_intent_id = data.get("stripe_payment_intent_id")
+
+        # Validar carrito
+        if not cart_items or len(cart_items) == 0:
+            return jsonify({"error": "El carrito está vacío"}), 400
+
+        # Solo se toman producto y cantidad; los precios salen del catálogo
+        requested = []
+        for item in cart_items:
+            quantity = int(item.get("quantity") or 0)
+            if quantity <= 0:
+                return (
+                    jsonify(
+                        {
+                            "error": f'Cantidad inválida para item: {item.get("product_id")}'
+                        }
+                    ),
+                    400,
+                )
+            requested.append((int(item["product_id"]), quantity))
+
+        # El total del cliente ya no se usa; se valida antes de escribir para
+        # que un monto inválido no responda 400 con la orden ya creada
+        client_total_cents = None
+        if data.get("total_amount"):
+            client_total_cents = to_cents(data["total_amount"])
+
+        # Generar número de orden
+        order_number = next_order_number()
+
+        # Determinar status de pago según método
+        if payment_method == "cash":
+            payment_status = "pending"  # Pago pendiente (se paga a la entrega)
+        elif payment_method == "card":
+            payment_status = "completed"  # Pago ya completado en Stripe
+        else:
+            payment_status = "pending"
+
+        print(
+            f"📦 Creando orden {order_number} - Método: {payment_method}, Status: {payment_status}"
+        )
+
+        order = {
+            "user_id": user_id,
+            "order_number": order_number,
+            "payment_method": payment_method,
+            "payment_status": payment_status,
+            "stripe_payment_intent_id": stripe_payment_intent_id,
+            "customer_name": customer_name,
+            "customer_phone": customer_phone,
+            "customer_email": customer_email,
+            "delivery_address": delivery_address,
+            "order_notes": order_notes,
+        }
+
+        # TRANSACCIÓN: Crear orden (en la cola de escritura)
+        try:
+            order_id, total_cents = writer.write(_insert_order, order, requested)
+        except OrderError as e:
+            return jsonify({"error": e.message}), e.status
+        except Exception as db_error:
+            print(f"❌ Error de base de datos al crear orden: {db_error}")
+            raise db_error
+
+        # Desde aquí la orden ya está confirmada: se responde 200 aunque falle
+        # algo más, para que el cliente no la reintente y la duplique
+        if client_total_cents is not None and client_total_cents != total_cents:
+            print(
+                f"⚠️ Total del cliente ({data['total_amount']}) distinto al del catálogo "
+                f"({to_pesos(total_cents)}) en orden {order_number}"
+            )
+
+        if user_id and user_id != "null":
+            try:
+                cart_cache.refresh(int(user_id))
+            except Exception as e:
+                # El siguiente GET /api/cart lo vuelve a cargar
+                print(f"⚠️ No se pudo recargar el carrito en caché: {e}")
+                cart_cache.invalidate(int(user_id))
+        print(f"✅ Orden creada exitosamente: {order_number}")
+
+        return jsonify(
+            {
+                "message": "Orden creada exitosamente",
+                "order_id": order_id,
+                "order_number": order_number,
+                "total_amount": to_pesos(total_cents),
+                "total_cents": total_cents,
+                "payment_status": payment_status,
+                "success": True,
+            }
+        )
+
+    except ValueError as ve:
+        print(f"❌ Error de validación: {ve}")
+        return jsonify({"error": f"Datos inválidos: {str(ve)}"}), 400
+    except Exception as e:
+        print(f"❌ Error al crear orden: {e}")
+        import traceback
+
+        traceback.print_exc()
+        return jsonify({"error": "Error interno del servidor"}), 500
+
+
+@bp.route("/api/orders/my-orders", methods=["GET"])
+@jwt_required()
+def get_user_orders():
+    """Obtener órdenes del usuario"""
+    try:
+        user_id = get_jwt_identity()
+
+        conn = get_read_connection()
+        # Incluye las órdenes viejas movidas a los archivos por mes
+        orders = archive.list_user_orders(conn, user_id)
+
+        orders_list = []
+        for order, order_items in orders:
+            # Solo productos que siguen en el catálogo
+            items = [item for item in order_items if item["name"] is not None]
+
+            orders_list.append(
+                {
+                    "id": order["id"],
+                    "order_number": order["order_number"],
+                    "payment_method": order["payment_method"],
+                    "payment_status": order["payment_status"],
+                    "total_amount": to_pesos(order["total_cents"]),
+                    "total_cents": order["total_cents"],
+                    "customer_name": order["customer_name"],
+                    "created_at": order["created_at"],
+                    "items": [with_pesos(item) for item in items],
+                }
+            )
+
+        conn.close()
+        return jsonify(orders_list)
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@bp.route("/api/orders/<order_number>", methods=["GET"])
+@jwt_required(optional=True)
+def get_order(order_number):
+    """Obtener detalles de una orden"""
+    conn = get_read_connection()
+
+    try:
+        order, order_items = archive.find_order(conn, order_number)
+
+        # Las órdenes de usuarios registrados solo las ve su dueño
+        user_id = get_jwt_identity()
+        if not order or (
+            order["user_id"] is not None and str(order["user_id"]) != str(user_id)
+        ):
+            return jsonify({"error": "Orden no encontrada"}), 404
+
+        items = []
+        for row in order_items:
+            item = with_pesos(row)
+            item["product_name"] = item.pop("name")
+            items.append(item)
+
+        return jsonify({"order": with_pesos(order), "items": items}), 200
+
+    except Exception as e:
+        print(f"Error al obtener orden: {e}")
+        return jsonify({"error": "Error al obtener la orden"}), 500
+    finally:
+        conn.close()
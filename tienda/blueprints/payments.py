@@ -0,0 +1,521 @@
+"""Pagos con Stripe: Checkout, verificación de pago y Payment Intents.
+
+stripe solo se importa cuando este blueprint está habilitado; los workers que
+solo sirven el catálogo no lo cargan.
+
+El carrito de cada sesión de Checkout se guarda en checkout_sessions hasta que
+verify-payment crea la orden (en la misma transacción se borra) o hasta que
+vence: Stripe no deja pagar una sesión después de 24 horas, y las abandonadas
+se purgan al crear sesiones nuevas.
+
+Variables de entorno:
+    CHECKOUT_SESSION_TTL  Segundos que se guarda el carrito de una sesión
+                          de Checkout sin pagar (default 604800, 7 días)
+"""
+
+import os
+import time
+
+import stripe
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import get_jwt_identity, jwt_required
+
+from tienda import archive, catalog, db, stripe_catalog, stripe_guard, writer
+from tienda.blueprints.admin import admin_required
+from tienda.db import get_read_connection
+from tienda.idempotency import idempotent
+from tienda.money import to_cents, to_pesos, with_pesos
+from tienda.order_numbers import next_order_number
+from tienda.repositories import checkouts as checkouts_repo
+from tienda.repositories import orders as orders_repo
+from tienda.repositories import sales as sales_repo
+from tienda.stripe_guard import StripeUnavailable
+
+bp = Blueprint("payments", __name__)
+
+STRIPE_PUBLISHABLE_KEY = os.environ.get("STRIPE_PUBLISHABLE_KEY")
+CHECKOUT_SESSION_TTL = int(os.environ.get("CHECKOUT_SESSION_TTL", 7 * 86400))
+PURGE_INTERVAL = 60
+
+_last_purge = 0
+
+
+def init_app(app):
+    stripe_guard.configure()
+    stripe_catalog.init_app(get_read_connection)
+
+    # Validar que las claves de Stripe estén configuradas (solo mostrar warning, no fallar)
+    if not stripe.api_key:
+        print("WARNING: STRIPE_SECRET_KEY environment variable is not set")
+    if not STRIPE_PUBLISHABLE_KEY:
+        print("WARNING: STRIPE_PUBLISHABLE_KEY environment variable is not set")
+
+
+def _unavailable(error):
+    """503 rápido cuando Stripe no está disponible (ver tienda.stripe_guard)"""
+    print(f"⚠️ {error}")
+    response = jsonify(
+        {"error": "Pagos no disponibles, intenta de nuevo en un momento"}
+    )
+    response.status_code = 503
+    response.headers["Retry-After"] = str(error.retry_after)
+    return response
+
+
+@bp.route("/api/stripe/config", methods=["GET"])
+def get_stripe_config():
+    """Obtener clave pública de Stripe"""
+    return jsonify({"publicKey": STRIPE_PUBLISHABLE_KEY})
+
+
+@bp.route("/api/stripe/metrics", methods=["GET"])
+@admin_required
+def get_stripe_metrics():
+    """Estado del circuit breaker y del bulkhead de Stripe en este proceso
+    (solo administradores)"""
+    return jsonify(stripe_guard.stats())
+
+
+def _save_checkout(conn, session_id, items, total_cents, customer):
+    """Guardar el carrito de la sesión y, cada PURGE_INTERVAL, borrar los
+    vencidos"""
+    global _last_purge
+    now = int(time.time())
+    checkouts_repo.create(
+        conn, session_id, items, total_cents, customer, now + CHECKOUT_SESSION_TTL
+    )
+    if now - _last_purge >= PURGE_INTERVAL:
+        _last_purge = now
+        checkouts_repo.purge(conn, now, now + CHECKOUT_SESSION_TTL)
+
+
+@bp.route("/api/stripe/create-checkout-session", methods=["POST"])
+@idempotent("checkout")
+def create_checkout_session():
+    """Crear sesión de Stripe Checkout con precios del catálogo.
+
+    Del cliente solo se toman product_id y quantity; nombre, imagen y precio
+    salen del caché del catálogo. El carrito cobrado se guarda en
+    checkout_sessions (la metadata de Stripe limita cada valor a 500
+    caracteres) y verify-payment crea la orden a partir de ahí.
+    """
+    data = request.get_json()
+
+    try:
+        print(f"📦 Datos recibidos para crear sesión: {data}")
+
+        # Extraer datos del pedido
+        items = data.get("items", [])
+        customer_info = data.get("customer_info", {})
+
+        # Validar que hay items
+        if not items:
+            return jsonify({"error": "No hay items en el carrito"}), 400
+
+        # Precios y nombres del catálogo en memoria (un solo snapshot)
+        products = catalog.snapshot().by_id
+
+        # Preparar line_items para Stripe
+        line_items = []
+        checkout_items = []
+        total_cents = 0
+
+        for item in items:
+            try:
+                product_id = int(item.get("product_id", item.get("id")))
+                quantity = int(item.get("quantity", 1))
+            except (TypeError, ValueError):
+                return jsonify({"error": f"Item inválido: {item}"}), 400
+            if quantity <= 0:
+                return (
+                    jsonify({"error": f"Cantidad inválida para item: {product_id}"}),
+                    400,
+                )
+            product = products.get(product_id)
+            if product is None:
+                return (
+                    jsonify({"error": f"Producto no encontrado: {product_id}"}),
+                    400,
+                )
+
+            # Price ya sincronizado (python -m tienda.stripe_catalog) o en línea
+            price_id = stripe_catalog.price_id(product_id, product["price_cents"])
+            if price_id:
+                line_items.append({"price": price_id, "quantity": quantity})
+            else:
+                line_items.append(
+                    {
+                        "price_data": {
+                            "currency": stripe_catalog.CURRENCY,
+                            "product_data": {
+                                "name": product["name"],
+                                # NOTA: No incluir 'images' porque Stripe requiere URLs absolutas válidas
+                                # y nuestras imágenes son paths relativos (/images/products/...)
+                                "metadata": {"product_id": str(product_id)},
+                            },
+                            "unit_amount": product["price_cents"],
+                        },
+                        "quantity": quantity,
+                    }
+                )
+
+            # Guardar el carrito cobrado para después crear la orden
+            checkout_items.append(
+                {
+                    "product_id": product_id,
+                    "name": product["name"],
+                    "image": product["image"],
+                    "quantity": quantity,
+                    "unit_price_cents": product["price_cents"],
+                }
+            )
+            total_cents += product["price_cents"] * quantity
+
+        mirrored = sum("price" in line_item for line_item in line_items)
+        print(
+            f"🛒 Items para Stripe: {len(line_items)} productos "
+            f"({mirrored} con Price sincronizado)"
+        )
+
+        customer = {
+            "customer_name": customer_info.get("name", ""),
+            "customer_email": customer_info.get("email", ""),
+            "customer_phone": customer_info.get("phone", ""),
+            "delivery_address": customer_info.get("address", ""),
+            "order_notes": customer_info.get("notes", ""),
+        }
+
+        # Crear sesión de Checkout
+        # URLs fijas para desarrollo local - Flask sirve React en puerto 5000
+        # Stripe documentation: https://stripe.com/docs/api/checkout/sessions/create
+
+        success_url_str = (
+            "http://127.0.0.1:5000/checkout/success?session_id={CHECKOUT_SESSION_ID}"
+        )
+        cancel_url_str = "http://127.0.0.1:5000/checkout/cancel"
+
+        print(f"📍 About to create session with URLs:")
+        print(f"   Success: {success_url_str}")
+        print(f"   Cancel: {cancel_url_str}")
+
+        checkout_session = stripe_guard.call(
+            stripe.checkout.Session.create,
+            payment_method_types=["card"],
+            line_items=line_items,
+            mode="payment",
+            success_url=success_url_str,
+            cancel_url=cancel_url_str,
+            # Solo para consultarla en el dashboard de Stripe
+            metadata=customer,
+        )
+
+        writer.write(
+            _save_checkout,
+            checkout_session.id,
+            checkout_items,
+            total_cents,
+            customer,
+        )
+
+        print(f"✅ Sesión creada: {checkout_session.id}")
+
+        return (
+            jsonify({"url": checkout_session.url, "session_id": checkout_session.id}),
+            200,
+        )
+
+    except StripeUnavailable as e:
+        return _unavailable(e)
+    except stripe.StripeError as e:
+        print(f"❌ Error de Stripe: {e}")
+        return jsonify({"error": f"Error de Stripe: {str(e)}"}), 400
+    except Exception as e:
+        print(f"❌ Error al crear sesión de Checkout: {e}")
+        import traceback
+
+        traceback.print_exc()
+        return jsonify({"error": "Error al crear sesión de Checkout"}), 500
+
+
+ORDER_ITEM_FIELDS = (
+    "product_id",
+    "quantity",
+    "unit_price",
+    "total_price",
+    "unit_price_cents",
+    "total_price_cents",
+    "name",
+    "image",
+)
+
+
+def _existing_order_response(existing_order, items):
+    return jsonify(
+        {
+            "success": True,
+            "order_number": existing_order["order_number"],
+            "order_id": existing_order["id"],
+            "total_amount": to_pesos(existing_order["total_cents"]),
+            "total_cents": existing_order["total_cents"],
+            "customer_name": existing_order["customer_name"],
+            "customer_phone": existing_order["customer_phone"],
+            "customer_email": existing_order["customer_email"],
+            "delivery_address": existing_order["delivery_address"],
+            "items": [
+                {field: item[field] for field in ORDER_ITEM_FIELDS}
+                for item in map(with_pesos, items)
+            ],
+            "message": "Orden ya procesada (recuperada)",
+        }
+    )
+
+
+def _insert_paid_order(conn, order, items_data):
+    """Insertar la orden pagada; None si otra petición ya la creó"""
+    # Se vuelve a revisar dentro de la transacción: dos verificaciones
+    # simultáneas de la misma sesión pasan ambas la revisión previa
+    payment_id = order["stripe_payment_intent_id"]
+    db.lock_key(conn, payment_id)
+    if orders_repo.find_by_payment(conn, payment_id):
+        return None
+    if orders_repo.get_archived_payment_month(conn, payment_id):
+        # Ya se movió al archivo de órdenes (ver tienda.archive)
+        return None
+
+    order_id = orders_repo.create(
+        conn, dict(order, payment_method="card", payment_status="completed")
+    )
+
+    # Insertar items de la orden
+    order_items = []
+    for item_info in items_data:
+        unit_price_cents = item_info["unit_price_cents"]
+        total_price_cents = unit_price_cents * item_info["quantity"]
+        order_items.append(
+            {
+                "product_id": item_info["product_id"],
+                "name": item_info.get("name", "Producto"),
+                "quantity": item_info["quantity"],
+                "unit_price": to_pesos(unit_price_cents),
+                "total_price": to_pesos(total_price_cents),
+                "unit_price_cents": unit_price_cents,
+                "total_price_cents": total_price_cents,
+                "image": item_info.get("image"),
+            }
+        )
+    items = [
+        (
+            item["product_id"],
+            item["quantity"],
+            item["unit_price_cents"],
+            item["total_price_cents"],
+        )
+        for item in order_items
+    ]
+    orders_repo.add_items(conn, order_id, items)
+    sales_repo.record_order(conn, items)
+    # El carrito guardado ya no se necesita: la orden responde los reintentos
+    checkouts_repo.delete(conn, payment_id)
+
+    return order_id, order_items
+
+
+@bp.route("/api/verify-payment", methods=["POST"])
+def verify_stripe_payment():
+    """Verificar pago de Stripe y crear orden - PROTEGIDO CONTRA DUPLICADOS"""
+    conn = None
+    try:
+        data = request.get_json()
+        session_id = data.get("session_id")
+
+        if not session_id:
+            return jsonify({"error": "session_id requerido"}), 400
+
+        print(f"🔍 Verificando sesión de Stripe: {session_id}")
+
+        # CRÍTICO: Verificar si ya existe una orden con este session_id,
+        # también entre las archivadas
+        conn = get_read_connection()
+        existing_order, existing_items = archive.find_by_payment(conn, session_id)
+
+        if existing_order:
+            print(
+                f"⚠️ Orden ya existe para session_id: {session_id} - Retornando orden existente"
+            )
+            return _existing_order_response(existing_order, existing_items)
+
+        # Obtener sesión de Stripe
+        session = stripe_guard.call(stripe.checkout.Session.retrieve, session_id)
+
+        if session.payment_status != "paid":
+            return jsonify({"error": "Pago no completado"}), 400
+
+        # Carrito y cliente guardados al crear la sesión
+        checkout = checkouts_repo.get(conn, session_id)
+        if checkout:
+            items_data = checkout["items"]
+            customer = {
+                column: checkout[column] or ""
+                for column in checkouts_repo.CUSTOMER_COLUMNS
+            }
+        else:
+            # Sesiones creadas antes de checkout_sessions: line_items de Stripe
+            line_items = stripe_guard.call(
+                stripe.checkout.Session.list_line_items, session_id
+            )
+            items_data = [
+                {
+                    "product_id": 1,  # ID genérico si no tenemos el carrito
+                    "name": item.description,
+                    "quantity": item.quantity,
+                    "unit_price_cents": item.price.unit_amount,
+                }
+                for item in line_items.data
+            ]
+            metadata = session.metadata or {}
+            customer = {
+                column: metadata.get(column, "")
+                for column in checkouts_repo.CUSTOMER_COLUMNS
+            }
+        if not customer["customer_email"] and session.customer_details:
+            customer["customer_email"] = session.customer_details.email
+
+        # Generar número de orden único
+        order_number = next_order_number()
+
+        # Total cobrado por Stripe (ya viene en centavos)
+        total_cents = session.amount_total
+
+        # TRANSACCIÓN: Insertar orden e items (en la cola de escritura)
+        try:
+            # Insertar orden
+            print(f"📝 Insertando orden con datos:")
+            print(f"   order_number: {order_number}")
+            print(f"   payment_method: card")
+            print(f"   payment_status: completed")
+            print(f"   total_cents: {total_cents}")
+            print(f"   session_id: {session_id}")
+            for column, value in customer.items():
+                print(f"   {column}: {value}")
+
+            created = writer.write(
+                _insert_paid_order,
+                {
+                    "order_number": order_number,
+                    "total_cents": total_cents,
+                    "stripe_payment_intent_id": session_id,
+                    **customer,
+                },
+                items_data,
+            )
+        except Exception as db_error:
+            print(f"❌ Error de base de datos: {db_error}")
+            raise db_error
+
+        if created is None:
+            print(f"⚠️ Orden creada en paralelo para session_id: {session_id}")
+            return _existing_order_response(*archive.find_by_payment(conn, session_id))
+
+        order_id, order_items = created
+        print(f"✅ Orden creada exitosamente: {order_number}")
+
+        return jsonify(
+            {
+                "success": True,
+                "order_number": order_number,
+                "order_id": order_id,
+                "total_amount": to_pesos(total_cents),
+                "total_cents": total_cents,
+                "customer_name": customer["customer_name"],
+                "customer_phone": customer["customer_phone"],
+                "customer_email": customer["customer_email"],
+                "delivery_address": customer["delivery_address"],
+                "items": order_items,
+                "message": "Pago verificado y orden creada exitosamente",
+            }
+        )
+
+    except StripeUnavailable as e:
+        return _unavailable(e)
+    except stripe.StripeError as e:
+        print(f"❌ Error de Stripe: {e}")
+        import traceback
+
+        traceback.print_exc()
+        return jsonify({"error": f"Error de Stripe: {str(e)}"}), 500
+    except Exception as e:
+        print(f"❌ Error al verificar pago: {e}")
+        import traceback
+
+        traceback.print_exc()
+        return jsonify({"error": "Error interno del servidor"}), 500
+    finally:
+        if conn:
+            conn.close()
+
+
+@bp.route("/api/orders/create-payment-intent", methods=["POST"])
+@jwt_required()
+def create_payment_intent():
+    """Crear Payment Intent para Stripe"""
+    try:
+        data = request.get_json()
+        amount = data.get("amount")  # En pesos
+        currency = data.get("currency", "mxn")
+
+        if not amount or amount <= 0:
+            return jsonify({"error": "Monto inválido"}), 400
+
+        # Crear Payment Intent
+        intent = stripe_guard.call(
+            stripe.PaymentIntent.create,
+            amount=to_cents(amount),  # Stripe maneja centavos
+            currency=currency,
+            metadata={
+                "user_id": get_jwt_identity(),
+                "integration_check": "accept_a_payment",
+            },
+        )
+
+        return jsonify(
+            {"client_secret": intent.client_secret, "payment_intent_id": intent.id}
+        )
+
+    except StripeUnavailable as e:
+        return _unavailable(e)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@bp.route("/api/orders/confirm-payment", methods=["POST"])
+@jwt_required()
+def confirm_payment():
+    """Confirmar pago de Stripe"""
+    try:
+        data = request.get_json()
+        payment_intent_id = data.get("payment_intent_id")
+        order_id = data.get("order_id")
+
+        if not payment_intent_id or not order_id:
+            return jsonify({"error": "Datos de pago faltantes"}), 400
+
+        # Verificar el pago con Stripe
+        intent = stripe_guard.call(stripe.PaymentIntent.retrieve, payment_intent_id)
+
+        if intent.status == "succeeded":
+            # Actualizar estado de la orden
+            writer.write(orders_repo.mark_paid, order_id, payment_intent_id)
+
+            return jsonify(
+                {
+                    "message": "Pago confirmado exitosamente",
+                    "payment_status": "completed",
+                }
+            )
+        else:
+            return jsonify({"error": "El pago no fue completado"}), 400
+
+    except StripeUnavailable as e:
+        return _unavailable(e)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
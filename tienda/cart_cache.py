@@ -0,0 +1,183 @@
+"""Caché por usuario del carrito con actualización write-through.
+
+GET /api/cart hacía un JOIN entre cart_items y productos en cada llamada, y el
+frontend lo llama después de cada cambio. Aquí cada usuario tiene su lista de
+(product_id, quantity) y el JSON de respuesta ya serializado; los datos del
+producto salen de la caché del catálogo.
+
+Cada mutación del carrito incrementa cart_versions.version dentro de su
+transacción (touch) y, tras el commit, vuelve a cargar el carrito en la caché
+(reload, o refresh si la mutación corrió en la cola de escritura). Con varios workers (CART_CACHE_SHARED=true, default) un GET valida
+la versión con una lectura por llave primaria; con un solo proceso se puede
+desactivar y el GET queda en una búsqueda en diccionario. Una recarga nunca
+reemplaza una entrada con versión mayor, así que dos mutaciones que terminan
+en desorden no dejan en caché el carrito viejo.
+
+Variables de entorno:
+    CART_CACHE_MAX_BYTES  Memoria máxima de JSON cacheado (default 16 MB)
+    CART_CACHE_SHARED     "false" si hay un único worker (default true)
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+from tienda import catalog
+from tienda.repositories import carts
+
+CART_CACHE_MAX_BYTES = int(os.environ.get("CART_CACHE_MAX_BYTES", 16 * 1024 * 1024))
+CART_CACHE_SHARED = os.environ.get("CART_CACHE_SHARED", "true").lower() != "false"
+
+# Costo aproximado de la entrada además del JSON
+ENTRY_OVERHEAD = 256
+
+_get_connection = None
+_get_read_connection = None
+_entries = OrderedDict()
+_size = 0
+_lock = threading.Lock()
+
+
+class CartEntry:
+    def __init__(self, version, items):
+        self.version = version
+        self.items = items
+        self.catalog_version = None
+        self.body = b""
+
+    @property
+    def size(self):
+        return len(self.body) + ENTRY_OVERHEAD
+
+
+def init_app(get_connection, get_read_connection=None):
+    global _get_connection, _get_read_connection
+    _get_connection = get_connection
+    # Las lecturas del GET no necesitan la conexión de escritura
+    _get_read_connection = get_read_connection or get_connection
+
+
+def render(items):
+    """Construir el JSON del carrito con los datos del catálogo en caché"""
+    products = catalog.snapshot().by_id
+    cart_data = []
+    for product_id, quantity in items:
+        product = products.get(product_id)
+        if product is None:
+            # Igual que el JOIN anterior: se omiten productos inexistentes
+            continue
+        cart_data.append(
+            {
+                "id": product_id,
+                "name": product["name"],
+                "description": product["description"],
+                "price_cents": product["price_cents"],
+                "image": product["image"],
+                "brand": product["brand"],
+                "weight": product["weight"],
+                "stock": product["stock"],
+                "quantity": quantity,
+            }
+        )
+    return catalog.dumps(cart_data)
+
+
+def _newer(previous, entry):
+    """True si la entrada en caché es al menos tan nueva como la recién armada"""
+    if previous.version != entry.version:
+        return previous.version > entry.version
+    # Misma versión: solo se reemplaza para re-renderizar con el catálogo actual
+    return previous.catalog_version == catalog.version()
+
+
+def _store(user_id, entry):
+    """Guardar la entrada salvo que la de caché sea más nueva; devuelve la que
+    queda. Dos recargas simultáneas pueden terminar en desorden, y la lectura
+    vieja no debe pisar a la nueva."""
+    global _size
+    with _lock:
+        previous = _entries.get(user_id)
+        if previous is not None:
+            if _newer(previous, entry):
+                return previous
+            del _entries[user_id]
+            _size -= previous.size
+        _entries[user_id] = entry
+        _size += entry.size
+        while _size > CART_CACHE_MAX_BYTES and len(_entries) > 1:
+            _, evicted = _entries.popitem(last=False)
+            _size -= evicted.size
+        return entry
+
+
+def _load(conn, user_id):
+    # Leer primero la versión: si otro worker escribe entre ambas lecturas, la
+    # entrada queda con una versión vieja y se recarga en el siguiente GET
+    version = carts.get_version(conn, user_id)
+    entry = CartEntry(version, carts.list_items(conn, user_id))
+    _render_entry(entry)
+    return _store(user_id, entry)
+
+
+def _render_entry(entry):
+    entry.catalog_version = catalog.version()
+    entry.body = render(entry.items)
+
+
+def get_cart_body(user_id):
+    """JSON del carrito del usuario, desde caché cuando está vigente"""
+    with _lock:
+        entry = _entries.get(user_id)
+        if entry is not None:
+            _entries.move_to_end(user_id)
+
+    conn = None
+    if entry is not None and CART_CACHE_SHARED:
+        conn = _get_read_connection()
+        if carts.get_version(conn, user_id) != entry.version:
+            entry = None
+
+    if entry is None:
+        conn = conn or _get_read_connection()
+        entry = _load(conn, user_id)
+    elif entry.catalog_version != catalog.version():
+        # Cambiaron precios o stock: re-renderizar sin tocar la BD
+        entry = CartEntry(entry.version, entry.items)
+        _render_entry(entry)
+        entry = _store(user_id, entry)
+
+    if conn is not None:
+        conn.close()
+    return entry.body
+
+
+def touch(conn, user_id):
+    """Marcar el carrito como modificado; llamar dentro de la transacción"""
+    carts.touch(conn, user_id)
+
+
+def reload(conn, user_id):
+    """Actualizar la caché tras el commit de una mutación"""
+    _load(conn, user_id)
+
+
+def refresh(user_id):
+    """Como reload, para mutaciones hechas en otra conexión (tienda.writer)"""
+    conn = _get_read_connection()
+    try:
+        _load(conn, user_id)
+    finally:
+        conn.close()
+
+
+def invalidate(user_id):
+    global _size
+    with _lock:
+        entry = _entries.pop(user_id, None)
+        if entry is not None:
+            _size -= entry.size
+
+
+def stats():
+    with _lock:
+        return {"entries": len(_entries), "bytes": _size}
@@ -0,0 +1,113 @@
+"""Caché en memoria del catálogo de productos.
+
+La tabla productos cambia pocas veces (scripts de actualización), pero cada
+visita consulta /api/products. El catálogo completo se mantiene en memoria
+como un snapshot inmutable junto con su JSON ya serializado; los lectores
+nunca toman locks.
+
+El snapshot se recarga cuando pasan CATALOG_CACHE_TTL segundos (default 30).
+Su versión es un hash del contenido, de modo que los consumidores (carritos
+cacheados, snapshots HTML) detectan cambios comparando versiones.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from tienda.repositories import catalog as catalog_repo
+
+CATALOG_CACHE_TTL = int(os.environ.get("CATALOG_CACHE_TTL", 30))
+
+_get_connection = None
+_snapshot = None
+_reload_lock = threading.Lock()
+_listeners = []
+
+
+def _reset_after_fork():
+    global _reload_lock
+    _reload_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    # Un hijo que nace mientras otro hilo recarga heredaría el lock tomado y
+    # snapshot() nunca volvería a recargar
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+class CatalogSnapshot:
+    """Vista inmutable del catálogo en un instante"""
+
+    def __init__(self, products):
+        self.products = products
+        self.by_id = {product["id"]: product for product in products}
+        self.products_json = dumps(products)
+        self.version = hashlib.sha1(self.products_json).hexdigest()[:12]
+        self.suppliers = sorted({product["supplier"] for product in products})
+        self.brands = sorted({product["brand"] for product in products})
+        self.by_supplier = _group_by(products, "supplier")
+        self.by_brand = _group_by(products, "brand")
+        self.loaded_at = time.monotonic()
+
+
+def _group_by(products, field):
+    groups = {}
+    for product in products:
+        groups.setdefault(product[field], []).append(product)
+    return groups
+
+
+def dumps(data):
+    """Serializar a JSON compacto en UTF-8"""
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def init_app(get_connection):
+    global _get_connection
+    _get_connection = get_connection
+
+
+def add_listener(fn):
+    """Registrar fn(snapshot) para cuando cambie la versión del catálogo"""
+    _listeners.append(fn)
+
+
+def _load():
+    conn = _get_connection()
+    rows = catalog_repo.list_products(conn)
+    conn.close()
+    return CatalogSnapshot([dict(row) for row in rows])
+
+
+def refresh():
+    """Recargar el catálogo desde la base de datos y notificar si cambió"""
+    global _snapshot
+    with _reload_lock:
+        previous = _snapshot
+        _snapshot = _load()
+    if previous is None or previous.version != _snapshot.version:
+        for listener in _listeners:
+            listener(_snapshot)
+    return _snapshot
+
+
+def snapshot():
+    """Snapshot vigente; lo recarga si expiró el TTL"""
+    current = _snapshot
+    if current is None:
+        return refresh()
+    if time.monotonic() - current.loaded_at >= CATALOG_CACHE_TTL:
+        # Un solo hilo recarga; el resto sigue sirviendo el snapshot anterior
+        if not _reload_lock.locked():
+            return refresh()
+    return current
+
+
+def version():
+    return snapshot().version
+
+
+def get_product(product_id):
+    return snapshot().by_id.get(product_id)
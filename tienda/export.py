@@ -0,0 +1,250 @@
+"""Exportación de órdenes con sus items en CSV o JSONL para contabilidad.
+
+Las filas se leen con fetchmany en lotes de EXPORT_BATCH_SIZE y se escriben a
+medida que llegan, así que exportar un año de órdenes usa la misma memoria
+que exportar un día. El filtro de fechas usa el índice de orders.created_at.
+
+- CSV: una fila por item, con los datos de la orden repetidos.
+- JSONL: una línea por orden, con sus items en "items".
+
+Incluye las órdenes movidas a los archivos por mes (tienda.archive): cada mes
+archivado se adjunta solo mientras se exporta ese mes y sus filas se
+intercalan por fecha con las de la base principal.
+
+    python -m tienda.export [--format csv|jsonl] [--from 2025-01-01]
+                            [--to 2025-12-31] [--status completed] [-o archivo]
+
+También en GET /api/admin/orders/export (blueprint admin).
+
+Variables de entorno:
+    EXPORT_BATCH_SIZE  Filas por fetchmany (default 1000)
+"""
+
+import argparse
+import csv
+import heapq
+import io
+import json
+import os
+import sqlite3
+import sys
+from datetime import date, timedelta
+
+from tienda import archive, db
+from tienda.money import PESOS_FIELDS, to_pesos
+
+EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", 1000))
+FORMATS = ("csv", "jsonl")
+
+ORDER_FIELDS = (
+    "order_id",
+    "order_number",
+    "created_at",
+    "payment_method",
+    "payment_status",
+    "total_cents",
+    "customer_name",
+    "customer_phone",
+    "customer_email",
+    "delivery_address",
+)
+ITEM_FIELDS = (
+    "product_id",
+    "product_name",
+    "quantity",
+    "unit_price_cents",
+    "total_price_cents",
+)
+CSV_FIELDS = (
+    ORDER_FIELDS[:6]
+    + ("total_amount",)
+    + ORDER_FIELDS[6:]
+    + ITEM_FIELDS
+    + ("unit_price", "total_price")
+)
+
+
+def _query(start, end, status, schema=None):
+    prefix = f"{schema}." if schema else ""
+    where, params = [], []
+    if start:
+        where.append("o.created_at >= ?")
+        params.append(start)
+    if end:
+        where.append("o.created_at < ?")
+        params.append(end)
+    if status:
+        where.append("o.payment_status = ?")
+        params.append(status)
+    sql = f"""
+        SELECT o.id AS order_id, o.order_number, o.created_at, o.payment_method,
+               o.payment_status, o.total_cents, o.customer_name,
+               o.customer_phone, o.customer_email, o.delivery_address,
+               oi.product_id, p.name AS product_name, oi.quantity,
+               oi.unit_price_cents, oi.total_price_cents
+        FROM {prefix}orders o
+        LEFT JOIN {prefix}order_items oi ON oi.order_id = o.id
+        LEFT JOIN productos p ON p.id = oi.product_id
+        {"WHERE " + " AND ".join(where) if where else ""}
+        ORDER BY o.created_at, o.id, oi.id
+    """
+    return sql, params
+
+
+def _fetch(cursor):
+    try:
+        while True:
+            rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+            if not rows:
+                return
+            yield from rows
+    finally:
+        cursor.close()
+
+
+def _rows(conn, start, end, status, schema=None):
+    sql, params = _query(start, end, status, schema)
+    return _fetch(db.stream(conn, sql, params))
+
+
+def _month_bounds(month):
+    year, number = map(int, month.split("_"))
+    first = date(year, number, 1)
+    following = (first + timedelta(days=31)).replace(day=1)
+    return first.isoformat(), following.isoformat()
+
+
+def order_rows(conn, start=None, end=None, status=None):
+    """Filas orden + item con created_at en [start, end), ordenadas por fecha.
+
+    start y end son fechas "YYYY-MM-DD" o None (sin límite).
+    """
+    if not isinstance(conn, sqlite3.Connection):
+        yield from _rows(conn, start, end, status)
+        return
+
+    low, high = start or "", end or "9999-12-31"
+    cursor = low
+    for month in sorted(archive.list_months()):
+        first, following = _month_bounds(month)
+        segment_start, segment_end = max(low, first), min(high, following)
+        if segment_start >= segment_end:
+            continue
+        if cursor < segment_start:
+            yield from _rows(conn, cursor or None, segment_start, status)
+        with archive.attached(conn, [month]) as schemas:
+            parts = [_rows(conn, segment_start, segment_end, status)]
+            parts += [
+                _rows(conn, segment_start, segment_end, status, schema)
+                for schema in schemas
+            ]
+            merged = heapq.merge(
+                *parts, key=lambda row: (row["created_at"], row["order_id"])
+            )
+            try:
+                yield from merged
+            finally:
+                # Los cursores se cierran antes de DETACH
+                for part in parts:
+                    part.close()
+        cursor = segment_end
+    if cursor < high:
+        yield from _rows(conn, cursor or None, end, status)
+
+
+def _csv_value(value):
+    return "" if value is None else value
+
+
+def to_csv(rows):
+    """Texto CSV por lotes de filas"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_FIELDS)
+    for count, row in enumerate(rows, 1):
+        data = dict(row)
+        for cents_field, pesos_field in PESOS_FIELDS.items():
+            if data.get(cents_field) is not None:
+                data[pesos_field] = to_pesos(data[cents_field])
+        writer.writerow(_csv_value(data.get(field)) for field in CSV_FIELDS)
+        if count % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _order_line(order, items):
+    data = {field: order[field] for field in ORDER_FIELDS}
+    data["created_at"] = str(data["created_at"])
+    data["total_amount"] = to_pesos(data["total_cents"])
+    data["items"] = items
+    return json.dumps(data, ensure_ascii=False) + "\n"
+
+
+def to_jsonl(rows):
+    """Una línea JSON por orden; las filas de una orden llegan juntas"""
+    lines = []
+    order, items = None, []
+    for row in rows:
+        if order is None or row["order_id"] != order["order_id"]:
+            if order is not None:
+                lines.append(_order_line(order, items))
+            order, items = row, []
+        if row["product_id"] is not None:
+            item = {field: row[field] for field in ITEM_FIELDS}
+            item["unit_price"] = to_pesos(item["unit_price_cents"])
+            item["total_price"] = to_pesos(item["total_price_cents"])
+            items.append(item)
+        if len(lines) >= EXPORT_BATCH_SIZE:
+            yield "".join(lines)
+            lines = []
+    if order is not None:
+        lines.append(_order_line(order, items))
+    yield "".join(lines)
+
+
+def parse_range(start, end):
+    """Fechas "YYYY-MM-DD" (end inclusive) a [start, end) para order_rows;
+    ValueError si no son fechas"""
+    if start:
+        start = date.fromisoformat(start).isoformat()
+    if end:
+        end = (date.fromisoformat(end) + timedelta(days=1)).isoformat()
+    return start, end
+
+
+def export_orders(get_connection, fmt, start=None, end=None, status=None):
+    """Generador del archivo completo; abre y cierra su propia conexión"""
+    encode = to_csv if fmt == "csv" else to_jsonl
+    conn = get_connection()
+    try:
+        yield from encode(order_rows(conn, start, end, status))
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exportar órdenes con sus items")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--from", dest="start")
+    parser.add_argument("--to", dest="end")
+    parser.add_argument("--status")
+    parser.add_argument("-o", "--output")
+    args = parser.parse_args()
+
+    start, end = parse_range(args.start, args.end)
+    db.init_database()
+    output = (
+        open(args.output, "w", encoding="utf-8", newline="")
+        if args.output
+        else sys.stdout
+    )
+    try:
+        for chunk in export_orders(
+            db.get_read_connection, args.format, start, end, args.status
+        ):
+            output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
@@ -0,0 +1,168 @@
+"""Soporte de Idempotency-Key para POST que crean órdenes o sesiones de pago.
+
+Si el frontend reintenta un POST (timeout, doble clic) con la misma llave, el
+handler no vuelve a ejecutarse: se responde lo que respondió la primera vez.
+
+    @bp.route("/api/orders", methods=["POST"])
+    @jwt_required()
+    @idempotent("orders")
+    def create_order(): ...
+
+La llave se guarda en idempotency_keys junto con un hash del cuerpo de la
+petición, separada por endpoint y usuario del JWT:
+
+- Llave nueva: se marca "en curso", corre el handler y se guarda su
+  respuesta por IDEMPOTENCY_TTL segundos. Las respuestas 5xx no se guardan,
+  para que el reintento vuelva a ejecutar.
+- Llave con respuesta guardada: se repite (cabecera Idempotent-Replayed).
+- Llave en curso (duplicado concurrente): espera a que la primera ejecución
+  termine, hasta IDEMPOTENCY_WAIT segundos; después responde 409.
+- Misma llave con otro cuerpo: 422.
+
+Una ejecución en curso que no terminó en IDEMPOTENCY_LOCK_TTL segundos
+(proceso caído) se considera abandonada y otro intento puede tomar la llave.
+Las llaves vencidas se borran al tomar llaves nuevas.
+
+Variables de entorno:
+    IDEMPOTENCY_TTL       Segundos que se guarda cada respuesta (default 86400)
+    IDEMPOTENCY_LOCK_TTL  Segundos máximos de una ejecución en curso (default 60)
+    IDEMPOTENCY_WAIT      Segundos que un duplicado espera a la primera (default 10)
+"""
+
+import hashlib
+import os
+import time
+from functools import wraps
+
+from flask import current_app, jsonify, make_response, request
+from flask_jwt_extended import get_jwt_identity
+
+from tienda import db, writer
+from tienda.repositories import idempotency as idempotency_repo
+
+IDEMPOTENCY_TTL = int(os.environ.get("IDEMPOTENCY_TTL", 86400))
+IDEMPOTENCY_LOCK_TTL = int(os.environ.get("IDEMPOTENCY_LOCK_TTL", 60))
+IDEMPOTENCY_WAIT = float(os.environ.get("IDEMPOTENCY_WAIT", 10))
+POLL_INTERVAL = 0.05
+PURGE_INTERVAL = 60
+MAX_KEY_LENGTH = 255
+
+_last_purge = 0
+
+
+def _claim(conn, key, fingerprint, now):
+    """Tomar la llave; si otra petición la tiene vigente devuelve su fila"""
+    global _last_purge
+    db.lock_key(conn, f"idempotency:{key}")
+    row = idempotency_repo.get(conn, key)
+    if row is not None and row["expires_at"] > now:
+        return dict(row)
+    idempotency_repo.claim(conn, key, fingerprint, now + IDEMPOTENCY_LOCK_TTL)
+    if now - _last_purge >= PURGE_INTERVAL:
+        _last_purge = now
+        idempotency_repo.purge(conn, now)
+    return None
+
+
+def _read(key):
+    conn = db.get_read_connection()
+    try:
+        row = idempotency_repo.get(conn, key)
+    finally:
+        conn.close()
+    return dict(row) if row is not None else None
+
+
+def _wait(key, row, deadline):
+    """Esperar a que la ejecución en curso termine, se suelte o venza"""
+    while (
+        row is not None
+        and row["status"] is None
+        and row["expires_at"] > time.time()
+        and time.monotonic() < deadline
+    ):
+        time.sleep(POLL_INTERVAL)
+        row = _read(key)
+    return row
+
+
+def _execute(view, key, args, kwargs):
+    try:
+        response = make_response(view(*args, **kwargs))
+    except Exception:
+        writer.write(idempotency_repo.release, key)
+        raise
+    if response.status_code >= 500:
+        writer.write(idempotency_repo.release, key)
+    else:
+        writer.write(
+            idempotency_repo.complete,
+            key,
+            response.status_code,
+            response.get_data(as_text=True),
+            int(time.time()) + IDEMPOTENCY_TTL,
+        )
+    return response
+
+
+def _replay(row):
+    response = current_app.response_class(
+        row["body"], status=row["status"], mimetype="application/json"
+    )
+    response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+
+def _storage_key(scope, header):
+    try:
+        identity = get_jwt_identity()
+    except RuntimeError:
+        # Endpoint sin @jwt_required
+        identity = None
+    raw = f"{scope}\n{identity or ''}\n{header}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def idempotent(scope):
+    """Decorador: aplicar Idempotency-Key al handler (ver docstring del módulo)"""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            header = request.headers.get("Idempotency-Key")
+            if not header:
+                return view(*args, **kwargs)
+            if len(header) > MAX_KEY_LENGTH:
+                return jsonify({"error": "Idempotency-Key demasiado larga"}), 400
+
+            key = _storage_key(scope, header)
+            fingerprint = hashlib.sha256(request.get_data()).hexdigest()[:32]
+            deadline = time.monotonic() + IDEMPOTENCY_WAIT
+            while True:
+                row = writer.write(_claim, key, fingerprint, int(time.time()))
+                if row is None:
+                    return _execute(view, key, args, kwargs)
+                if row["fingerprint"] != fingerprint:
+                    return (
+                        jsonify(
+                            {"error": "Idempotency-Key ya usada con otra petición"}
+                        ),
+                        422,
+                    )
+                row = _wait(key, row, deadline)
+                if row is None or row["expires_at"] <= time.time():
+                    # La primera ejecución falló o venció: este intento la toma
+                    continue
+                if row["status"] is not None:
+                    print(f"🔁 Respuesta repetida por Idempotency-Key ({scope})")
+                    return _replay(row)
+                response = jsonify(
+                    {"error": "Petición con la misma Idempotency-Key en curso"}
+                )
+                response.status_code = 409
+                response.headers["Retry-After"] = "1"
+                return response
+
+        return wrapper
+
+    return decorator
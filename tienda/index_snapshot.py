@@ -0,0 +1,135 @@
+"""index.html con el catálogo incrustado para el primer render.
+
+Sin snapshot, la primera visita necesita tres viajes en serie: index.html, el
+bundle y luego /api/products. Aquí index.html se sirve con el JSON del catálogo
+dentro de un <script type="application/json" id="catalog-snapshot">, y el
+frontend lo usa en lugar de la primera llamada a /api/products.
+
+El HTML se regenera (junto con sus variantes gzip/br) cuando cambia la versión
+del catálogo o el index.html del build, no en cada petición. El ETag combina
+ambas versiones, así que los navegadores revalidan con 304 mientras no cambien.
+
+Variables de entorno:
+    INDEX_CATALOG_SNAPSHOT  "false" para servir index.html sin el catálogo
+                            (default true)
+"""
+
+import gzip
+import os
+import threading
+
+from flask import current_app
+
+from tienda import catalog
+from tienda.static_assets import ENCODINGS
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+INDEX_CATALOG_SNAPSHOT = (
+    os.environ.get("INDEX_CATALOG_SNAPSHOT", "true").lower() != "false"
+)
+SCRIPT_ID = "catalog-snapshot"
+
+
+class RenderedIndex:
+    def __init__(self, key, etag, bodies):
+        self.key = key
+        self.etag = etag
+        # encoding (None = identity) -> bytes
+        self.bodies = bodies
+
+
+def _script_tag(snapshot):
+    # "<" escapado para que ningún texto del catálogo pueda cerrar el <script>
+    data = snapshot.products_json.replace(b"<", b"\\u003c")
+    opening = (
+        f'<script id="{SCRIPT_ID}" type="application/json" '
+        f'data-version="{snapshot.version}">'
+    )
+    return opening.encode("utf-8") + data + b"</script>"
+
+
+def inject(template, snapshot):
+    """Insertar el snapshot del catálogo en el HTML antes de </head>"""
+    tag = _script_tag(snapshot)
+    for marker in (b"</head>", b"</body>"):
+        if marker in template:
+            return template.replace(marker, tag + marker, 1)
+    return template + tag
+
+
+def _compress(body):
+    bodies = {None: body, "gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        bodies["br"] = brotli.compress(body, quality=11)
+    return bodies
+
+
+class IndexSnapshot:
+    """index.html del build con el catálogo vigente incrustado"""
+
+    def __init__(self, assets):
+        self.assets = assets
+        self._rendered = None
+        self._lock = threading.Lock()
+        catalog.add_listener(self._on_catalog_change)
+
+    def _on_catalog_change(self, snapshot):
+        asset = self.assets.get("index.html")
+        if asset is not None:
+            self._render(asset, snapshot)
+
+    def _render(self, asset, snapshot):
+        key = (asset.etag, snapshot.version)
+        with self._lock:
+            rendered = self._rendered
+            if rendered is not None and rendered.key == key:
+                return rendered
+
+            template = asset.identity.body
+            if template is None:
+                with open(asset.path, "rb") as f:
+                    template = f.read()
+            body = inject(template, snapshot)
+            rendered = RenderedIndex(
+                key, f"{asset.etag[:12]}-{snapshot.version}", _compress(body)
+            )
+            self._rendered = rendered
+        print(f"🧾 index.html regenerado con catálogo {snapshot.version}")
+        return rendered
+
+    def get(self):
+        """Versión renderizada vigente, o None si no hay index.html"""
+        asset = self.assets.get("index.html")
+        if asset is None:
+            return None
+        # snapshot() puede recargar el catálogo y regenerar vía el listener
+        snapshot = catalog.snapshot()
+        rendered = self._rendered
+        if rendered is None or rendered.key != (asset.etag, snapshot.version):
+            rendered = self._render(asset, snapshot)
+        return rendered
+
+
+def send_index(rendered, request):
+    """Responder con la mejor variante aceptada; se revalida siempre (no-cache)"""
+    accepted = request.accept_encodings
+    encoding = None
+    for candidate, _ in ENCODINGS:
+        if candidate in rendered.bodies and accepted[candidate]:
+            encoding = candidate
+            break
+
+    body = rendered.bodies[encoding]
+    response = current_app.response_class(body, mimetype="text/html")
+    # Un ETag distinto por variante, igual que en static_assets
+    response.set_etag(f"{rendered.etag}-{encoding}" if encoding else rendered.etag)
+    response = response.make_conditional(request)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    response.cache_control.no_cache = True
+    return response
@@ -0,0 +1,231 @@
+"""Cambios de esquema versionados, aplicados al arrancar (tienda.db.init_database).
+
+Cada migración es una lista de sentencias en SQL común a SQLite y
+PostgreSQL. schema_migrations registra las aplicadas; se corren dentro de una
+transacción de escritura, así que varios procesos arrancando a la vez no la
+aplican dos veces.
+
+Para aplicarlas sin levantar la app:
+
+    python -m tienda.migrations
+"""
+
+from tienda import db
+
+# Montos de órdenes en centavos enteros (ver tienda.money)
+MONEY_CENTS = [
+    "ALTER TABLE orders ADD COLUMN total_cents INTEGER NOT NULL DEFAULT 0",
+    "UPDATE orders SET total_cents = CAST(ROUND(CAST(total_amount * 100 AS NUMERIC)) AS INTEGER)",
+    "ALTER TABLE orders DROP COLUMN total_amount",
+    "ALTER TABLE order_items ADD COLUMN unit_price_cents INTEGER NOT NULL DEFAULT 0",
+    "ALTER TABLE order_items ADD COLUMN total_price_cents INTEGER NOT NULL DEFAULT 0",
+    """
+    UPDATE order_items SET
+        unit_price_cents = CAST(ROUND(CAST(unit_price * 100 AS NUMERIC)) AS INTEGER),
+        total_price_cents = CAST(ROUND(CAST(total_price * 100 AS NUMERIC)) AS INTEGER)
+    """,
+    "ALTER TABLE order_items DROP COLUMN unit_price",
+    "ALTER TABLE order_items DROP COLUMN total_price",
+]
+
+# Carrito cobrado en cada sesión de Stripe Checkout (ver blueprints/payments)
+CHECKOUT_SESSIONS = [
+    """
+    CREATE TABLE checkout_sessions (
+        session_id TEXT PRIMARY KEY,
+        items TEXT NOT NULL,
+        total_cents INTEGER NOT NULL,
+        customer_name TEXT,
+        customer_phone TEXT,
+        customer_email TEXT,
+        delivery_address TEXT,
+        order_notes TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+]
+
+# Espejo de productos en Stripe Products/Prices (ver tienda.stripe_catalog)
+STRIPE_PRICES = [
+    """
+    CREATE TABLE stripe_prices (
+        product_id INTEGER PRIMARY KEY,
+        stripe_product_id TEXT NOT NULL,
+        stripe_price_id TEXT NOT NULL,
+        name TEXT NOT NULL,
+        price_cents INTEGER NOT NULL,
+        synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+]
+
+# Respuestas guardadas por Idempotency-Key (ver tienda.idempotency)
+IDEMPOTENCY_KEYS = [
+    """
+    CREATE TABLE idempotency_keys (
+        key TEXT PRIMARY KEY,
+        fingerprint TEXT NOT NULL,
+        status INTEGER,
+        body TEXT,
+        expires_at INTEGER NOT NULL
+    )
+    """,
+    "CREATE INDEX idx_idempotency_keys_expires_at ON idempotency_keys (expires_at)",
+]
+
+# Meses archivados de cada usuario (ver tienda.archive)
+ARCHIVED_ORDER_MONTHS = [
+    """
+    CREATE TABLE archived_order_months (
+        user_id INTEGER NOT NULL,
+        month TEXT NOT NULL,
+        PRIMARY KEY (user_id, month)
+    )
+    """,
+]
+
+# Ventas agregadas por día y producto (ver repositories/sales.py), con las
+# órdenes que ya existían
+DAILY_SALES = [
+    """
+    CREATE TABLE daily_sales (
+        day TEXT PRIMARY KEY,
+        orders INTEGER NOT NULL,
+        revenue_cents INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE daily_product_sales (
+        day TEXT NOT NULL,
+        product_id INTEGER NOT NULL,
+        supplier TEXT,
+        brand TEXT,
+        quantity INTEGER NOT NULL,
+        revenue_cents INTEGER NOT NULL,
+        orders INTEGER NOT NULL,
+        PRIMARY KEY (day, product_id)
+    )
+    """,
+    """
+    INSERT INTO daily_sales (day, orders, revenue_cents)
+    SELECT date(created_at), COUNT(*), SUM(total_cents)
+    FROM orders
+    GROUP BY date(created_at)
+    """,
+    """
+    INSERT INTO daily_product_sales (
+        day, product_id, supplier, brand, quantity, revenue_cents, orders
+    )
+    SELECT date(o.created_at), oi.product_id, MAX(p.supplier), MAX(p.brand),
+           SUM(oi.quantity), SUM(oi.total_price_cents), COUNT(DISTINCT o.id)
+    FROM order_items oi
+    JOIN orders o ON o.id = oi.order_id
+    LEFT JOIN productos p ON p.id = oi.product_id
+    GROUP BY date(o.created_at), oi.product_id
+    """,
+]
+
+# Exportación por rango de fechas (ver tienda.export); PostgreSQL ya tenía el
+# índice de order_items desde tienda.pg
+ORDER_EXPORT_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_orders_created_at ON orders (created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items (order_id)",
+]
+
+# Vecinos de cada producto por compras conjuntas (ver tienda.related)
+RELATED_PRODUCTS = [
+    """
+    CREATE TABLE related_products (
+        product_id INTEGER NOT NULL,
+        rank INTEGER NOT NULL,
+        related_id INTEGER NOT NULL,
+        score REAL NOT NULL,
+        together INTEGER NOT NULL,
+        PRIMARY KEY (product_id, rank)
+    )
+    """,
+]
+
+# Versión del carrito de cada usuario (ver tienda.cart_cache); las bases que
+# ya existían la tienen, creada al arrancar antes de esta migración
+CART_VERSIONS = [
+    """
+    CREATE TABLE IF NOT EXISTS cart_versions (
+        user_id INTEGER PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+]
+
+# Mes del archivo de cada orden pagada con Stripe (ver tienda.archive); no se
+# archiva, así verify-payment encuentra las sesiones ya cobradas
+ARCHIVED_PAYMENTS = [
+    """
+    CREATE TABLE archived_payments (
+        stripe_payment_intent_id TEXT PRIMARY KEY,
+        month TEXT NOT NULL
+    )
+    """,
+]
+
+# Permiso de administrador por usuario (ver tienda.admins); el username no
+# sirve porque cualquiera puede registrarse con uno libre
+USER_ADMIN = [
+    "ALTER TABLE users ADD COLUMN is_admin INTEGER NOT NULL DEFAULT 0",
+]
+
+# Vencimiento de cada sesión de Checkout (ver blueprints/payments); las filas
+# anteriores quedan en NULL y reciben uno en la primera purga
+CHECKOUT_SESSIONS_EXPIRY = [
+    "ALTER TABLE checkout_sessions ADD COLUMN expires_at INTEGER",
+    "CREATE INDEX idx_checkout_sessions_expires_at"
+    " ON checkout_sessions (expires_at)",
+]
+
+MIGRATIONS = [
+    ("0001_money_cents", MONEY_CENTS),
+    ("0002_checkout_sessions", CHECKOUT_SESSIONS),
+    ("0003_stripe_prices", STRIPE_PRICES),
+    ("0004_idempotency_keys", IDEMPOTENCY_KEYS),
+    ("0005_archived_order_months", ARCHIVED_ORDER_MONTHS),
+    ("0006_daily_sales", DAILY_SALES),
+    ("0007_order_export_indexes", ORDER_EXPORT_INDEXES),
+    ("0008_related_products", RELATED_PRODUCTS),
+    ("0009_cart_versions", CART_VERSIONS),
+    ("0010_archived_payments", ARCHIVED_PAYMENTS),
+    ("0011_user_admin", USER_ADMIN),
+    ("0012_checkout_sessions_expiry", CHECKOUT_SESSIONS_EXPIRY),
+]
+
+
+def migrate(conn):
+    """Aplicar las migraciones pendientes; devuelve sus nombres"""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            name TEXT PRIMARY KEY,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+    )
+    conn.commit()
+
+    db.begin_write(conn)
+    db.lock_key(conn, "schema_migrations")
+    applied = {row[0] for row in conn.execute("SELECT name FROM schema_migrations")}
+    pending = [(name, sql) for name, sql in MIGRATIONS if name not in applied]
+    try:
+        for name, statements in pending:
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute("INSERT INTO schema_migrations (name) VALUES (?)", (name,))
+            print(f"🛠️ Migración aplicada: {name}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return [name for name, _ in pending]
+
+
+if __name__ == "__main__":
+    db.init_database()
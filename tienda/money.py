@@ -0,0 +1,49 @@
+"""Montos de dinero como centavos enteros.
+
+La base de datos guarda todos los montos en centavos (price_cents,
+total_cents, unit_price_cents, total_price_cents) y las sumas se hacen con
+enteros. Los pesos solo aparecen en los bordes: al leer montos que manda el
+cliente (to_cents) y en los campos de las respuestas que el frontend ya usa
+(total_amount, unit_price, total_price).
+"""
+
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+# Campo en centavos -> campo en pesos de la API
+PESOS_FIELDS = {
+    "total_cents": "total_amount",
+    "unit_price_cents": "unit_price",
+    "total_price_cents": "total_price",
+}
+
+
+def to_cents(amount):
+    """Pesos (número o texto) a centavos; ValueError si no es un monto válido.
+
+    Se pasa por str para que 19.99 sea 1999 y no 1998 por el error de float.
+    """
+    try:
+        pesos = Decimal(str(amount))
+    except InvalidOperation:
+        raise ValueError(f"Monto inválido: {amount!r}") from None
+    if not pesos.is_finite():
+        raise ValueError(f"Monto inválido: {amount!r}")
+    try:
+        return int((pesos * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    except InvalidOperation:
+        # Más dígitos de los que admite el contexto decimal (p. ej. "1e999")
+        raise ValueError(f"Monto inválido: {amount!r}") from None
+
+
+def to_pesos(cents):
+    """Centavos a pesos para las respuestas JSON"""
+    return cents / 100
+
+
+def with_pesos(row):
+    """dict de la fila con los montos en pesos además de los centavos"""
+    data = dict(row)
+    for cents_field, pesos_field in PESOS_FIELDS.items():
+        if cents_field in data and data[cents_field] is not None:
+            data[pesos_field] = to_pesos(data[cents_field])
+    return data
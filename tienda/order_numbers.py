@@ -0,0 +1,99 @@
+"""Números de orden únicos y ordenables sin consultar la base de datos.
+
+Con f"ORD-{int(time.time())}" dos órdenes en el mismo segundo chocaban con
+el UNIQUE de orders.order_number y la transacción completa fallaba. Aquí cada
+número junta, al estilo Snowflake/ULID:
+
+    48 bits  milisegundos desde 1970
+    16 bits  id del worker (proceso)
+    16 bits  secuencia dentro del mismo milisegundo
+
+codificados en base32 de Crockford con ancho fijo ("ORD-" + 16 caracteres),
+así que ordenar los números como texto los ordena por fecha de creación.
+Dentro de un proceso son estrictamente crecientes: si el reloj retrocede o la
+secuencia se agota, se toma el milisegundo siguiente al último usado.
+
+Dos procesos con el mismo id podrían generar el mismo número, así que cada
+proceso que crea órdenes debe tener su propio ORDER_WORKER_ID. Con gunicorn
+lo asigna tienda.server a cada worker (pre_fork/post_fork). Sin
+ORDER_WORKER_ID el proceso elige un id al azar (también tras un fork), lo que
+solo es seguro con un único proceso (p. ej. el servidor de desarrollo).
+
+Variables de entorno:
+    ORDER_WORKER_ID  Id del worker, 0-65535 (default: al azar por proceso)
+"""
+
+import os
+import secrets
+import threading
+import time
+
+PREFIX = "ORD-"
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+LENGTH = 16  # 80 bits / 5 bits por carácter
+
+WORKER_BITS = 16
+SEQUENCE_BITS = 16
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+
+_lock = threading.Lock()
+_pid = None
+_worker_id = None
+_last_ms = 0
+_sequence = 0
+
+
+def _configured_worker_id():
+    value = os.environ.get("ORDER_WORKER_ID", "")
+    if not value:
+        return secrets.randbits(WORKER_BITS)
+    worker_id = int(value)
+    if not 0 <= worker_id <= MAX_WORKER_ID:
+        raise ValueError(f"ORDER_WORKER_ID fuera de rango: {worker_id}")
+    return worker_id
+
+
+def _encode(value):
+    chars = []
+    for _ in range(LENGTH):
+        value, index = divmod(value, 32)
+        chars.append(ALPHABET[index])
+    return "".join(reversed(chars))
+
+
+def next_order_number():
+    """Siguiente número de orden del proceso"""
+    global _pid, _worker_id, _last_ms, _sequence
+    with _lock:
+        if _pid != os.getpid():
+            # Un proceso hijo no sigue la secuencia del padre
+            _pid = os.getpid()
+            _worker_id = _configured_worker_id()
+            _last_ms = 0
+            _sequence = 0
+
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            _sequence = 0
+        elif _sequence < MAX_SEQUENCE:
+            _sequence += 1
+        else:
+            _last_ms += 1
+            _sequence = 0
+
+        value = (
+            (_last_ms << (WORKER_BITS + SEQUENCE_BITS))
+            | (_worker_id << SEQUENCE_BITS)
+            | _sequence
+        )
+    return PREFIX + _encode(value)
+
+
+def created_ms(order_number):
+    """Milisegundos de creación codificados en un número de este módulo"""
+    value = 0
+    for char in order_number[len(PREFIX) :]:
+        value = value * 32 + ALPHABET.index(char)
+    return value >> (WORKER_BITS + SEQUENCE_BITS)
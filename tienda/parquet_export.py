@@ -0,0 +1,229 @@
+"""Exportación incremental a Parquet para análisis fuera de producción.
+
+Escribe orders, order_items y productos en formato columnar, con las órdenes
+y sus items particionados por mes de creación (particiones estilo Hive, que
+pyarrow.dataset, pandas, DuckDB y Spark leen directamente):
+
+    <PARQUET_EXPORT_DIR>/orders/month=2025-10/part-000000000123.parquet
+    <PARQUET_EXPORT_DIR>/order_items/month=2025-10/part-000000000123.parquet
+    <PARQUET_EXPORT_DIR>/productos/productos.parquet
+    <PARQUET_EXPORT_DIR>/_state.json
+
+    python -m tienda.parquet_export
+
+Cada corrida exporta solo las órdenes con id mayor a la marca guardada en
+_state.json, leídas con fetchmany en lotes de PARQUET_BATCH_SIZE; la marca
+avanza después de escribir cada lote. Un lote interrumpido se vuelve a
+escribir con los mismos nombres de archivo. productos es pequeña y se
+reescribe completa.
+
+La exportación se detiene en la primera orden creada hace menos de
+PARQUET_EXPORT_LAG segundos, que espera a la siguiente corrida: con
+PostgreSQL una transacción puede confirmar un id menor después que otra con
+uno mayor.
+
+Los datos personales del cliente no se exportan, y payment_status queda como
+estaba al exportar la orden. Solo se leen las tablas principales: una vez que
+existe _state.json, tienda.archive no mueve órdenes con id mayor a la marca
+(si la exportación deja de correr, tampoco se archiva). Las órdenes que ya
+estaban en los archivos antes de la primera corrida no se incluyen.
+
+Requiere pyarrow (pip install pyarrow).
+
+Variables de entorno:
+    PARQUET_EXPORT_DIR  Carpeta destino (default: analytics/ junto a la base)
+    PARQUET_BATCH_SIZE  Órdenes por lote (default 50000)
+    PARQUET_EXPORT_LAG  Segundos de antigüedad mínima de una orden (default 300)
+"""
+
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+from tienda import db
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+PARQUET_BATCH_SIZE = int(os.environ.get("PARQUET_BATCH_SIZE", 50000))
+PARQUET_EXPORT_LAG = int(os.environ.get("PARQUET_EXPORT_LAG", 300))
+STATE_FILE = "_state.json"
+
+# (columna, tipo) de cada tabla; los tipos se crean al usarse porque pyarrow
+# es opcional
+ORDER_COLUMNS = (
+    ("order_id", "int64"),
+    ("order_number", "string"),
+    ("user_id", "int64"),
+    ("created_at", "timestamp"),
+    ("payment_method", "string"),
+    ("payment_status", "string"),
+    ("total_cents", "int64"),
+)
+ITEM_COLUMNS = (
+    ("order_item_id", "int64"),
+    ("order_id", "int64"),
+    ("product_id", "int64"),
+    ("quantity", "int64"),
+    ("unit_price_cents", "int64"),
+    ("total_price_cents", "int64"),
+    ("created_at", "timestamp"),
+)
+PRODUCT_COLUMNS = (
+    ("id", "int64"),
+    ("supplier", "string"),
+    ("brand", "string"),
+    ("name", "string"),
+    ("price_cents", "int64"),
+    ("weight", "string"),
+    ("stock", "int64"),
+)
+
+
+def export_dir():
+    default = os.path.join(os.path.dirname(db.database_path()), "analytics")
+    return os.environ.get("PARQUET_EXPORT_DIR", default)
+
+
+def _schema(columns):
+    types = {"int64": pa.int64(), "string": pa.string(), "timestamp": pa.timestamp("s")}
+    return pa.schema([(name, types[kind]) for name, kind in columns])
+
+
+def _table(rows, columns):
+    data = {name: [row[name] for row in rows] for name, _ in columns}
+    if "created_at" in data:
+        data["created_at"] = [
+            datetime.fromisoformat(str(value)) for value in data["created_at"]
+        ]
+    return pa.Table.from_pydict(data, schema=_schema(columns))
+
+
+def read_state():
+    try:
+        with open(os.path.join(export_dir(), STATE_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"last_order_id": 0}
+
+
+def exported_order_id():
+    """Marca de la última corrida, o None si la exportación nunca ha corrido"""
+    if not os.path.exists(os.path.join(export_dir(), STATE_FILE)):
+        return None
+    return read_state()["last_order_id"]
+
+
+def _write_state(state):
+    path = os.path.join(export_dir(), STATE_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def _write_by_month(name, rows, columns):
+    """Un archivo por mes del lote, nombrado con el primer id de orden"""
+    months = {}
+    for row in rows:
+        months.setdefault(str(row["created_at"])[:7], []).append(row)
+    for month, month_rows in months.items():
+        directory = os.path.join(export_dir(), name, f"month={month}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"part-{month_rows[0]['order_id']:012d}.parquet")
+        pq.write_table(_table(month_rows, columns), path)
+
+
+def _export_items(conn, after_id, last_id):
+    """Items de las órdenes con id en (after_id, last_id]"""
+    rows = conn.execute(
+        """
+        SELECT oi.id AS order_item_id, oi.order_id, oi.product_id, oi.quantity,
+               oi.unit_price_cents, oi.total_price_cents, o.created_at
+        FROM order_items oi
+        JOIN orders o ON o.id = oi.order_id
+        WHERE oi.order_id > ? AND oi.order_id <= ?
+        ORDER BY oi.order_id, oi.id
+    """,
+        (after_id, last_id),
+    ).fetchall()
+    _write_by_month("order_items", rows, ITEM_COLUMNS)
+    return len(rows)
+
+
+def _export_products(conn):
+    rows = conn.execute(
+        f"SELECT {', '.join(name for name, _ in PRODUCT_COLUMNS)} FROM productos"
+    ).fetchall()
+    directory = os.path.join(export_dir(), "productos")
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "productos.parquet")
+    pq.write_table(_table(rows, PRODUCT_COLUMNS), path + ".tmp")
+    os.replace(path + ".tmp", path)
+    return len(rows)
+
+
+def export(conn):
+    """Exportar lo nuevo desde la última corrida; devuelve los conteos"""
+    if pa is None:
+        raise RuntimeError("pyarrow no está instalado: pip install pyarrow")
+    os.makedirs(export_dir(), exist_ok=True)
+    state = read_state()
+    cutoff = (
+        datetime.now(timezone.utc) - timedelta(seconds=PARQUET_EXPORT_LAG)
+    ).strftime("%Y-%m-%d %H:%M:%S")
+    counts = {"orders": 0, "order_items": 0}
+
+    cursor = db.stream(
+        conn,
+        """
+        SELECT id AS order_id, order_number, user_id, created_at,
+               payment_method, payment_status, total_cents
+        FROM orders
+        WHERE id > ?
+        ORDER BY id
+    """,
+        (state["last_order_id"],),
+    )
+    try:
+        recent = False
+        while not recent:
+            rows = cursor.fetchmany(PARQUET_BATCH_SIZE)
+            # La marca no puede pasar una orden reciente: se corta ahí
+            for index, row in enumerate(rows):
+                if str(row["created_at"]) >= cutoff:
+                    rows, recent = rows[:index], True
+                    break
+            if not rows:
+                break
+            last_id = rows[-1]["order_id"]
+            _write_by_month("orders", rows, ORDER_COLUMNS)
+            counts["order_items"] += _export_items(
+                conn, state["last_order_id"], last_id
+            )
+            counts["orders"] += len(rows)
+            state["last_order_id"] = last_id
+            _write_state(state)
+    finally:
+        cursor.close()
+
+    counts["productos"] = _export_products(conn)
+    return counts
+
+
+if __name__ == "__main__":
+    db.init_database()
+    conn = db.get_read_connection()
+    try:
+        counts = export(conn)
+    except RuntimeError as e:
+        raise SystemExit(f"❌ {e}")
+    finally:
+        conn.close()
+    print(
+        f"✅ Parquet en {export_dir()}: "
+        + ", ".join(f"{table}={count}" for table, count in counts.items())
+    )
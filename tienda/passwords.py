@@ -0,0 +1,125 @@
+"""Hash y verificación de contraseñas con bcrypt fuera del hilo de la petición.
+
+bcrypt es intencionalmente costoso (cientos de milisegundos de CPU con el costo
+por defecto). Ejecutarlo dentro del worker de Flask bloquea al resto de
+peticiones del catálogo mientras dura el cálculo, así que el trabajo se envía
+a un pool de procesos acotado.
+
+Los procesos del pool se crean con forkserver (spawn donde no existe): el pool
+nace dentro de workers con hilos, y un fork podría copiar un lock tomado por
+otro hilo (logging, sqlite) y dejar colgado al proceso hijo.
+
+Variables de entorno:
+    BCRYPT_ROUNDS          Factor de trabajo para hashes nuevos (default 12)
+    PASSWORD_HASH_WORKERS  Procesos del pool; 0 ejecuta en línea (default 2)
+    PASSWORD_HASH_QUEUE    Máximo de operaciones en vuelo antes de rechazar
+                           (default 4 por proceso)
+    PASSWORD_HASH_TIMEOUT  Segundos máximos de espera por un resultado (default 10)
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import bcrypt
+
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", 12))
+HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", 2))
+HASH_QUEUE = int(os.environ.get("PASSWORD_HASH_QUEUE", HASH_WORKERS * 4 or 1))
+HASH_TIMEOUT = float(os.environ.get("PASSWORD_HASH_TIMEOUT", 10))
+
+_executor = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(HASH_QUEUE)
+
+
+class PasswordHasherBusy(Exception):
+    """El pool de hashing está saturado o no respondió a tiempo"""
+
+
+def _hashpw(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def _checkpw(password, password_hash):
+    return bcrypt.checkpw(password, password_hash)
+
+
+def _mp_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context(
+        "forkserver" if "forkserver" in methods else "spawn"
+    )
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(
+                    max_workers=HASH_WORKERS, mp_context=_mp_context()
+                )
+    return _executor
+
+
+def _run(fn, *args):
+    """Ejecutar fn en el pool respetando el límite de operaciones en vuelo"""
+    if HASH_WORKERS <= 0:
+        return fn(*args)
+
+    if not _slots.acquire(timeout=HASH_TIMEOUT):
+        raise PasswordHasherBusy("Pool de hashing saturado")
+    try:
+        future = _get_executor().submit(fn, *args)
+        return future.result(timeout=HASH_TIMEOUT)
+    except FutureTimeoutError:
+        raise PasswordHasherBusy("Tiempo de espera agotado al calcular hash")
+    finally:
+        _slots.release()
+
+
+def hash_rounds(password_hash):
+    """Extraer el factor de trabajo de un hash bcrypt ($2b$12$...)"""
+    try:
+        return int(password_hash.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def needs_rehash(password_hash):
+    """Indica si el hash se generó con un costo distinto al configurado"""
+    return hash_rounds(password_hash) != BCRYPT_ROUNDS
+
+
+def hash_password(password):
+    """Generar hash bcrypt con el costo configurado"""
+    return _run(_hashpw, password.encode("utf-8"), BCRYPT_ROUNDS)
+
+
+def verify_password(password, password_hash):
+    """Verificar contraseña y, si el costo cambió, calcular el hash nuevo.
+
+    Retorna (valida, nuevo_hash). nuevo_hash es None salvo que la contraseña
+    sea válida y el hash almacenado use un factor de trabajo distinto.
+    """
+    try:
+        valid = _run(_checkpw, password.encode("utf-8"), password_hash.encode("utf-8"))
+    except ValueError:
+        # Hash almacenado con formato inválido
+        return False, None
+
+    if valid and needs_rehash(password_hash):
+        return True, hash_password(password)
+    return valid, None
+
+
+def shutdown():
+    """Cerrar el pool de procesos (útil en benchmarks y al recargar workers)"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
@@ -0,0 +1,358 @@
+"""Backend PostgreSQL: pool de conexiones psycopg con la interfaz de sqlite3.
+
+Se activa con DATABASE_URL=postgresql://... (tienda.db decide el backend). Los
+repositorios escriben SQL portable con placeholders `?` o `:nombre`; aquí se
+traducen al formato de psycopg y las filas se devuelven como Row, que igual
+que sqlite3.Row se indexa por posición o por nombre.
+
+Las sentencias se preparan en el servidor desde su primera ejecución
+(PG_PREPARE_THRESHOLD=0); con PgBouncer en modo transacción usar "none".
+Los timestamps se leen como texto "YYYY-MM-DD HH:MM:SS" en UTC, igual que los
+guarda SQLite, para que las respuestas JSON no cambien de formato.
+
+    python -m tienda.pg init   # crear las tablas
+    python -m tienda.pg copy   # copiar los datos de DATABASE_PATH (SQLite)
+
+Requiere psycopg 3 con psycopg_pool: pip install "psycopg[binary,pool]"
+
+Variables de entorno:
+    PG_POOL_MIN           Conexiones abiertas por proceso (default 1)
+    PG_POOL_MAX           Máximo de conexiones por proceso (default 10)
+    PG_POOL_TIMEOUT       Segundos de espera por una conexión libre (default 10)
+    PG_PREPARE_THRESHOLD  Ejecuciones antes de preparar la sentencia (default 0;
+                          "none" desactiva las sentencias preparadas)
+"""
+
+import os
+import re
+import sqlite3
+import sys
+import threading
+from functools import lru_cache
+
+PG_POOL_MIN = int(os.environ.get("PG_POOL_MIN", 1))
+PG_POOL_MAX = int(os.environ.get("PG_POOL_MAX", 10))
+PG_POOL_TIMEOUT = float(os.environ.get("PG_POOL_TIMEOUT", 10))
+PG_PREPARE_THRESHOLD = os.environ.get("PG_PREPARE_THRESHOLD", "0")
+
+# Mismas tablas que db.sqlite3; is_active queda como entero para que la API
+# siga respondiendo 1/0
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS productos (
+        id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        supplier TEXT NOT NULL,
+        name TEXT NOT NULL,
+        description TEXT NOT NULL,
+        price_cents INTEGER NOT NULL,
+        image TEXT NOT NULL,
+        brand TEXT NOT NULL,
+        weight TEXT NOT NULL,
+        ingredients TEXT NOT NULL,
+        allergens TEXT,
+        nutritional_info TEXT,
+        stock INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        username TEXT UNIQUE NOT NULL,
+        email TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL,
+        first_name TEXT NOT NULL,
+        last_name TEXT NOT NULL,
+        created_at TIMESTAMP(0) DEFAULT LOCALTIMESTAMP(0),
+        is_active INTEGER DEFAULT 1
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_sessions (
+        id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        user_id INTEGER NOT NULL REFERENCES users (id),
+        token_jti TEXT UNIQUE NOT NULL,
+        created_at TIMESTAMP(0) DEFAULT LOCALTIMESTAMP(0),
+        expires_at TIMESTAMP(0) NOT NULL,
+        is_active INTEGER DEFAULT 1
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS cart_items (
+        id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        user_id INTEGER NOT NULL REFERENCES users (id),
+        product_id INTEGER NOT NULL,
+        quantity INTEGER NOT NULL DEFAULT 1,
+        created_at TIMESTAMP(0) DEFAULT LOCALTIMESTAMP(0),
+        updated_at TIMESTAMP(0) DEFAULT LOCALTIMESTAMP(0),
+        order_position INTEGER DEFAULT 0,
+        UNIQUE (user_id, product_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS orders (
+        id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        user_id INTEGER REFERENCES users (id),
+        order_number TEXT UNIQUE NOT NULL,
+        payment_method TEXT NOT NULL,
+        payment_status TEXT NOT NULL DEFAULT 'pending',
+        total_amount DOUBLE PRECISION NOT NULL,
+        stripe_payment_intent_id TEXT,
+        customer_name TEXT NOT NULL,
+        customer_phone TEXT NOT NULL,
+        customer_email TEXT,
+        delivery_address TEXT,
+        order_notes TEXT,
+        created_at TIMESTAMP(0) DEFAULT LOCALTIMESTAMP(0),
+        updated_at TIMESTAMP(0) DEFAULT LOCALTIMESTAMP(0)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS order_items (
+        id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        order_id INTEGER NOT NULL REFERENCES orders (id),
+        product_id INTEGER NOT NULL,
+        quantity INTEGER NOT NULL,
+        unit_price DOUBLE PRECISION NOT NULL,
+        total_price DOUBLE PRECISION NOT NULL,
+        created_at TIMESTAMP(0) DEFAULT LOCALTIMESTAMP(0)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_orders_user ON orders (user_id)",
+    "CREATE INDEX IF NOT EXISTS idx_orders_stripe ON orders (stripe_payment_intent_id)",
+    "CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items (order_id)",
+]
+
+# Orden de copia respetando llaves foráneas
+COPY_TABLES = (
+    "productos",
+    "users",
+    "user_sessions",
+    "cart_items",
+    "cart_versions",
+    "orders",
+    "order_items",
+    "checkout_sessions",
+    "stripe_prices",
+    "daily_sales",
+    "daily_product_sales",
+    "related_products",
+)
+
+_PLACEHOLDER = re.compile(r"'[^']*'|\?|(?<!:):([A-Za-z_]\w*)|%")
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+@lru_cache(maxsize=512)
+def translate(sql):
+    """Pasar SQL con placeholders de sqlite3 (? y :nombre) al formato de psycopg"""
+
+    def replace(match):
+        token = match.group(0)
+        if token == "?":
+            return "%s"
+        if token == "%":
+            return "%%"
+        if match.group(1):
+            return f"%({match.group(1)})s"
+        # Literal entre comillas: psycopg también interpreta sus %
+        return token.replace("%", "%%")
+
+    return _PLACEHOLDER.sub(replace, sql)
+
+
+class Row(tuple):
+    """Fila indexable por posición o por nombre, como sqlite3.Row"""
+
+    def __new__(cls, names, values):
+        row = super().__new__(cls, values)
+        row._names = names
+        return row
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                key = self._names.index(key)
+            except ValueError:
+                raise IndexError(f"No item with that key: {key}") from None
+        return super().__getitem__(key)
+
+    def keys(self):
+        return list(self._names)
+
+
+def _row_factory(cursor):
+    names = [column.name for column in cursor.description or ()]
+    return lambda values: Row(names, values)
+
+
+def _configure(conn):
+    from psycopg.types.string import TextLoader
+
+    # Timestamps como texto, con el mismo formato que SQLite
+    conn.adapters.register_loader("timestamp", TextLoader)
+    conn.execute("SET TIME ZONE 'UTC'")
+    conn.commit()
+
+
+def _prepare_threshold():
+    if PG_PREPARE_THRESHOLD.lower() == "none":
+        return None
+    return int(PG_PREPARE_THRESHOLD)
+
+
+def get_pool():
+    """Pool del proceso actual (se crea de nuevo tras un fork)"""
+    global _pool, _pool_pid
+    if _pool is not None and _pool_pid == os.getpid():
+        return _pool
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            try:
+                from psycopg_pool import ConnectionPool
+            except ImportError:
+                raise RuntimeError(
+                    'psycopg no está instalado: pip install "psycopg[binary,pool]"'
+                ) from None
+
+            from tienda.db import database_url
+
+            # El pool heredado del proceso padre no se cierra: sus sockets
+            # siguen siendo del padre
+            _pool = ConnectionPool(
+                database_url(),
+                min_size=PG_POOL_MIN,
+                max_size=PG_POOL_MAX,
+                timeout=PG_POOL_TIMEOUT,
+                kwargs={
+                    "prepare_threshold": _prepare_threshold(),
+                    "row_factory": _row_factory,
+                },
+                configure=_configure,
+                name="tienda",
+                open=True,
+            )
+            _pool_pid = os.getpid()
+    return _pool
+
+
+class PgConnection:
+    """Conexión prestada del pool; close() la devuelve"""
+
+    def __init__(self, pool, read_only=False):
+        self._pool = pool
+        self._conn = pool.getconn()
+        self._conn.read_only = read_only
+        self._streams = 0
+
+    def execute(self, sql, params=()):
+        return self._conn.execute(translate(sql), params)
+
+    def executemany(self, sql, seq_of_params):
+        cursor = self._conn.cursor()
+        cursor.executemany(translate(sql), list(seq_of_params))
+        return cursor
+
+    def stream(self, sql, params=()):
+        """Cursor del servidor: fetchmany trae las filas por lotes"""
+        self._streams += 1
+        cursor = self._conn.cursor(name=f"tienda_stream_{self._streams}")
+        cursor.execute(translate(sql), params)
+        return cursor
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    @property
+    def in_transaction(self):
+        from psycopg.pq import TransactionStatus
+
+        return self._conn.info.transaction_status != TransactionStatus.IDLE
+
+    def close(self):
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        if not conn.closed:
+            conn.rollback()
+            conn.read_only = False
+        self._pool.putconn(conn)
+
+
+def get_connection(read_only=False):
+    return PgConnection(get_pool(), read_only=read_only)
+
+
+def init_database():
+    """Crear las tablas que falten (las migraciones las aplica tienda.db)"""
+    conn = get_connection()
+    for statement in SCHEMA:
+        conn.execute(statement)
+    conn.commit()
+    conn.close()
+    return "postgresql"
+
+
+def copy_from_sqlite(sqlite_path):
+    """Copiar todas las tablas de la base SQLite; las tablas destino se vacían.
+
+    La base SQLite se migra primero para que tenga las mismas columnas.
+    """
+    from tienda import migrations
+
+    source = sqlite3.connect(sqlite_path)
+    migrations.migrate(source)
+    source.row_factory = sqlite3.Row
+    existing = {
+        row[0]
+        for row in source.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    }
+
+    conn = get_connection()
+    conn.execute(f"TRUNCATE {', '.join(COPY_TABLES)}")
+    counts = {}
+    for table in COPY_TABLES:
+        if table not in existing:
+            continue
+        rows = source.execute(f"SELECT * FROM {table}").fetchall()
+        counts[table] = len(rows)
+        if not rows:
+            continue
+        columns = rows[0].keys()
+        conn.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' * len(columns))})",
+            [tuple(row) for row in rows],
+        )
+        if "id" in columns:
+            # Las identidades siguen después del id más alto copiado
+            conn.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"(SELECT MAX(id) FROM {table}))"
+            )
+    conn.commit()
+    conn.close()
+    source.close()
+    return counts
+
+
+if __name__ == "__main__":
+    from tienda import db
+
+    if not db.is_postgres():
+        sys.exit("DATABASE_URL debe apuntar a PostgreSQL (postgresql://...)")
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command == "init":
+        db.init_database()
+        print("✅ Tablas creadas en PostgreSQL")
+    elif command == "copy":
+        db.init_database()
+        for table, count in copy_from_sqlite(db.database_path()).items():
+            print(f"✅ {table}: {count} filas")
+    else:
+        sys.exit("Uso: python -m tienda.pg init|copy")
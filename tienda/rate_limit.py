@@ -0,0 +1,236 @@
+"""Rate limiting con token bucket para los endpoints de autenticación.
+
+/api/auth/login ejecuta bcrypt, así que cada intento cuesta CPU real. El
+limitador rechaza con 429 antes de tocar la base de datos o bcrypt.
+
+Cada regla es un bucket "capacidad/segundos": la capacidad es la ráfaga
+permitida y el bucket se rellena a razón de capacidad/segundos tokens por
+segundo. Las claves combinan el nombre de la regla con la IP o el usuario.
+
+Variables de entorno:
+    RATE_LIMIT_ENABLED     "false" para desactivar (default true)
+    RATE_LIMIT_STORE       "memory" (por proceso) o "sqlite" (compartido entre
+                           workers) (default memory)
+    RATE_LIMIT_DB          Archivo SQLite del store compartido
+                           (default rate_limit.sqlite3 junto a la app)
+    RATE_LIMIT_TRUST_PROXY "true" para tomar la IP de X-Forwarded-For / X-Real-IP
+    RATE_LIMIT_LOGIN_IP    Regla por IP para login (default 20/60)
+    RATE_LIMIT_LOGIN_USER  Regla por usuario para login (default 5/300)
+    RATE_LIMIT_REGISTER_IP Regla por IP para registro (default 5/600)
+"""
+
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import jsonify, request
+
+RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "true").lower() != "false"
+RATE_LIMIT_STORE = os.environ.get("RATE_LIMIT_STORE", "memory")
+RATE_LIMIT_DB = os.environ.get(
+    "RATE_LIMIT_DB",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "rate_limit.sqlite3"),
+)
+TRUST_PROXY = os.environ.get("RATE_LIMIT_TRUST_PROXY", "false").lower() == "true"
+
+
+def parse_rule(rule):
+    """Convertir "capacidad/segundos" en (capacidad, tokens_por_segundo)"""
+    capacity, period = rule.split("/")
+    capacity = float(capacity)
+    return capacity, capacity / float(period)
+
+
+def _refill(tokens, updated_at, capacity, rate, now):
+    elapsed = max(0.0, now - updated_at)
+    return min(capacity, tokens + elapsed * rate)
+
+
+class MemoryStore:
+    """Buckets en memoria del proceso, con límite de claves (LRU)"""
+
+    def __init__(self, max_keys=50000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, rate, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (capacity, now))
+            tokens = _refill(tokens, updated_at, capacity, rate, now)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, _retry_after(tokens, rate)
+
+    def reset(self, key):
+        with self._lock:
+            self._buckets.pop(key, None)
+
+
+class SQLiteStore:
+    """Buckets compartidos entre workers en un archivo SQLite dedicado.
+
+    Vive en un archivo separado de db.sqlite3 para no competir por el lock de
+    escritura con carritos y órdenes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+                key TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """
+        )
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def take(self, key, capacity, rate, now=None):
+        # time.time() porque el reloj se comparte entre procesos
+        now = time.time() if now is None else now
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?",
+                (key,),
+            ).fetchone()
+            tokens = _refill(*(row or (capacity, now)), capacity, rate, now)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            conn.execute(
+                """
+                INSERT INTO rate_limit_buckets (key, tokens, updated_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    tokens = excluded.tokens, updated_at = excluded.updated_at
+            """,
+                (key, tokens, now),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed, _retry_after(tokens, rate)
+
+    def reset(self, key):
+        self._connection().execute(
+            "DELETE FROM rate_limit_buckets WHERE key = ?", (key,)
+        )
+
+    def purge(self, older_than_seconds=86400):
+        """Eliminar buckets inactivos (ya estarían llenos de nuevo)"""
+        self._connection().execute(
+            "DELETE FROM rate_limit_buckets WHERE updated_at < ?",
+            (time.time() - older_than_seconds,),
+        )
+
+
+def _retry_after(tokens, rate):
+    if tokens >= 1 or rate <= 0:
+        return 0
+    return math.ceil((1 - tokens) / rate)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if RATE_LIMIT_STORE == "sqlite":
+                    _store = SQLiteStore(RATE_LIMIT_DB)
+                else:
+                    _store = MemoryStore()
+    return _store
+
+
+def client_ip():
+    """IP del cliente; solo confía en headers del proxy si está configurado"""
+    if TRUST_PROXY:
+        forwarded = request.headers.get("X-Forwarded-For", "")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+        if request.headers.get("X-Real-IP"):
+            return request.headers["X-Real-IP"]
+    return request.remote_addr or "unknown"
+
+
+def request_username():
+    data = request.get_json(silent=True) or {}
+    username = data.get("username")
+    if isinstance(username, str) and username.strip():
+        return username.strip().lower()
+    return None
+
+
+def rate_limited(name, ip_rule=None, user_rule=None):
+    """Decorador: aplicar buckets por IP y/o por usuario antes del handler.
+
+    Las reglas se leen de RATE_LIMIT_<NAME>_IP y RATE_LIMIT_<NAME>_USER, con
+    ip_rule/user_rule como valores por defecto.
+    """
+    env_prefix = f"RATE_LIMIT_{name.upper()}"
+    ip_rule = os.environ.get(f"{env_prefix}_IP", ip_rule)
+    user_rule = os.environ.get(f"{env_prefix}_USER", user_rule)
+    ip_bucket = parse_rule(ip_rule) if ip_rule else None
+    user_bucket = parse_rule(user_rule) if user_rule else None
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not RATE_LIMIT_ENABLED:
+                return fn(*args, **kwargs)
+
+            store = get_store()
+            checks = []
+            if ip_bucket:
+                checks.append((f"{name}:ip:{client_ip()}", ip_bucket))
+            username = request_username() if user_bucket else None
+            if username:
+                checks.append((f"{name}:user:{username}", user_bucket))
+
+            for key, (capacity, rate) in checks:
+                allowed, retry_after = store.take(key, capacity, rate)
+                if not allowed:
+                    print(f"🚫 Rate limit excedido: {key}")
+                    response = jsonify(
+                        {
+                            "error": "Demasiados intentos, intenta más tarde",
+                            "retry_after": retry_after,
+                        }
+                    )
+                    response.status_code = 429
+                    response.headers["Retry-After"] = str(retry_after)
+                    return response
+
+            return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
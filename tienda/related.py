@@ -0,0 +1,213 @@
+"""Productos que se compran juntos, a partir de order_items.
+
+Un proceso periódico arma la matriz órdenes x productos (1 si la orden lleva
+el producto) como matriz dispersa de SciPy; su producto X^T X cuenta en
+cuántas órdenes aparece cada par de productos. Para cada producto se guardan
+en related_products los RELATED_TOP_K vecinos con mayor similitud coseno
+(veces juntos / raíz del producto de sus órdenes), para que los productos
+muy populares no aparezcan en todas las listas:
+
+    python -m tienda.related      # con cron, p. ej. cada noche
+
+Incluye las órdenes de los archivos por mes (tienda.archive). Requiere numpy
+y scipy; la app no los necesita para servir.
+
+related_ids() consulta un mapa en memoria que se recarga cada RELATED_TTL
+segundos, así que /api/products/<id>/related no toca la base de datos.
+
+Variables de entorno:
+    RELATED_TOP_K  Vecinos guardados por producto (default 10)
+    RELATED_TTL    Segundos entre recargas del mapa (default 300)
+"""
+
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from array import array
+
+from tienda import archive, db
+
+RELATED_TOP_K = int(os.environ.get("RELATED_TOP_K", 10))
+RELATED_TTL = int(os.environ.get("RELATED_TTL", 300))
+BATCH_SIZE = 10000
+
+_get_connection = None
+_related = {}
+_loaded_at = None
+_reload_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    global _reload_lock
+    _reload_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    # Como en tienda.catalog: el lock copiado en el fork puede estar tomado
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def init_app(get_connection):
+    global _get_connection
+    _get_connection = get_connection
+
+
+def reload():
+    """Recargar el mapa {product_id: [related_id, ...]} en orden de rango"""
+    global _related, _loaded_at
+    conn = _get_connection()
+    try:
+        rows = conn.execute(
+            "SELECT product_id, related_id FROM related_products"
+            " ORDER BY product_id, rank"
+        ).fetchall()
+    finally:
+        conn.close()
+    related = {}
+    for product_id, related_id in rows:
+        related.setdefault(product_id, []).append(related_id)
+    _related = related
+    _loaded_at = time.monotonic()
+
+
+def related_ids(product_id):
+    """Ids de los productos comprados junto con product_id, mejores primero"""
+    if _loaded_at is None or time.monotonic() - _loaded_at >= RELATED_TTL:
+        # La primera carga espera; después un solo hilo recarga y el resto
+        # sigue con el mapa anterior
+        if _reload_lock.acquire(blocking=_loaded_at is None):
+            try:
+                reload()
+            finally:
+                _reload_lock.release()
+    return _related.get(product_id, [])
+
+
+def _read_pairs(conn, table, order_ids, product_ids):
+    cursor = db.stream(conn, f"SELECT order_id, product_id FROM {table}")
+    try:
+        while True:
+            rows = cursor.fetchmany(BATCH_SIZE)
+            if not rows:
+                return
+            for order_id, product_id in rows:
+                order_ids.append(order_id)
+                product_ids.append(product_id)
+    finally:
+        cursor.close()
+
+
+def _order_product_pairs(conn):
+    """array("q") de order_ids y product_ids de la base principal y los archivos"""
+    order_ids, product_ids = array("q"), array("q")
+    _read_pairs(conn, "order_items", order_ids, product_ids)
+    if isinstance(conn, sqlite3.Connection):
+        months = archive.list_months()
+        for start in range(0, len(months), archive.ATTACH_LIMIT):
+            chunk = months[start : start + archive.ATTACH_LIMIT]
+            with archive.attached(conn, chunk) as schemas:
+                for schema in schemas:
+                    _read_pairs(conn, f"{schema}.order_items", order_ids, product_ids)
+    return order_ids, product_ids
+
+
+def compute(conn, top_k=RELATED_TOP_K):
+    """[(product_id, rank, related_id, score, together)] de todas las órdenes"""
+    try:
+        # Solo el proceso periódico los necesita: los workers no los cargan
+        import numpy as np
+        from scipy import sparse
+    except ImportError:
+        raise RuntimeError(
+            "numpy y scipy no están instalados: pip install scipy"
+        ) from None
+
+    order_ids, product_ids = _order_product_pairs(conn)
+    if not order_ids:
+        return []
+    order_ids = np.frombuffer(order_ids, dtype=np.int64)
+    product_ids = np.frombuffer(product_ids, dtype=np.int64)
+
+    orders, order_index = np.unique(order_ids, return_inverse=True)
+    products, product_index = np.unique(product_ids, return_inverse=True)
+    # Órdenes x productos; un producto repetido en la orden cuenta una vez
+    matrix = sparse.coo_matrix(
+        (np.ones(len(order_index), dtype=np.int64), (order_index, product_index)),
+        shape=(len(orders), len(products)),
+    ).tocsr()
+    matrix.data[:] = 1
+
+    together = (matrix.T @ matrix).tocsr()
+    counts = together.diagonal().astype(np.float64)
+    together.setdiag(0)
+    together.eliminate_zeros()
+
+    rows = []
+    for i in range(len(products)):
+        start, end = together.indptr[i], together.indptr[i + 1]
+        if start == end:
+            continue
+        neighbors = together.indices[start:end]
+        shared = together.data[start:end]
+        scores = shared / np.sqrt(counts[i] * counts[neighbors])
+        # Mayor similitud, luego más veces juntos, luego id menor
+        order = np.lexsort((products[neighbors], -shared, -scores))[:top_k]
+        for rank, j in enumerate(order, 1):
+            rows.append(
+                (
+                    int(products[i]),
+                    rank,
+                    int(products[neighbors[j]]),
+                    round(float(scores[j]), 6),
+                    int(shared[j]),
+                )
+            )
+    return rows
+
+
+def save(conn, rows):
+    """Reemplazar related_products con las filas calculadas"""
+    db.begin_write(conn)
+    try:
+        conn.execute("DELETE FROM related_products")
+        conn.executemany(
+            """
+            INSERT INTO related_products (
+                product_id, rank, related_id, score, together
+            ) VALUES (?, ?, ?, ?, ?)
+        """,
+            rows,
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calcular productos relacionados")
+    parser.add_argument("--top-k", type=int, default=RELATED_TOP_K)
+    args = parser.parse_args()
+
+    db.init_database()
+    started = time.perf_counter()
+    # Los archivos se adjuntan con URIs de solo lectura: conexión de lectura
+    conn = db.get_read_connection()
+    try:
+        rows = compute(conn, args.top_k)
+    except RuntimeError as e:
+        raise SystemExit(f"❌ {e}")
+    finally:
+        conn.close()
+    conn = db.get_connection()
+    try:
+        save(conn, rows)
+    finally:
+        conn.close()
+    products = len({row[0] for row in rows})
+    print(
+        f"✅ {len(rows)} relaciones para {products} productos"
+        f" en {time.perf_counter() - started:.1f} s"
+    )
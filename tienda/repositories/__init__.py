@@ -0,0 +1,15 @@
+"""Acceso a datos de la tienda: catálogo, usuarios, carritos y órdenes.
+
+Cada módulo expone funciones que reciben la conexión como primer argumento,
+así el llamador decide la transacción (una petición, un trabajo de
+tienda.writer) y el commit:
+
+    from tienda.repositories import carts
+
+    conn = db.get_read_connection()
+    items = carts.list_items(conn, user_id)
+
+Las consultas usan SQL común a SQLite y PostgreSQL con placeholders `?` o
+`:nombre` (tienda.pg los traduce) e INSERT ... RETURNING para obtener ids, de
+modo que los mismos repositorios sirven con ambos backends de tienda.db.
+"""
@@ -0,0 +1,125 @@
+"""Carritos: cart_items y el contador de versión por usuario (cart_versions)"""
+
+
+def get_version(conn, user_id):
+    row = conn.execute(
+        "SELECT version FROM cart_versions WHERE user_id = ?", (user_id,)
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def touch(conn, user_id):
+    """Incrementar la versión del carrito"""
+    conn.execute(
+        """
+        INSERT INTO cart_versions (user_id, version) VALUES (?, 1)
+        ON CONFLICT(user_id) DO UPDATE SET version = cart_versions.version + 1
+    """,
+        (user_id,),
+    )
+
+
+def list_items(conn, user_id):
+    """[(product_id, quantity)] del más reciente al más antiguo"""
+    rows = conn.execute(
+        """
+        SELECT product_id, quantity FROM cart_items
+        WHERE user_id = ?
+        ORDER BY updated_at DESC, id DESC
+    """,
+        (user_id,),
+    ).fetchall()
+    return [(row[0], row[1]) for row in rows]
+
+
+def get_quantities(conn, user_id):
+    """{product_id: quantity} del carrito"""
+    rows = conn.execute(
+        "SELECT product_id, quantity FROM cart_items WHERE user_id = ?",
+        (user_id,),
+    ).fetchall()
+    return {row["product_id"]: row["quantity"] for row in rows}
+
+
+def get_quantity(conn, user_id, product_id):
+    """Cantidad en el carrito, o None si el producto no está"""
+    row = conn.execute(
+        "SELECT quantity FROM cart_items WHERE user_id = ? AND product_id = ?",
+        (user_id, product_id),
+    ).fetchone()
+    return row["quantity"] if row else None
+
+
+def next_position(conn, user_id):
+    return conn.execute(
+        """
+        SELECT COALESCE(MAX(order_position), 0) + 1
+        FROM cart_items WHERE user_id = ?
+    """,
+        (user_id,),
+    ).fetchone()[0]
+
+
+def add_quantity(conn, user_id, product_id, quantity):
+    conn.execute(
+        """
+        UPDATE cart_items
+        SET quantity = quantity + ?, updated_at = CURRENT_TIMESTAMP
+        WHERE user_id = ? AND product_id = ?
+    """,
+        (quantity, user_id, product_id),
+    )
+
+
+def set_quantities(conn, user_id, quantities):
+    """Fijar cantidades de productos que ya están en el carrito"""
+    conn.executemany(
+        """
+        UPDATE cart_items
+        SET quantity = ?, updated_at = CURRENT_TIMESTAMP
+        WHERE user_id = ? AND product_id = ?
+    """,
+        [(quantity, user_id, product_id) for product_id, quantity in quantities],
+    )
+
+
+def set_quantity(conn, user_id, product_id, quantity):
+    set_quantities(conn, user_id, [(product_id, quantity)])
+
+
+def insert_items(conn, user_id, items):
+    """Insertar [(product_id, quantity, order_position)]"""
+    conn.executemany(
+        """
+        INSERT INTO cart_items (user_id, product_id, quantity, order_position, updated_at)
+        VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+    """,
+        [
+            (user_id, product_id, quantity, position)
+            for product_id, quantity, position in items
+        ],
+    )
+
+
+def insert_item(conn, user_id, product_id, quantity, position=0):
+    insert_items(conn, user_id, [(product_id, quantity, position)])
+
+
+def remove_items(conn, user_id, product_ids):
+    conn.executemany(
+        "DELETE FROM cart_items WHERE user_id = ? AND product_id = ?",
+        [(user_id, product_id) for product_id in product_ids],
+    )
+
+
+def remove_item(conn, user_id, product_id):
+    """Quitar el producto; devuelve cuántas filas se borraron"""
+    return conn.execute(
+        "DELETE FROM cart_items WHERE user_id = ? AND product_id = ?",
+        (user_id, product_id),
+    ).rowcount
+
+
+def clear(conn, user_id):
+    """Vaciar el carrito; devuelve cuántos productos tenía"""
+    return conn.execute("DELETE FROM cart_items WHERE user_id = ?", (user_id,)).rowcount
@@ -0,0 +1,38 @@
+"""Consultas sobre la tabla productos"""
+
+
+def list_products(conn):
+    return conn.execute("SELECT * FROM productos ORDER BY name").fetchall()
+
+
+def get_stock(conn, product_id):
+    """Fila (id, stock) del producto o None si no existe"""
+    return conn.execute(
+        "SELECT id, stock FROM productos WHERE id = ?", (product_id,)
+    ).fetchone()
+
+
+def _get_column(conn, column, product_ids):
+    product_ids = tuple(product_ids)
+    if not product_ids:
+        return {}
+    placeholders = ",".join("?" * len(product_ids))
+    rows = conn.execute(
+        f"SELECT id, {column} FROM productos WHERE id IN ({placeholders})",
+        product_ids,
+    ).fetchall()
+    return {row[0]: row[1] for row in rows}
+
+
+def get_stocks(conn, product_ids):
+    """{product_id: stock} de los productos que existen"""
+    return _get_column(conn, "stock", product_ids)
+
+
+def get_prices(conn, product_ids):
+    """{product_id: price_cents} de los productos que existen"""
+    return _get_column(conn, "price_cents", product_ids)
+
+
+def list_images(conn):
+    return [row[0] for row in conn.execute("SELECT DISTINCT image FROM productos")]
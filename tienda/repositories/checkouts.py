@@ -0,0 +1,61 @@
+"""Sesiones de Stripe Checkout: el carrito cobrado, guardado al crear la sesión"""
+
+import json
+
+CUSTOMER_COLUMNS = (
+    "customer_name",
+    "customer_phone",
+    "customer_email",
+    "delivery_address",
+    "order_notes",
+)
+
+
+def create(conn, session_id, items, total_cents, customer, expires_at):
+    """Guardar los items ([{product_id, name, image, quantity, unit_price_cents}])
+    y los datos del cliente ({columna: valor}) de la sesión"""
+    conn.execute(
+        f"""
+        INSERT INTO checkout_sessions (
+            session_id, items, total_cents, expires_at,
+            {', '.join(CUSTOMER_COLUMNS)}
+        ) VALUES (?, ?, ?, ?, {', '.join('?' * len(CUSTOMER_COLUMNS))})
+    """,
+        (
+            session_id,
+            json.dumps(items, ensure_ascii=False),
+            total_cents,
+            expires_at,
+            *(customer.get(column, "") for column in CUSTOMER_COLUMNS),
+        ),
+    )
+
+
+def get(conn, session_id):
+    """dict de la sesión con items ya decodificados, o None"""
+    row = conn.execute(
+        "SELECT * FROM checkout_sessions WHERE session_id = ?", (session_id,)
+    ).fetchone()
+    if row is None:
+        return None
+    checkout = dict(row)
+    checkout["items"] = json.loads(checkout["items"])
+    return checkout
+
+
+def delete(conn, session_id):
+    conn.execute("DELETE FROM checkout_sessions WHERE session_id = ?", (session_id,))
+
+
+def purge(conn, now, legacy_expires_at):
+    """Borrar las sesiones vencidas; devuelve cuántas.
+
+    Las filas de antes de expires_at reciben legacy_expires_at.
+    """
+    conn.execute(
+        "UPDATE checkout_sessions SET expires_at = ? WHERE expires_at IS NULL",
+        (legacy_expires_at,),
+    )
+    return conn.execute(
+        "DELETE FROM checkout_sessions WHERE expires_at < ?", (now,)
+    ).rowcount
@@ -0,0 +1,51 @@
+"""Llaves de idempotencia: respuesta guardada por llave, con expiración"""
+
+
+def get(conn, key):
+    return conn.execute(
+        """
+        SELECT fingerprint, status, body, expires_at
+        FROM idempotency_keys WHERE key = ?
+    """,
+        (key,),
+    ).fetchone()
+
+
+def claim(conn, key, fingerprint, expires_at):
+    """Marcar la llave como en curso (status NULL), reemplazando una vencida"""
+    conn.execute(
+        """
+        INSERT INTO idempotency_keys (key, fingerprint, status, body, expires_at)
+        VALUES (?, ?, NULL, NULL, ?)
+        ON CONFLICT(key) DO UPDATE SET
+            fingerprint = excluded.fingerprint,
+            status = NULL,
+            body = NULL,
+            expires_at = excluded.expires_at
+    """,
+        (key, fingerprint, expires_at),
+    )
+
+
+def complete(conn, key, status, body, expires_at):
+    conn.execute(
+        """
+        UPDATE idempotency_keys SET status = ?, body = ?, expires_at = ?
+        WHERE key = ?
+    """,
+        (status, body, expires_at, key),
+    )
+
+
+def release(conn, key):
+    """Soltar una llave en curso para que el siguiente intento ejecute"""
+    conn.execute(
+        "DELETE FROM idempotency_keys WHERE key = ? AND status IS NULL", (key,)
+    )
+
+
+def purge(conn, now):
+    """Borrar las llaves vencidas; devuelve cuántas"""
+    return conn.execute(
+        "DELETE FROM idempotency_keys WHERE expires_at < ?", (now,)
+    ).rowcount
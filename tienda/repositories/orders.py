@@ -0,0 +1,127 @@
+"""Órdenes y sus items"""
+
+# Columnas que create() acepta en el diccionario de la orden
+ORDER_COLUMNS = (
+    "user_id",
+    "order_number",
+    "payment_method",
+    "payment_status",
+    "total_cents",
+    "stripe_payment_intent_id",
+    "customer_name",
+    "customer_phone",
+    "customer_email",
+    "delivery_address",
+    "order_notes",
+)
+
+
+def _table(name, schema):
+    # schema: base adjuntada con ATTACH (archivo de órdenes), None = principal
+    return f"{schema}.{name}" if schema else name
+
+
+def create(conn, order):
+    """Insertar la orden ({columna: valor}) y devolver su id"""
+    columns = [column for column in ORDER_COLUMNS if column in order]
+    return conn.execute(
+        f"""
+        INSERT INTO orders ({', '.join(columns)}, created_at)
+        VALUES ({', '.join(':' + column for column in columns)}, CURRENT_TIMESTAMP)
+        RETURNING id
+    """,
+        {column: order[column] for column in columns},
+    ).fetchone()[0]
+
+
+def add_items(conn, order_id, items):
+    """Insertar [(product_id, quantity, unit_price_cents, total_price_cents)]"""
+    conn.executemany(
+        """
+        INSERT INTO order_items (
+            order_id, product_id, quantity, unit_price_cents, total_price_cents
+        ) VALUES (?, ?, ?, ?, ?)
+    """,
+        [(order_id, *item) for item in items],
+    )
+
+
+def get_by_number(conn, order_number, schema=None):
+    return conn.execute(
+        f"SELECT * FROM {_table('orders', schema)} WHERE order_number = ?",
+        (order_number,),
+    ).fetchone()
+
+
+def find_by_payment(conn, stripe_payment_intent_id, schema=None):
+    """Orden creada para la sesión o Payment Intent de Stripe, o None.
+
+    Solo busca en una base; para incluir el archivo de órdenes usar
+    tienda.archive.find_by_payment() o get_archived_payment_month().
+    """
+    return conn.execute(
+        f"""
+        SELECT * FROM {_table('orders', schema)}
+        WHERE stripe_payment_intent_id = ?
+    """,
+        (stripe_payment_intent_id,),
+    ).fetchone()
+
+
+def list_for_user(conn, user_id, schema=None):
+    return conn.execute(
+        f"""
+        SELECT * FROM {_table('orders', schema)}
+        WHERE user_id = ?
+        ORDER BY created_at DESC
+    """,
+        (user_id,),
+    ).fetchall()
+
+
+def list_items(conn, order_id, schema=None):
+    """Items con nombre e imagen del producto (None si ya no existe)"""
+    return conn.execute(
+        f"""
+        SELECT oi.*, p.name, p.image
+        FROM {_table('order_items', schema)} oi
+        LEFT JOIN productos p ON oi.product_id = p.id
+        WHERE oi.order_id = ?
+    """,
+        (order_id,),
+    ).fetchall()
+
+
+def list_archived_months(conn, user_id):
+    """Meses ("YYYY_MM") con órdenes del usuario en el archivo, recientes primero"""
+    return [
+        row[0]
+        for row in conn.execute(
+            """
+            SELECT month FROM archived_order_months
+            WHERE user_id = ?
+            ORDER BY month DESC
+        """,
+            (user_id,),
+        )
+    ]
+
+
+def get_archived_payment_month(conn, stripe_payment_intent_id):
+    """Mes ("YYYY_MM") del archivo con la orden de ese pago, o None"""
+    row = conn.execute(
+        "SELECT month FROM archived_payments WHERE stripe_payment_intent_id = ?",
+        (stripe_payment_intent_id,),
+    ).fetchone()
+    return row[0] if row else None
+
+
+def mark_paid(conn, order_id, stripe_payment_intent_id):
+    conn.execute(
+        """
+        UPDATE orders
+        SET payment_status = 'completed', updated_at = CURRENT_TIMESTAMP
+        WHERE id = ? AND stripe_payment_intent_id = ?
+    """,
+        (order_id, stripe_payment_intent_id),
+    )
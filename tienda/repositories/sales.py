@@ -0,0 +1,97 @@
+"""Agregados de ventas por día (daily_sales) y por día y producto
+(daily_product_sales).
+
+Se actualizan en la misma transacción que crea la orden, así que los reportes
+no recorren orders ni order_items. El día es la fecha de CURRENT_TIMESTAMP,
+igual que created_at de la orden.
+"""
+
+# Dimensiones de daily_product_sales que se pueden agrupar
+GROUP_COLUMNS = ("supplier", "brand")
+
+
+def record_order(conn, items):
+    """Sumar a los agregados del día la orden con
+    [(product_id, quantity, unit_price_cents, total_price_cents)]"""
+    by_product = {}
+    for product_id, quantity, _, total_price_cents in items:
+        totals = by_product.setdefault(product_id, [0, 0])
+        totals[0] += quantity
+        totals[1] += total_price_cents
+
+    conn.execute(
+        """
+        INSERT INTO daily_sales (day, orders, revenue_cents)
+        VALUES (date(CURRENT_TIMESTAMP), 1, ?)
+        ON CONFLICT(day) DO UPDATE SET
+            orders = daily_sales.orders + 1,
+            revenue_cents = daily_sales.revenue_cents + excluded.revenue_cents
+    """,
+        (sum(revenue for _, revenue in by_product.values()),),
+    )
+    conn.executemany(
+        """
+        INSERT INTO daily_product_sales (
+            day, product_id, supplier, brand, quantity, revenue_cents, orders
+        ) VALUES (
+            date(CURRENT_TIMESTAMP), ?,
+            (SELECT supplier FROM productos WHERE id = ?),
+            (SELECT brand FROM productos WHERE id = ?),
+            ?, ?, 1
+        )
+        ON CONFLICT(day, product_id) DO UPDATE SET
+            quantity = daily_product_sales.quantity + excluded.quantity,
+            revenue_cents = daily_product_sales.revenue_cents + excluded.revenue_cents,
+            orders = daily_product_sales.orders + 1
+    """,
+        [
+            (product_id, product_id, product_id, quantity, revenue_cents)
+            for product_id, (quantity, revenue_cents) in by_product.items()
+        ],
+    )
+
+
+def by_day(conn, start, end):
+    """Órdenes e ingresos de cada día entre start y end ("YYYY-MM-DD")"""
+    return conn.execute(
+        """
+        SELECT day, orders, revenue_cents FROM daily_sales
+        WHERE day BETWEEN ? AND ?
+        ORDER BY day
+    """,
+        (start, end),
+    ).fetchall()
+
+
+def by_product(conn, start, end, limit):
+    """Productos con más ingresos entre start y end"""
+    return conn.execute(
+        """
+        SELECT s.product_id, p.name, SUM(s.quantity) AS quantity,
+               SUM(s.revenue_cents) AS revenue_cents, SUM(s.orders) AS orders
+        FROM daily_product_sales s
+        LEFT JOIN productos p ON p.id = s.product_id
+        WHERE s.day BETWEEN ? AND ?
+        GROUP BY s.product_id, p.name
+        ORDER BY revenue_cents DESC
+        LIMIT ?
+    """,
+        (start, end, limit),
+    ).fetchall()
+
+
+def by_group(conn, column, start, end):
+    """Ingresos por proveedor o marca (column en GROUP_COLUMNS) entre start y end"""
+    if column not in GROUP_COLUMNS:
+        raise ValueError(f"Columna no agrupable: {column}")
+    return conn.execute(
+        f"""
+        SELECT {column}, SUM(quantity) AS quantity,
+               SUM(revenue_cents) AS revenue_cents
+        FROM daily_product_sales
+        WHERE day BETWEEN ? AND ?
+        GROUP BY {column}
+        ORDER BY revenue_cents DESC
+    """,
+        (start, end),
+    ).fetchall()
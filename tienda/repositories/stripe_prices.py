@@ -0,0 +1,29 @@
+"""Espejo del catálogo en Stripe: Product y Price vigentes de cada producto"""
+
+
+def get_all(conn):
+    """{product_id: fila} de los productos sincronizados"""
+    rows = conn.execute("SELECT * FROM stripe_prices").fetchall()
+    return {row["product_id"]: row for row in rows}
+
+
+def save(conn, product_id, stripe_product_id, stripe_price_id, name, price_cents):
+    conn.execute(
+        """
+        INSERT INTO stripe_prices (
+            product_id, stripe_product_id, stripe_price_id, name, price_cents,
+            synced_at
+        ) VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(product_id) DO UPDATE SET
+            stripe_product_id = excluded.stripe_product_id,
+            stripe_price_id = excluded.stripe_price_id,
+            name = excluded.name,
+            price_cents = excluded.price_cents,
+            synced_at = excluded.synced_at
+    """,
+        (product_id, stripe_product_id, stripe_price_id, name, price_cents),
+    )
+
+
+def delete(conn, product_id):
+    conn.execute("DELETE FROM stripe_prices WHERE product_id = ?", (product_id,))
@@ -0,0 +1,95 @@
+"""Usuarios y sus sesiones (user_sessions)"""
+
+
+def find_by_username(conn, username):
+    return conn.execute(
+        "SELECT * FROM users WHERE username = ?", (username,)
+    ).fetchone()
+
+
+def exists(conn, username, email):
+    """True si el usuario o el email ya están registrados"""
+    row = conn.execute(
+        "SELECT id FROM users WHERE username = ? OR email = ?", (username, email)
+    ).fetchone()
+    return row is not None
+
+
+def create(conn, username, email, password_hash, first_name, last_name):
+    """Insertar el usuario y devolver su id"""
+    return conn.execute(
+        """
+        INSERT INTO users (username, email, password_hash, first_name, last_name)
+        VALUES (?, ?, ?, ?, ?)
+        RETURNING id
+    """,
+        (username, email, password_hash, first_name, last_name),
+    ).fetchone()[0]
+
+
+def update_password_hash(conn, user_id, password_hash):
+    conn.execute(
+        "UPDATE users SET password_hash = ? WHERE id = ?", (password_hash, user_id)
+    )
+
+
+def set_admin(conn, username, is_admin):
+    """Dar o quitar el permiso de administrador; devuelve cuántas filas cambiaron"""
+    return conn.execute(
+        "UPDATE users SET is_admin = ? WHERE username = ?", (int(is_admin), username)
+    ).rowcount
+
+
+def list_admins(conn):
+    return conn.execute(
+        "SELECT id, username, email FROM users WHERE is_admin = 1 ORDER BY username"
+    ).fetchall()
+
+
+def get_fields(conn, user_id, fields):
+    """Columnas indicadas del usuario, o None si no existe"""
+    return conn.execute(
+        f"SELECT {', '.join(fields)} FROM users WHERE id = ?", (user_id,)
+    ).fetchone()
+
+
+def insert_session(conn, user_id, jti, expires_at, active=True):
+    conn.execute(
+        """
+        INSERT INTO user_sessions (user_id, token_jti, expires_at, is_active)
+        VALUES (?, ?, ?, ?)
+    """,
+        (user_id, jti, expires_at, int(active)),
+    )
+
+
+def deactivate_session(conn, jti):
+    """Marcar la sesión como inactiva; devuelve cuántas filas cambiaron"""
+    return conn.execute(
+        "UPDATE user_sessions SET is_active = 0 WHERE token_jti = ?", (jti,)
+    ).rowcount
+
+
+def deactivate_user_sessions(conn, user_id, keep_jti=None):
+    """Marcar inactivas las sesiones del usuario salvo keep_jti; devuelve sus jti"""
+    rows = conn.execute(
+        """
+        UPDATE user_sessions SET is_active = 0
+        WHERE user_id = ? AND is_active = 1 AND token_jti != ?
+        RETURNING token_jti
+    """,
+        (user_id, keep_jti or ""),
+    ).fetchall()
+    return [row[0] for row in rows]
+
+
+def session_active(conn, jti):
+    """True/False según user_sessions, o None si el jti no está registrado"""
+    row = conn.execute(
+        "SELECT is_active FROM user_sessions WHERE token_jti = ?", (jti,)
+    ).fetchone()
+    return bool(row["is_active"]) if row else None
+
+
+def purge_sessions(conn, before):
+    conn.execute("DELETE FROM user_sessions WHERE expires_at < ?", (before,))
@@ -0,0 +1,160 @@
+"""Perfil de producción con gunicorn (preload + workers con hilos).
+
+    gunicorn -c gunicorn.conf.py app_pythonanywhere:app
+
+El proceso maestro importa la app y carga el catálogo, el manifiesto del build
+e index.html antes de hacer fork, así que los workers comparten esas páginas
+de memoria (copy-on-write) y atienden la primera petición con la caché llena.
+
+Tamaño por defecto: SQLite admite un solo escritor, así que más procesos solo
+agregan espera por el lock de escritura. Se usan pocos procesos
+(min(CPUs, 4)) con varios hilos cada uno para las lecturas y la espera de red
+(Stripe).
+
+Cada worker recibe en pre_fork un ORDER_WORKER_ID que ningún otro worker vivo
+tiene (el menor libre a partir del ORDER_WORKER_ID del maestro, default 0),
+así los números de orden de tienda.order_numbers no chocan entre procesos.
+Durante un reinicio ordenado conviven los workers viejos y los nuevos; con
+varios servidores, separar el ORDER_WORKER_ID base de cada maestro por al
+menos 2 × GUNICORN_WORKERS.
+
+Si el catálogo cambia, el maestro recarga su snapshot y reinicia los workers
+de forma ordenada (SIGHUP): terminan sus peticiones en curso y los nuevos
+nacen con el catálogo actualizado ya compartido.
+
+Variables de entorno:
+    GUNICORN_BIND            Dirección de escucha (default 0.0.0.0:5000)
+    GUNICORN_WORKERS         Procesos (default min(CPUs, 4))
+    GUNICORN_THREADS         Hilos por proceso (default 4)
+    GUNICORN_TIMEOUT         Segundos antes de reiniciar un worker colgado
+                             (default 30)
+    CATALOG_WATCH_INTERVAL   Segundos entre revisiones del catálogo en el
+                             maestro; 0 desactiva el reinicio (default 60)
+    ORDER_WORKER_ID          Primer id de worker de este maestro (default 0)
+"""
+
+import gc
+import os
+import signal
+import threading
+
+from tienda import catalog, order_numbers
+
+CATALOG_WATCH_INTERVAL = int(os.environ.get("CATALOG_WATCH_INTERVAL", 60))
+
+# La revisión del catálogo en el maestro y el fork de un worker no se cruzan:
+# el hijo heredaría tomados los locks que la recarga y sus listeners (p. ej.
+# index.html) tenían en ese momento
+_refresh_lock = threading.Lock()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(
+        before=_refresh_lock.acquire,
+        after_in_parent=_refresh_lock.release,
+        after_in_child=_refresh_lock.release,
+    )
+
+
+def default_workers():
+    return min(os.cpu_count() or 1, 4)
+
+
+def settings():
+    """Valores para gunicorn.conf.py"""
+    return {
+        "bind": os.environ.get("GUNICORN_BIND", "0.0.0.0:5000"),
+        "workers": int(os.environ.get("GUNICORN_WORKERS", default_workers())),
+        "threads": int(os.environ.get("GUNICORN_THREADS", 4)),
+        "worker_class": "gthread",
+        "preload_app": True,
+        "timeout": int(os.environ.get("GUNICORN_TIMEOUT", 30)),
+        "graceful_timeout": 30,
+        "keepalive": 5,
+    }
+
+
+def warm_up():
+    """Cargar las cachés compartidas en el maestro antes del fork"""
+    snapshot = catalog.refresh()
+    # Los objetos ya creados no vuelven a ser recorridos por el GC, que de otro
+    # modo tocaría sus páginas en cada worker y rompería el copy-on-write
+    gc.freeze()
+    return snapshot
+
+
+class CatalogWatcher(threading.Thread):
+    """Hilo del maestro que reinicia los workers cuando cambia el catálogo"""
+
+    def __init__(self, master_pid, interval=CATALOG_WATCH_INTERVAL, log=print):
+        super().__init__(name="catalog-watcher", daemon=True)
+        self.master_pid = master_pid
+        self.interval = interval
+        self.log = log
+        self._stop_event = threading.Event()
+
+    def run(self):
+        version = catalog.version()
+        while not self._stop_event.wait(self.interval):
+            try:
+                with _refresh_lock:
+                    current = catalog.refresh().version
+            except Exception as e:
+                self.log(f"⚠️ No se pudo revisar el catálogo: {e}")
+                continue
+            if current != version:
+                self.log(f"🔄 Catálogo {version} → {current}: reiniciando workers")
+                version = current
+                gc.freeze()
+                os.kill(self.master_pid, signal.SIGHUP)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+_watcher = None
+
+
+def when_ready(server):
+    global _watcher
+    snapshot = warm_up()
+    server.log.info(
+        f"Catálogo precargado ({len(snapshot.products)} productos, "
+        f"versión {snapshot.version})"
+    )
+    if CATALOG_WATCH_INTERVAL > 0 and _watcher is None:
+        _watcher = CatalogWatcher(os.getpid(), log=server.log.info)
+        _watcher.start()
+
+
+def order_worker_id(used):
+    """Menor id libre para un worker nuevo; RuntimeError si no queda ninguno"""
+    worker_id = int(os.environ.get("ORDER_WORKER_ID") or 0)
+    while worker_id in used:
+        worker_id += 1
+    if worker_id > order_numbers.MAX_WORKER_ID:
+        raise RuntimeError(
+            f"No quedan ids de worker libres (ORDER_WORKER_ID > "
+            f"{order_numbers.MAX_WORKER_ID})"
+        )
+    return worker_id
+
+
+def pre_fork(server, worker):
+    # En el maestro: server.WORKERS tiene los workers vivos, incluidos los
+    # que terminan sus peticiones durante un reinicio ordenado
+    used = [
+        getattr(alive, "order_worker_id", None) for alive in server.WORKERS.values()
+    ]
+    if len(used) != len(set(used)):
+        raise RuntimeError(f"ORDER_WORKER_ID repetido entre workers: {used}")
+    worker.order_worker_id = order_worker_id(set(used))
+
+
+def post_fork(server, worker):
+    # En el worker: order_numbers lo lee en su primer número de orden
+    os.environ["ORDER_WORKER_ID"] = str(worker.order_worker_id)
+    server.log.info(f"Worker {worker.pid}: ORDER_WORKER_ID={worker.order_worker_id}")
+
+
+def on_exit(server):
+    if _watcher is not None:
+        _watcher.stop()
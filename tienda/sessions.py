@@ -0,0 +1,147 @@
+"""Sesiones JWT respaldadas por user_sessions con caché de identidad en memoria.
+
+Cada token emitido registra su jti en user_sessions. Las peticiones
+autenticadas validan jti y estado del usuario contra cachés LRU con TTL, así
+que en el caso común no hay consulta a la base de datos. logout() marca la
+sesión como inactiva y actualiza la caché local; otros workers lo ven al
+expirar su entrada (como máximo SESSION_CACHE_TTL segundos).
+revoke_user_sessions() hace lo mismo con todas las sesiones de un usuario,
+p. ej. al cambiar la contraseña.
+
+Los tokens emitidos antes de existir el registro de sesiones no tienen fila en
+user_sessions; se aceptan mientras el usuario siga activo y logout les crea
+una fila inactiva.
+
+Variables de entorno:
+    SESSION_CACHE_TTL   Segundos que una entrada es válida (default 60)
+    SESSION_CACHE_SIZE  Máximo de jti/usuarios en caché (default 10000)
+"""
+
+import os
+import time
+from datetime import datetime, timezone
+
+from flask import current_app
+from flask_jwt_extended import create_access_token, get_jti
+
+from tienda.cache import TTLCache
+from tienda.repositories import users
+
+SESSION_CACHE_TTL = int(os.environ.get("SESSION_CACHE_TTL", 60))
+SESSION_CACHE_SIZE = int(os.environ.get("SESSION_CACHE_SIZE", 10000))
+PURGE_INTERVAL = 3600
+
+PUBLIC_USER_FIELDS = (
+    "id",
+    "username",
+    "email",
+    "first_name",
+    "last_name",
+    "created_at",
+    "is_active",
+    "is_admin",
+)
+
+_sessions = TTLCache(SESSION_CACHE_SIZE, SESSION_CACHE_TTL)
+_users = TTLCache(SESSION_CACHE_SIZE, SESSION_CACHE_TTL)
+_get_connection = None
+_last_purge = 0.0
+
+
+def init_app(jwt, get_connection):
+    """Registrar los callbacks de validación en el JWTManager"""
+    global _get_connection
+    _get_connection = get_connection
+
+    jwt.token_in_blocklist_loader(_is_token_revoked)
+    jwt.user_lookup_loader(_load_user)
+
+
+def _timestamp(dt):
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def open_session(conn, user_id):
+    """Emitir access token y registrar su jti (el commit queda a cargo del llamador)"""
+    access_token = create_access_token(identity=str(user_id))
+    jti = get_jti(access_token)
+    expires_at = (
+        datetime.now(timezone.utc) + current_app.config["JWT_ACCESS_TOKEN_EXPIRES"]
+    )
+    users.insert_session(conn, user_id, jti, _timestamp(expires_at))
+    _sessions.set(jti, True)
+    _purge_expired(conn)
+    return access_token
+
+
+def revoke_session(conn, user_id, jti, expires_at):
+    """Invalidar el token (el commit queda a cargo del llamador)"""
+    if users.deactivate_session(conn, jti) == 0:
+        # Token previo al registro de sesiones
+        users.insert_session(
+            conn,
+            user_id,
+            jti,
+            _timestamp(datetime.fromtimestamp(expires_at, timezone.utc)),
+            active=False,
+        )
+    _sessions.set(jti, False)
+
+
+def revoke_user_sessions(conn, user_id, keep_jti=None):
+    """Invalidar todos los tokens del usuario salvo keep_jti (el commit queda a
+    cargo del llamador)"""
+    for jti in users.deactivate_user_sessions(conn, user_id, keep_jti):
+        _sessions.set(jti, False)
+    invalidate_user(user_id)
+
+
+def invalidate_user(user_id):
+    """Olvidar el usuario cacheado (tras cambiar sus datos o desactivarlo)"""
+    _users.pop(int(user_id))
+
+
+def _purge_expired(conn):
+    global _last_purge
+    now = time.time()
+    if now - _last_purge < PURGE_INTERVAL:
+        return
+    _last_purge = now
+    users.purge_sessions(conn, _timestamp(datetime.now(timezone.utc)))
+
+
+def _is_token_revoked(jwt_header, jwt_payload):
+    jti = jwt_payload["jti"]
+    active = _sessions.get(jti)
+    if active is None:
+        conn = _get_connection()
+        active = users.session_active(conn, jti)
+        conn.close()
+        if active is None:
+            # Token previo al registro de sesiones
+            active = True
+        _sessions.set(jti, active)
+    return not active
+
+
+def get_user(user_id):
+    """Datos públicos del usuario desde caché; None si no existe"""
+    user_id = int(user_id)
+    user = _users.get(user_id)
+    if user is None:
+        conn = _get_connection()
+        row = users.get_fields(conn, user_id, PUBLIC_USER_FIELDS)
+        conn.close()
+        if row is None:
+            return None
+        user = dict(row)
+        _users.set(user_id, user)
+    return user
+
+
+def _load_user(jwt_header, jwt_payload):
+    # Retornar None hace que flask_jwt_extended responda 401
+    user = get_user(jwt_payload["sub"])
+    if user is None or not user["is_active"]:
+        return None
+    return user
@@ -0,0 +1,287 @@
+"""Servir el build de React con variantes precomprimidas y caché inmutable.
+
+En deploy (después de `npm run build`) se generan variantes .gz y .br de los
+archivos de texto:
+
+    python -m tienda.static_assets [build_dir]
+
+Al arrancar, la app construye un manifiesto en memoria a partir de
+asset-manifest.json y del contenido de build/, así que servir un archivo no
+requiere ninguna comprobación en el sistema de archivos. Los archivos con hash
+en el nombre (static/js/main.8da933cc.js) se sirven con caché inmutable de un
+año; el resto (index.html, imágenes, manifest.json) se revalida con ETag.
+
+Los ETags (hash del contenido) se calculan una sola vez al construir el
+manifiesto. index.html y los archivos pequeños se guardan en memoria y se
+responden sin abrir archivos; los grandes se entregan con wsgi.file_wrapper,
+que en gunicorn usa sendfile(2), o con X-Sendfile si el servidor frontal lo
+soporta (USE_X_SENDFILE). En ambos casos se atienden peticiones Range.
+
+brotli es opcional: sin el paquete solo se generan variantes gzip.
+
+Variables de entorno:
+    STATIC_MEMORY_MAX_FILE  Tamaño máximo de un archivo en memoria (default 64 KB)
+    STATIC_MEMORY_BYTES     Memoria total para archivos en memoria (default 8 MB)
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import sys
+
+from flask import current_app, send_file
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {
+    ".css",
+    ".html",
+    ".ico",
+    ".js",
+    ".json",
+    ".map",
+    ".svg",
+    ".txt",
+}
+MIN_COMPRESS_SIZE = 1024
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+FINGERPRINT_RE = re.compile(r"\.[0-9a-f]{8,}\.")
+STATIC_MEMORY_MAX_FILE = int(os.environ.get("STATIC_MEMORY_MAX_FILE", 64 * 1024))
+STATIC_MEMORY_BYTES = int(os.environ.get("STATIC_MEMORY_BYTES", 8 * 1024 * 1024))
+
+# Preferencia del servidor cuando el cliente acepta varias
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+VARIANT_SUFFIXES = {suffix for _, suffix in ENCODINGS}
+
+
+def _compress(path, encoding):
+    with open(path, "rb") as f:
+        data = f.read()
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    # mtime=0 para que el resultado sea reproducible entre deploys
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def precompress(build_dir, verbose=True):
+    """Generar variantes .gz/.br junto a cada archivo comprimible.
+
+    Solo se regeneran variantes inexistentes o más viejas que el original, y se
+    descartan las que no reducen el tamaño.
+    """
+    encodings = [enc for enc in ENCODINGS if enc[0] != "br" or brotli]
+    written = 0
+    for root, _, files in os.walk(build_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            ext = os.path.splitext(name)[1]
+            if ext in VARIANT_SUFFIXES or ext not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            size = os.path.getsize(path)
+            if size < MIN_COMPRESS_SIZE:
+                continue
+            for encoding, suffix in encodings:
+                variant = path + suffix
+                if os.path.exists(variant) and os.path.getmtime(
+                    variant
+                ) >= os.path.getmtime(path):
+                    continue
+                data = _compress(path, encoding)
+                if len(data) >= size:
+                    if os.path.exists(variant):
+                        os.remove(variant)
+                    continue
+                with open(variant, "wb") as f:
+                    f.write(data)
+                written += 1
+                if verbose:
+                    rel = os.path.relpath(variant, build_dir)
+                    print(f"🗜️  {rel}: {size} → {len(data)} bytes")
+    if verbose and brotli is None:
+        print("⚠️ brotli no está instalado: solo se generaron variantes gzip")
+    return written
+
+
+class StaticFile:
+    """Una representación en disco (original o variante comprimida)"""
+
+    def __init__(self, path):
+        stat = os.stat(path)
+        self.path = path
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime
+        self.body = None
+
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        self.etag = digest.hexdigest()[:20]
+
+    def load(self):
+        with open(self.path, "rb") as f:
+            self.body = f.read()
+
+
+class Asset:
+    """Archivo del build con sus metadatos precalculados"""
+
+    def __init__(self, path, rel, immutable):
+        self.rel = rel
+        self.identity = StaticFile(path)
+        self.mimetype = mimetypes.guess_type(rel)[0] or "application/octet-stream"
+        self.immutable = immutable
+        # encoding -> StaticFile
+        self.variants = {}
+
+    @property
+    def path(self):
+        return self.identity.path
+
+    @property
+    def size(self):
+        return self.identity.size
+
+    @property
+    def etag(self):
+        return self.identity.etag
+
+    def add_variant(self, encoding, path):
+        self.variants[encoding] = StaticFile(path)
+
+    def files(self):
+        return [self.identity, *self.variants.values()]
+
+
+class AssetManifest:
+    """Índice en memoria de los archivos servibles del build"""
+
+    def __init__(self, build_dir):
+        self.build_dir = build_dir
+        self.assets = {}
+        self.reload()
+
+    def _fingerprinted(self):
+        """Rutas con hash según asset-manifest.json (más el patrón de nombre)"""
+        manifest_path = os.path.join(self.build_dir, "asset-manifest.json")
+        try:
+            with open(manifest_path, encoding="utf-8") as f:
+                files = json.load(f).get("files", {})
+        except (OSError, ValueError):
+            return set()
+        return {
+            url.lstrip("/")
+            for url in files.values()
+            if FINGERPRINT_RE.search(os.path.basename(url))
+        }
+
+    def reload(self):
+        assets = {}
+        if os.path.isdir(self.build_dir):
+            fingerprinted = self._fingerprinted()
+            for root, _, files in os.walk(self.build_dir):
+                for name in files:
+                    if os.path.splitext(name)[1] in VARIANT_SUFFIXES:
+                        continue
+                    path = os.path.join(root, name)
+                    rel = os.path.relpath(path, self.build_dir).replace(os.sep, "/")
+                    immutable = rel in fingerprinted or (
+                        rel.startswith("static/")
+                        and FINGERPRINT_RE.search(name) is not None
+                    )
+                    asset = Asset(path, rel, immutable)
+                    for encoding, suffix in ENCODINGS:
+                        if os.path.exists(path + suffix):
+                            asset.add_variant(encoding, path + suffix)
+                    assets[rel] = asset
+        in_memory = self._load_bodies(assets)
+        self.assets = assets
+        print(
+            f"📦 Manifiesto de assets: {len(assets)} archivos en {self.build_dir} "
+            f"({in_memory} bytes en memoria)"
+        )
+
+    @staticmethod
+    def _load_bodies(assets):
+        """Cargar en memoria index.html y los archivos pequeños hasta el presupuesto"""
+        candidates = []
+        for rel, asset in assets.items():
+            for static_file in asset.files():
+                if rel == "index.html" or static_file.size <= STATIC_MEMORY_MAX_FILE:
+                    candidates.append(
+                        (rel != "index.html", static_file.size, static_file)
+                    )
+
+        used = 0
+        # index.html primero, luego los más pequeños
+        for _, size, static_file in sorted(candidates, key=lambda c: c[:2]):
+            if used + size > STATIC_MEMORY_BYTES and used:
+                break
+            static_file.load()
+            used += size
+        return used
+
+    def get(self, rel):
+        return self.assets.get(rel)
+
+
+def _choose_encoding(asset, request):
+    if not asset.variants:
+        return None
+    accepted = request.accept_encodings
+    for encoding, _ in ENCODINGS:
+        if encoding in asset.variants and accepted[encoding]:
+            return encoding
+    return None
+
+
+def send_asset(asset, request):
+    """Responder con la mejor variante aceptada y las cabeceras de caché"""
+    encoding = _choose_encoding(asset, request)
+    static_file = asset.variants[encoding] if encoding else asset.identity
+
+    if static_file.body is not None:
+        # En memoria: sin abrir archivos; make_conditional resuelve 304 y Range
+        response = current_app.response_class(static_file.body, mimetype=asset.mimetype)
+        response.set_etag(static_file.etag)
+        response.last_modified = static_file.mtime
+        response = response.make_conditional(
+            request, accept_ranges=True, complete_length=static_file.size
+        )
+    else:
+        # Archivo grande: wsgi.file_wrapper (sendfile) o X-Sendfile
+        response = send_file(
+            static_file.path,
+            mimetype=asset.mimetype,
+            conditional=True,
+            etag=static_file.etag,
+            last_modified=static_file.mtime,
+        )
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    if asset.variants:
+        response.vary.add("Accept-Encoding")
+
+    if asset.immutable:
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+        response.cache_control.max_age = None
+    return response
+
+
+if __name__ == "__main__":
+    default_build = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "build"
+    )
+    target = sys.argv[1] if len(sys.argv) > 1 else default_build
+    count = precompress(target)
+    print(f"✅ {count} variantes comprimidas generadas en {target}")
@@ -0,0 +1,167 @@
+"""Espejo del catálogo en Stripe (Products y Prices).
+
+Con price_data en línea cada line_item de una sesión de Checkout lleva el
+nombre, la metadata y el precio del producto. Si el producto ya existe en
+Stripe con un Price vigente, la sesión solo manda {"price": id, "quantity": n}.
+
+sync() compara productos con la tabla stripe_prices y solo llama a Stripe por
+lo que cambió: crea Product y Price de los productos nuevos, crea un Price
+nuevo cuando cambia price_cents, renombra el Product si cambió el nombre y
+archiva los productos que ya no existen. Se puede correr seguido (cron,
+después de update_products.py):
+
+    python -m tienda.stripe_catalog
+
+El Price anterior queda activo: un worker que aún no recarga el catálogo
+puede seguir usándolo unos segundos.
+
+price_id() consulta un mapa en memoria que se recarga cada STRIPE_PRICES_TTL
+segundos. Si el producto no está sincronizado o su precio cambió desde la
+última sincronización devuelve None, y el checkout manda price_data en línea.
+
+Variables de entorno:
+    STRIPE_PRICES_TTL  Segundos entre recargas del mapa de precios (default 60)
+"""
+
+import os
+import threading
+import time
+
+import stripe
+
+from tienda import db, stripe_guard
+from tienda.repositories import catalog as catalog_repo
+from tienda.repositories import stripe_prices as stripe_prices_repo
+
+CURRENCY = "mxn"
+STRIPE_PRICES_TTL = int(os.environ.get("STRIPE_PRICES_TTL", 60))
+
+_get_connection = None
+_prices = {}
+_loaded_at = None
+_reload_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    global _reload_lock
+    _reload_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    # Como en tienda.catalog: el lock copiado en el fork puede estar tomado
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def init_app(get_connection):
+    global _get_connection
+    _get_connection = get_connection
+
+
+def reload():
+    """Recargar el mapa {product_id: (price_id, price_cents)}"""
+    global _prices, _loaded_at
+    conn = _get_connection()
+    try:
+        rows = stripe_prices_repo.get_all(conn)
+    finally:
+        conn.close()
+    _prices = {
+        product_id: (row["stripe_price_id"], row["price_cents"])
+        for product_id, row in rows.items()
+    }
+    _loaded_at = time.monotonic()
+
+
+def price_id(product_id, price_cents):
+    """Price de Stripe del producto con ese precio, o None"""
+    if _loaded_at is None or time.monotonic() - _loaded_at >= STRIPE_PRICES_TTL:
+        # La primera carga espera; después un solo hilo recarga y el resto
+        # sigue con el mapa anterior
+        if _reload_lock.acquire(blocking=_loaded_at is None):
+            try:
+                reload()
+            finally:
+                _reload_lock.release()
+    mirrored = _prices.get(product_id)
+    if mirrored and mirrored[1] == price_cents:
+        return mirrored[0]
+    return None
+
+
+def _ensure_product(product_id, name):
+    """Crear el Product con id fijo; si ya existe (archivado o de una
+    sincronización interrumpida) se reactiva"""
+    stripe_product_id = f"tienda-{product_id}"
+    try:
+        stripe.Product.create(
+            id=stripe_product_id,
+            name=name,
+            metadata={"product_id": str(product_id)},
+        )
+    except stripe.InvalidRequestError as e:
+        if e.code != "resource_already_exists":
+            raise
+        stripe.Product.modify(stripe_product_id, name=name, active=True)
+    return stripe_product_id
+
+
+def _create_price(stripe_product_id, price_cents):
+    return stripe.Price.create(
+        product=stripe_product_id, unit_amount=price_cents, currency=CURRENCY
+    ).id
+
+
+def sync(conn):
+    """Sincronizar productos con Stripe; devuelve cuántos cambió de cada tipo"""
+    counts = dict.fromkeys(("created", "repriced", "renamed", "archived"), 0)
+    mirrored = stripe_prices_repo.get_all(conn)
+    products = {row["id"]: row for row in catalog_repo.list_products(conn)}
+
+    for product_id, product in products.items():
+        name, price_cents = product["name"], product["price_cents"]
+        current = mirrored.get(product_id)
+        if current is None:
+            stripe_product_id = _ensure_product(product_id, name)
+            stripe_price_id = _create_price(stripe_product_id, price_cents)
+            counts["created"] += 1
+        else:
+            if current["name"] == name and current["price_cents"] == price_cents:
+                continue
+            stripe_product_id = current["stripe_product_id"]
+            stripe_price_id = current["stripe_price_id"]
+            if current["name"] != name:
+                stripe.Product.modify(stripe_product_id, name=name)
+                counts["renamed"] += 1
+            if current["price_cents"] != price_cents:
+                stripe_price_id = _create_price(stripe_product_id, price_cents)
+                counts["repriced"] += 1
+
+        # Commit por producto: si Stripe falla a la mitad no se repite lo hecho
+        db.begin_write(conn)
+        stripe_prices_repo.save(
+            conn, product_id, stripe_product_id, stripe_price_id, name, price_cents
+        )
+        conn.commit()
+
+    for product_id in mirrored.keys() - products.keys():
+        stripe.Product.modify(mirrored[product_id]["stripe_product_id"], active=False)
+        db.begin_write(conn)
+        stripe_prices_repo.delete(conn, product_id)
+        conn.commit()
+        counts["archived"] += 1
+
+    return counts
+
+
+if __name__ == "__main__":
+    db.init_database()
+    stripe_guard.configure()
+    conn = db.get_connection()
+    try:
+        counts = sync(conn)
+    finally:
+        conn.close()
+    print(
+        "✅ Stripe sincronizado: "
+        + ", ".join(f"{kind}={count}" for kind, count in counts.items())
+    )
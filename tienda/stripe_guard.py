@@ -0,0 +1,191 @@
+"""Llamadas a Stripe con timeout, bulkhead y circuit breaker.
+
+Las llamadas a Stripe corren en el hilo de la petición. Con los valores de la
+librería (80 s de timeout, sin límite de concurrencia) una caída o lentitud
+de Stripe deja a todos los hilos del worker esperando, y hasta el catálogo
+deja de responder. call() protege cada llamada:
+
+- Timeout: cada petición HTTP a Stripe espera a lo más STRIPE_TIMEOUT.
+- Bulkhead: a lo más STRIPE_MAX_CONCURRENT llamadas en vuelo por proceso; si
+  no hay lugar en STRIPE_BULKHEAD_WAIT segundos, se rechaza.
+- Circuit breaker: tras STRIPE_BREAKER_FAILURES fallas seguidas de red o de
+  Stripe (timeouts, 5xx, rate limit) el circuito se abre y las llamadas fallan
+  de inmediato durante STRIPE_BREAKER_RESET segundos. Luego deja pasar una
+  sola llamada de prueba (half-open): si funciona se cierra, si no se vuelve
+  a abrir. Los errores del cliente (tarjeta rechazada, parámetros inválidos)
+  no cuentan como fallas.
+
+En los tres casos se lanza StripeUnavailable y los handlers responden 503 con
+Retry-After. El estado es por proceso y se consulta con stats() (expuesto a
+administradores en /api/stripe/metrics).
+
+    session = stripe_guard.call(stripe.checkout.Session.retrieve, session_id)
+
+Variables de entorno:
+    STRIPE_TIMEOUT           Segundos por petición HTTP a Stripe (default 10)
+    STRIPE_MAX_CONCURRENT    Llamadas simultáneas por proceso (default 4)
+    STRIPE_BULKHEAD_WAIT     Segundos esperando lugar en el bulkhead (default 0.5)
+    STRIPE_BREAKER_FAILURES  Fallas seguidas que abren el circuito (default 5)
+    STRIPE_BREAKER_RESET     Segundos abierto antes de probar de nuevo (default 30)
+    STRIPE_API_BASE          URL de la API de Stripe, p. ej. stripe-mock en local
+"""
+
+import math
+import os
+import threading
+import time
+
+import stripe
+
+STRIPE_TIMEOUT = float(os.environ.get("STRIPE_TIMEOUT", 10))
+STRIPE_MAX_CONCURRENT = int(os.environ.get("STRIPE_MAX_CONCURRENT", 4))
+STRIPE_BULKHEAD_WAIT = float(os.environ.get("STRIPE_BULKHEAD_WAIT", 0.5))
+STRIPE_BREAKER_FAILURES = int(os.environ.get("STRIPE_BREAKER_FAILURES", 5))
+STRIPE_BREAKER_RESET = float(os.environ.get("STRIPE_BREAKER_RESET", 30))
+
+# Errores que indican que Stripe no está disponible
+FAILURES = (stripe.APIConnectionError, stripe.APIError, stripe.RateLimitError)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class StripeUnavailable(Exception):
+    """Circuito abierto, bulkhead lleno o Stripe no respondió"""
+
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(self, failures, reset_after):
+        self.max_failures = failures
+        self.reset_after = reset_after
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def retry_after(self):
+        remaining = self.opened_at + self.reset_after - time.monotonic()
+        return max(1, math.ceil(remaining))
+
+    def before_call(self):
+        """Permiso para llamar; StripeUnavailable si el circuito no lo da"""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.reset_after:
+                    raise StripeUnavailable(
+                        "Stripe no disponible (circuito abierto)", self.retry_after()
+                    )
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN:
+                # Una sola llamada de prueba a la vez
+                if self._probing:
+                    raise StripeUnavailable(
+                        "Stripe no disponible (probando conexión)", 1
+                    )
+                self._probing = True
+
+    def on_success(self):
+        with self._lock:
+            self._probing = False
+            self.state = CLOSED
+            self.failures = 0
+
+    def on_failure(self):
+        with self._lock:
+            self._probing = False
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.max_failures:
+                if self.state != OPEN:
+                    self.times_opened += 1
+                    print(f"⚠️ Circuito de Stripe abierto tras {self.failures} fallas")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def cancel(self):
+        """La llamada no llegó a Stripe: otro hilo puede hacer la prueba"""
+        with self._lock:
+            self._probing = False
+
+
+breaker = CircuitBreaker(STRIPE_BREAKER_FAILURES, STRIPE_BREAKER_RESET)
+_bulkhead = threading.BoundedSemaphore(STRIPE_MAX_CONCURRENT)
+_stats_lock = threading.Lock()
+_stats = {
+    "calls": 0,
+    "in_flight": 0,
+    "failures": 0,
+    "rejected": 0,
+    "short_circuited": 0,
+}
+
+
+def configure():
+    """Claves, URL base y timeout HTTP de la librería stripe"""
+    stripe.api_key = os.environ.get("STRIPE_SECRET_KEY")
+    if os.environ.get("STRIPE_API_BASE"):
+        stripe.api_base = os.environ["STRIPE_API_BASE"]
+    # Sin reintentos automáticos: durante una caída solo suman carga
+    stripe.max_network_retries = 0
+    stripe.default_http_client = stripe.new_default_http_client(timeout=STRIPE_TIMEOUT)
+
+
+def _count(name, delta=1):
+    with _stats_lock:
+        _stats[name] += delta
+
+
+def call(fn, *args, **kwargs):
+    """Ejecutar fn(*args, **kwargs) contra Stripe con las protecciones"""
+    try:
+        breaker.before_call()
+    except StripeUnavailable:
+        _count("short_circuited")
+        raise
+
+    if not _bulkhead.acquire(timeout=STRIPE_BULKHEAD_WAIT):
+        breaker.cancel()
+        _count("rejected")
+        raise StripeUnavailable("Demasiadas llamadas a Stripe en curso", 1)
+
+    _count("calls")
+    _count("in_flight")
+    try:
+        result = fn(*args, **kwargs)
+    except FAILURES as e:
+        _count("failures")
+        breaker.on_failure()
+        raise StripeUnavailable(f"Stripe no respondió: {e}", 1) from e
+    except stripe.StripeError:
+        # Error del cliente (tarjeta, parámetros): Stripe sí respondió
+        breaker.on_success()
+        raise
+    except Exception:
+        breaker.cancel()
+        raise
+    else:
+        breaker.on_success()
+        return result
+    finally:
+        _count("in_flight", -1)
+        _bulkhead.release()
+
+
+def stats():
+    with _stats_lock:
+        data = dict(_stats)
+    data.update(
+        state=breaker.state,
+        consecutive_failures=breaker.failures,
+        times_opened=breaker.times_opened,
+        max_concurrent=STRIPE_MAX_CONCURRENT,
+    )
+    if breaker.state == OPEN:
+        data["retry_after"] = breaker.retry_after()
+    return data
@@ -0,0 +1,201 @@
+"""Miniaturas WebP/JPEG de las imágenes de productos generadas con Pillow.
+
+/images/<ancho>/<archivo> entrega la imagen redimensionada al ancho pedido
+(solo anchos de THUMBNAIL_SIZES). Se genera WebP cuando el navegador lo acepta
+y JPEG en otro caso.
+
+Las miniaturas se guardan en disco bajo una llave derivada del hash del
+contenido original, así que reemplazar una imagen invalida sus miniaturas sin
+pasos manuales. Las más usadas se mantienen además en un LRU en memoria.
+
+Para pre-generar todas las imágenes del catálogo en deploy:
+
+    python -m tienda.thumbnails
+
+Variables de entorno:
+    THUMBNAIL_SIZES         Anchos permitidos (default 160,320,640)
+    THUMBNAIL_CACHE_DIR     Directorio de la caché en disco
+                            (default thumbnail_cache/ junto a la app)
+    THUMBNAIL_MEMORY_BYTES  Memoria para miniaturas calientes (default 8 MB)
+"""
+
+import io
+import os
+import threading
+
+from tienda.cache import SizedLRUCache
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+THUMBNAIL_SIZES = tuple(
+    int(width) for width in os.environ.get("THUMBNAIL_SIZES", "160,320,640").split(",")
+)
+THUMBNAIL_CACHE_DIR = os.environ.get(
+    "THUMBNAIL_CACHE_DIR", os.path.join(APP_ROOT, "thumbnail_cache")
+)
+THUMBNAIL_MEMORY_BYTES = int(os.environ.get("THUMBNAIL_MEMORY_BYTES", 8 * 1024 * 1024))
+THUMBNAIL_MAX_AGE = 24 * 3600
+
+# (Image, ImageOps) de Pillow tras el primer uso, False si no está instalado
+_pil = None
+
+RASTER_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+FORMATS = {
+    "webp": ("WEBP", "image/webp", {"quality": 80, "method": 6}),
+    "jpeg": (
+        "JPEG",
+        "image/jpeg",
+        {"quality": 82, "optimize": True, "progressive": True},
+    ),
+}
+
+
+def pillow():
+    """Módulos (Image, ImageOps) de Pillow, o None si no está instalado.
+
+    Se importa en la primera miniatura: los workers que solo sirven la API o
+    el HTML no cargan Pillow al arrancar.
+    """
+    global _pil
+    if _pil is None:
+        try:
+            from PIL import Image, ImageOps
+        except ImportError:
+            _pil = False
+        else:
+            _pil = (Image, ImageOps)
+    return _pil or None
+
+
+def sniff_mimetype(data):
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return "image/png"
+    return "image/jpeg"
+
+
+def render(source_path, width, fmt):
+    """Redimensionar manteniendo proporción (nunca amplía) y codificar"""
+    Image, ImageOps = pillow()
+    pil_format, _, options = FORMATS[fmt]
+    with Image.open(source_path) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.width > width:
+            height = max(1, round(img.height * width / img.width))
+            img = img.resize((width, height), Image.LANCZOS)
+        if pil_format == "JPEG" and img.mode not in ("RGB", "L"):
+            # JPEG no tiene transparencia: aplanar sobre fondo blanco
+            background = Image.new("RGB", img.size, (255, 255, 255))
+            rgba = img.convert("RGBA")
+            background.paste(rgba, mask=rgba.split()[-1])
+            img = background
+        buffer = io.BytesIO()
+        img.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+class ThumbnailCache:
+    def __init__(
+        self, cache_dir=THUMBNAIL_CACHE_DIR, memory_bytes=THUMBNAIL_MEMORY_BYTES
+    ):
+        self.cache_dir = cache_dir
+        self._memory = SizedLRUCache(memory_bytes)
+
+    @staticmethod
+    def supports(asset):
+        return (
+            os.path.splitext(asset.rel)[1].lower() in RASTER_EXTENSIONS
+            and pillow() is not None
+        )
+
+    def key(self, asset, width, fmt):
+        # El ETag del asset ya es un hash de su contenido
+        return f"{asset.etag[:16]}-{width}.{fmt}"
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def get(self, asset, width, fmt):
+        """Bytes de la miniatura y su llave (memoria → disco → Pillow).
+
+        Si la miniatura no resulta más ligera que el original (imágenes ya
+        pequeñas) y el formato del original es compatible, se guarda el
+        original bajo la misma llave.
+        """
+        key = self.key(asset, width, fmt)
+        data = self._memory.get(key)
+        if data is not None:
+            return data, key
+
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = render(asset.path, width, fmt)
+            if len(data) >= asset.size:
+                with open(asset.path, "rb") as f:
+                    original = f.read()
+                # Un original WebP no sirve a quien pidió JPEG
+                if fmt == "webp" or sniff_mimetype(original) != "image/webp":
+                    data = original
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Escritura atómica: otro worker puede estar generando la misma
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        self._memory.set(key, data)
+        return data, key
+
+
+def choose_format(request):
+    # accept_mimetypes acepta image/webp vía */*; solo contar soporte explícito
+    return "webp" if "image/webp" in request.headers.get("Accept", "") else "jpeg"
+
+
+def send_thumbnail(cache, asset, width, request, response_class):
+    fmt = choose_format(request)
+    data, key = cache.get(asset, width, fmt)
+
+    response = response_class(data, mimetype=sniff_mimetype(data))
+    response.set_etag(key)
+    response.vary.add("Accept")
+    response.cache_control.public = True
+    response.cache_control.max_age = THUMBNAIL_MAX_AGE
+    return response.make_conditional(request)
+
+
+def warm(build_dir, sizes=THUMBNAIL_SIZES):
+    """Generar en disco las miniaturas de todas las imágenes del catálogo"""
+    from tienda import db
+    from tienda.repositories import catalog
+    from tienda.static_assets import AssetManifest
+
+    assets = AssetManifest(build_dir)
+    cache = ThumbnailCache(memory_bytes=0)
+
+    conn = db.get_read_connection()
+    images = catalog.list_images(conn)
+    conn.close()
+
+    generated = 0
+    for image in images:
+        asset = assets.get(f"images/products/{image}")
+        if asset is None or not cache.supports(asset):
+            print(f"⚠️ Imagen no disponible para miniaturas: {image}")
+            continue
+        for width in sizes:
+            for fmt in FORMATS:
+                cache.get(asset, width, fmt)
+                generated += 1
+    return generated
+
+
+if __name__ == "__main__":
+    if pillow() is None:
+        raise SystemExit("❌ Pillow no está instalado (pip install Pillow)")
+    count = warm(os.path.join(APP_ROOT, "build"))
+    print(f"✅ {count} miniaturas listas en {THUMBNAIL_CACHE_DIR}")
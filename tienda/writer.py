@@ -0,0 +1,193 @@
+"""Cola de escritura: un solo hilo por proceso aplica las mutaciones a SQLite.
+
+Con varios hilos haciendo commit a la vez, SQLite serializa con su lock de
+escritura y los demás esperan en reintentos (busy timeout). Aquí los handlers
+envían una función a la cola y esperan su resultado en un Future; el hilo
+escritor toma varias a la vez y las aplica en una sola transacción (group
+commit), así que el costo del fsync se reparte entre todas.
+
+Cada trabajo corre dentro de un SAVEPOINT: si lanza una excepción solo se
+deshacen sus cambios, y la excepción llega al handler que lo envió. Los
+resultados se entregan después del COMMIT.
+
+    result = writer.write(fn, *args)   # fn(conn, *args) sin commit propio
+
+Un trabajo que no empezó en WRITER_TIMEOUT segundos se cancela y write()
+lanza WriterTimeout: no se aplicará, así que el cliente puede reintentar. Si
+ya empezó, write() espera el COMMIT de su lote; responder error mientras la
+escritura sigue pendiente haría que un reintento la duplicara.
+
+Con PostgreSQL (tienda.db.single_writer() es False) no hay cola: cada
+handler escribe en su propia conexión del pool y la base resuelve la
+concurrencia.
+
+Variables de entorno:
+    WRITER_QUEUE_ENABLED  "false" para escribir en el hilo del handler (default true)
+    WRITER_BATCH_MAX      Trabajos máximos por transacción (default 64)
+    WRITER_BATCH_WAIT_MS  Espera para juntar más trabajos tras el primero (default 0)
+    WRITER_TIMEOUT        Segundos que un trabajo espera en la cola antes de
+                          cancelarse (default 30)
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from tienda import db
+
+WRITER_QUEUE_ENABLED = os.environ.get("WRITER_QUEUE_ENABLED", "true").lower() != "false"
+WRITER_BATCH_MAX = int(os.environ.get("WRITER_BATCH_MAX", 64))
+WRITER_BATCH_WAIT = int(os.environ.get("WRITER_BATCH_WAIT_MS", 0)) / 1000
+WRITER_TIMEOUT = float(os.environ.get("WRITER_TIMEOUT", 30))
+
+
+class WriterTimeout(Exception):
+    """El trabajo no empezó a tiempo; se canceló y no se aplicará"""
+
+
+class Job:
+    def __init__(self, fn, args, kwargs):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+        self.result = None
+        self.error = None
+
+
+class WriteQueue:
+    """Hilo escritor con su propia conexión y transacciones agrupadas"""
+
+    def __init__(
+        self,
+        connect=db.get_connection,
+        batch_max=WRITER_BATCH_MAX,
+        batch_wait=WRITER_BATCH_WAIT,
+    ):
+        self.connect = connect
+        self.batch_max = batch_max
+        self.batch_wait = batch_wait
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.stats = {"jobs": 0, "commits": 0}
+
+    def _ensure_thread(self):
+        # Tras un fork (gunicorn) el hilo del padre no existe en el hijo
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(
+                    target=self._run, name="sqlite-writer", daemon=True
+                )
+                self._thread.start()
+
+    def submit(self, fn, *args, **kwargs):
+        self._ensure_thread()
+        job = Job(fn, args, kwargs)
+        self._queue.put(job)
+        return job.future
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_max:
+            try:
+                timeout = deadline - time.monotonic()
+                if timeout > 0:
+                    batch.append(self._queue.get(timeout=timeout))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        conn = None
+        while True:
+            # Los trabajos que ya se cancelaron por timeout no se aplican
+            batch = [
+                job
+                for job in self._next_batch()
+                if job.future.set_running_or_notify_cancel()
+            ]
+            if not batch:
+                continue
+            try:
+                conn = conn or self.connect()
+                self._apply(conn, batch)
+            except Exception as e:
+                # Falló BEGIN o COMMIT: ningún trabajo del lote quedó aplicado
+                print(f"❌ Error en la cola de escritura: {e}")
+                if conn is not None:
+                    # Descartar la conexión; la siguiente tanda abre una nueva
+                    conn.close()
+                    conn = None
+                for job in batch:
+                    job.future.set_exception(e)
+                continue
+            for job in batch:
+                if job.error is not None:
+                    job.future.set_exception(job.error)
+                else:
+                    job.future.set_result(job.result)
+
+    def _apply(self, conn, batch):
+        db.begin_write(conn)
+        for job in batch:
+            conn.execute("SAVEPOINT job")
+            try:
+                job.result = job.fn(conn, *job.args, **job.kwargs)
+            except Exception as e:
+                job.error = e
+                conn.execute("ROLLBACK TO SAVEPOINT job")
+            conn.execute("RELEASE SAVEPOINT job")
+        conn.commit()
+        self.stats["jobs"] += len(batch)
+        self.stats["commits"] += 1
+
+
+def _write_inline(fn, *args, **kwargs):
+    conn = db.get_connection()
+    try:
+        db.begin_write(conn)
+        result = fn(conn, *args, **kwargs)
+        conn.commit()
+        return result
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+_queue = WriteQueue()
+
+
+def write(fn, *args, **kwargs):
+    """Ejecutar fn(conn, *args, **kwargs) en una transacción y devolver su resultado.
+
+    fn no debe hacer commit. Sus excepciones se relanzan aquí con sus cambios
+    ya deshechos; WriterTimeout si no llegó a ejecutarse.
+    """
+    if not WRITER_QUEUE_ENABLED or not db.single_writer():
+        return _write_inline(fn, *args, **kwargs)
+    future = _queue.submit(fn, *args, **kwargs)
+    try:
+        return future.result(timeout=WRITER_TIMEOUT)
+    except FutureTimeoutError:
+        if future.cancel():
+            raise WriterTimeout("La cola de escritura no respondió a tiempo") from None
+        # Ya está en un lote: su resultado llega con el COMMIT
+        return future.result()
+
+
+def stats():
+    return dict(_queue.stats)